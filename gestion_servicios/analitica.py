@@ -0,0 +1,258 @@
+# gestion_servicios/analitica.py
+
+"""
+Percentiles de demora (fecha_entrega - fecha_ingreso) por técnico, marca,
+tipo de equipo y mes.
+
+El historial no se recorre en cada consulta: actualizar() mantiene la tabla
+ResumenDiarioDemora, con una fila por (día de ingreso, dimensión, valor) que
+guarda las duraciones de ese grupo empaquetadas como uint32 (segundos). Un
+tablero lee unos cientos de filas, las desempaqueta con NumPy y calcula los
+percentiles de todos los grupos a la vez (ordenar + interpolar sobre arreglos,
+sin bucles por orden). Guardar las duraciones y no los percentiles diarios
+permite combinar días en percentiles exactos por mes.
+
+La actualización es incremental: procesa solo los días de ingreso de las
+órdenes (o sus equipos) modificadas desde la última marca de agua
+(MarcaProceso) y recalcula esos días completos. Se agrupa por día de ingreso
+porque fecha_ingreso no cambia nunca: recalcular el día alcanza para reflejar
+entregas, reasignaciones de técnico o correcciones del equipo. La marca de
+agua queda MARGEN por detrás del reloj, para no saltear escrituras con
+updated_at anterior que todavía no se habían confirmado.
+
+Las órdenes borradas no dejan rastro en updated_at: después de borrar
+historial, correr `manage.py actualizar_analitica --reconstruir`.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import DateField, DurationField, ExpressionWrapper, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Marca, MarcaProceso, Reparacion, ResumenDiarioDemora, Tecnico, TipoEquipo
+from . import validadores
+
+PROCESO = 'analitica.demoras'
+MARGEN = timedelta(minutes=5)
+# Días de ingreso recalculados por transacción
+LOTE_DIAS = 90
+PERCENTILES = (50, 90, 99)
+
+# Dimensión -> columna (en values_list) con el valor del grupo
+DIMENSIONES = {
+    'total': None,
+    'tecnico': 'tecnico_asignado_id',
+    'marca': 'equipo__marca_id',
+    'tipo': 'equipo__tipo_id',
+}
+MODELOS = {'tecnico': Tecnico, 'marca': Marca, 'tipo': TipoEquipo}
+
+# Duraciones en segundos, little-endian para que el BLOB no dependa de la máquina
+_TIPO = np.dtype('<u4')
+
+
+class ConsultaInvalida(ValueError):
+    """Parámetros de consulta de percentiles no válidos."""
+
+
+@dataclass
+class Actualizacion:
+    dias: int
+    filas: int
+    hasta: datetime
+
+
+# ======================================================================
+# ACTUALIZACIÓN DEL RESUMEN
+# ======================================================================
+
+def _rangos(dias):
+    """Agrupa días ordenados en rangos [inicio, fin) consecutivos."""
+    rangos = []
+    for dia in dias:
+        if rangos and rangos[-1][1] == dia:
+            rangos[-1][1] = dia + timedelta(days=1)
+        else:
+            rangos.append([dia, dia + timedelta(days=1)])
+    return rangos
+
+
+def _filtro_dias(dias):
+    # Rangos sobre la columna (no TruncDate en el WHERE) para usar rep_fecha_ingreso_idx
+    zona = timezone.get_current_timezone()
+    filtro = Q()
+    for inicio, fin in _rangos(dias):
+        filtro |= Q(
+            fecha_ingreso__gte=timezone.make_aware(datetime.combine(inicio, time.min), zona),
+            fecha_ingreso__lt=timezone.make_aware(datetime.combine(fin, time.min), zona),
+        )
+    return filtro
+
+
+def _resumir(dias):
+    """Arma las filas de ResumenDiarioDemora de `dias` (lista ordenada de fechas)."""
+    filas = list(
+        Reparacion.objects.filter(_filtro_dias(dias), fecha_entrega__isnull=False)
+        .annotate(
+            dia=TruncDate('fecha_ingreso', output_field=DateField()),
+            demora=ExpressionWrapper(F('fecha_entrega') - F('fecha_ingreso'), output_field=DurationField()),
+        )
+        .order_by()
+        .values_list('dia', 'demora', *[columna for columna in DIMENSIONES.values() if columna])
+    )
+    if not filas:
+        return []
+
+    columnas = list(zip(*filas))
+    dia = np.array(columnas[0], dtype='datetime64[D]')
+    segundos = np.array(columnas[1], dtype='timedelta64[s]').astype(np.int64)
+    # Una entrega anterior al ingreso es un error de carga: cuenta como 0
+    segundos = np.clip(segundos, 0, np.iinfo(_TIPO).max).astype(_TIPO)
+
+    resultado = []
+    indice = 2
+    for dimension, columna in DIMENSIONES.items():
+        if columna is None:
+            valor = np.zeros(len(filas), dtype=np.int64)
+        else:
+            # None (sin técnico / marca / tipo) -> 0
+            valor = np.nan_to_num(np.array(columnas[indice], dtype=float), nan=0).astype(np.int64)
+            indice += 1
+
+        orden = np.lexsort((segundos, valor, dia))
+        d, v, s = dia[orden], valor[orden], segundos[orden]
+        cortes = np.flatnonzero((d[1:] != d[:-1]) | (v[1:] != v[:-1])) + 1
+        inicios = np.concatenate(([0], cortes))
+        fines = np.concatenate((cortes, [len(s)]))
+        resultado += [
+            ResumenDiarioDemora(
+                dia=d[inicio].item(), dimension=dimension, valor=int(v[inicio]),
+                cantidad=int(fin - inicio), duraciones=s[inicio:fin].tobytes(),
+            )
+            for inicio, fin in zip(inicios, fines)
+        ]
+    return resultado
+
+
+def _dias_ingreso(queryset):
+    return sorted(
+        queryset.annotate(dia=TruncDate('fecha_ingreso', output_field=DateField()))
+        .order_by().values_list('dia', flat=True).distinct()
+    )
+
+
+def actualizar(reconstruir=False):
+    """
+    Recalcula los días de ingreso afectados desde la última marca de agua (o
+    todos, con reconstruir=True o en la primera corrida) y avanza la marca.
+    """
+    hasta = timezone.now() - MARGEN
+    marca = MarcaProceso.objects.filter(nombre=PROCESO).first()
+    completo = reconstruir or marca is None
+
+    if completo:
+        dias = _dias_ingreso(Reparacion.objects.filter(fecha_entrega__isnull=False))
+    else:
+        cambios = (
+            Q(updated_at__gt=marca.hasta, updated_at__lte=hasta)
+            | Q(equipo__updated_at__gt=marca.hasta, equipo__updated_at__lte=hasta)
+        )
+        dias = _dias_ingreso(Reparacion.objects.filter(cambios))
+
+    if completo:
+        ResumenDiarioDemora.objects.all().delete()
+    filas = 0
+    for desde in range(0, len(dias), LOTE_DIAS):
+        lote = dias[desde:desde + LOTE_DIAS]
+        with transaction.atomic():
+            nuevas = _resumir(lote)
+            ResumenDiarioDemora.objects.filter(dia__in=lote).delete()
+            ResumenDiarioDemora.objects.bulk_create(nuevas, batch_size=500)
+            filas += len(nuevas)
+
+    with transaction.atomic():
+        MarcaProceso.objects.update_or_create(nombre=PROCESO, defaults={'hasta': hasta})
+        if dias or completo:
+            validadores.registrar_cambio(ResumenDiarioDemora)
+    return Actualizacion(dias=len(dias), filas=filas, hasta=hasta)
+
+
+# ======================================================================
+# CONSULTA
+# ======================================================================
+
+def _percentiles_por_grupo(ordenadas, inicios, cantidades):
+    """
+    Percentiles (interpolación lineal, igual que np.percentile) de varios
+    grupos a la vez. `ordenadas` tiene los valores de cada grupo contiguos y
+    ordenados; devuelve una matriz grupos x PERCENTILES.
+    """
+    q = np.array(PERCENTILES, dtype=float) / 100
+    posicion = (cantidades[:, None] - 1) * q
+    abajo = np.floor(posicion).astype(np.int64)
+    arriba = np.ceil(posicion).astype(np.int64)
+    bajo = ordenadas[inicios[:, None] + abajo]
+    alto = ordenadas[inicios[:, None] + arriba]
+    return bajo + (alto - bajo) * (posicion - abajo)
+
+
+def parsear_mes(valor, nombre):
+    """'AAAA-MM' -> date del primer día del mes (None si viene vacío)."""
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m').date()
+    except ValueError:
+        raise ConsultaInvalida(f"'{nombre}' debe tener el formato AAAA-MM.")
+
+
+def percentiles(dimension, desde=None, hasta=None):
+    """
+    Percentiles de demora por mes de ingreso y valor de `dimension`, entre
+    los meses `desde` y `hasta` (fechas; inclusivos). Devuelve una lista de
+    dicts {mes, valor, nombre, cantidad, p50, p90, p99} con las demoras en
+    horas, ordenada por mes y valor.
+    """
+    if dimension not in DIMENSIONES:
+        raise ConsultaInvalida(f"Dimensión desconocida '{dimension}'. Opciones: {', '.join(DIMENSIONES)}.")
+
+    resumenes = ResumenDiarioDemora.objects.filter(dimension=dimension)
+    if desde:
+        resumenes = resumenes.filter(dia__gte=desde.replace(day=1))
+    if hasta:
+        siguiente = (hasta.replace(day=1) + timedelta(days=32)).replace(day=1)
+        resumenes = resumenes.filter(dia__lt=siguiente)
+    filas = list(resumenes.order_by().values_list('dia', 'valor', 'cantidad', 'duraciones'))
+    if not filas:
+        return []
+
+    dias, valores, cantidades, blobs = zip(*filas)
+    mes = np.array(dias, dtype='datetime64[M]').astype(np.int64)
+    valor = np.array(valores, dtype=np.int64)
+    muestras = np.frombuffer(b''.join(bytes(blob) for blob in blobs), dtype=_TIPO).astype(np.float64)
+
+    # Grupo (mes, valor) de cada fila del resumen y, con repeat, de cada muestra
+    claves, grupo_fila = np.unique(np.stack((mes, valor), axis=1), axis=0, return_inverse=True)
+    grupo = np.repeat(grupo_fila.ravel(), np.array(cantidades, dtype=np.int64))
+    ordenadas = muestras[np.lexsort((muestras, grupo))]
+    por_grupo = np.bincount(grupo, minlength=len(claves))
+    inicios = np.concatenate(([0], np.cumsum(por_grupo)[:-1]))
+    horas = _percentiles_por_grupo(ordenadas, inicios, por_grupo) / 3600
+
+    nombres = {}
+    if dimension in MODELOS:
+        nombres = {pk: str(obj) for pk, obj in MODELOS[dimension].objects.in_bulk(set(valores) - {0}).items()}
+    return [
+        {
+            'mes': str(np.datetime64(int(mes_grupo), 'M')),
+            'valor': int(valor_grupo) or None,
+            'nombre': nombres.get(int(valor_grupo), 'Sin asignar' if dimension != 'total' else 'Todas'),
+            'cantidad': int(cantidad),
+            **{f'p{p}': round(float(h), 2) for p, h in zip(PERCENTILES, fila_horas)},
+        }
+        for (mes_grupo, valor_grupo), cantidad, fila_horas in zip(claves, por_grupo, horas)
+    ]
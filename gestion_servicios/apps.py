@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GestionServiciosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gestion_servicios'
+
+    def ready(self):
+        # Conecta los receptores de señales (invalidación de índices, etc.)
+        from . import signals  # noqa: F401
@@ -0,0 +1,245 @@
+# gestion_servicios/autocompletado.py
+
+"""
+Índice en memoria (por proceso) para el autocompletado de catálogos.
+
+Cada catálogo (TipoEquipo, Marca, Modelo, Tecnico) se carga una sola vez en
+una lista ordenada de nombres normalizados más una tabla de trigramas. Las
+búsquedas por prefijo se resuelven con bisect y las de subcadena intersecando
+trigramas, sin tocar la base de datos. Los prefijos se ordenan antes que las
+coincidencias internas.
+
+Antes de responder se compara la versión del índice con una versión
+compartida por todos los procesos, así un alta o un cambio hecho en otro
+worker aparece en la próxima búsqueda:
+
+- Por defecto, el contador de cambios de la tabla (ContadorCambios, ver
+  validadores.py), que las señales incrementan en la misma transacción que
+  la escritura: una búsqueda por clave primaria.
+- Con AUTOCOMPLETADO_USAR_CACHE = True, una clave de versión en la caché de
+  Django, que también guarda los datos para que el proceso que recarga no
+  tenga que leer la tabla.
+
+Además, las señales post_save/post_delete (ver signals.py) invalidan el
+índice del propio proceso, y los bulk_create sin señales llaman a invalidar().
+
+Las vistas pasan el request a huella() (en @condicional) y a buscar(): la
+instantánea comprobada queda anotada en el request, así que cada pulsación
+lee la versión compartida una sola vez.
+"""
+
+import hashlib
+import threading
+from bisect import bisect_left
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import TipoEquipo, Marca, Modelo, Tecnico
+from .normalizacion import normalizar_nombre
+from . import validadores
+
+LIMITE_RESULTADOS = 10
+
+# Atributo del request con {nombre del índice: instantánea ya comprobada}
+_ATRIBUTO_REQUEST = '_instantaneas_autocompletado'
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class _Instantanea:
+    """Estado inmutable de un índice ya construido (se reemplaza entero al recargar)."""
+
+    def __init__(self, filas, version):
+        # filas: lista de (nombre_normalizado, id, texto_original) ordenada
+        self.filas = sorted(filas)
+        self.claves = [fila[0] for fila in self.filas]
+        self.version = version
+        # Huella del contenido: igual en todos los procesos que tengan los mismos datos
+        self.huella = hashlib.blake2b(repr(self.filas).encode(), digest_size=16).hexdigest()
+        self.trigramas = {}
+        for posicion, clave in enumerate(self.claves):
+            for trigrama in _trigramas(clave):
+                self.trigramas.setdefault(trigrama, set()).add(posicion)
+
+
+class IndiceCatalogo:
+    """Índice de prefijos/subcadenas sobre un campo de texto de un modelo."""
+
+    def __init__(self, nombre, modelo, campo):
+        self.nombre = nombre
+        self.modelo = modelo
+        self.campo = campo
+        self._instantanea = None
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Carga e invalidación
+    # ------------------------------------------------------------------
+
+    @property
+    def _usar_cache(self):
+        return getattr(settings, 'AUTOCOMPLETADO_USAR_CACHE', False)
+
+    @property
+    def _clave_version(self):
+        return f'autocompletado:{self.nombre}:version'
+
+    def invalidar(self):
+        """Marca el índice como obsoleto; se reconstruye en la próxima búsqueda."""
+        self._generacion += 1
+        if self._usar_cache:
+            cache.add(self._clave_version, 0, timeout=None)
+            try:
+                cache.incr(self._clave_version)
+            except ValueError:
+                # La clave expiró/desalojó entre add() e incr()
+                cache.set(self._clave_version, 1, timeout=None)
+
+    def _version_actual(self):
+        if self._usar_cache:
+            return (self._generacion, cache.get(self._clave_version, 0))
+        return (self._generacion, validadores.versiones(self.modelo)[self._tabla][0])
+
+    @property
+    def _tabla(self):
+        return self.modelo._meta.label_lower
+
+    def _cargar_filas(self, version):
+        if self._usar_cache:
+            clave_datos = f'autocompletado:{self.nombre}:{version[1]}:datos'
+            filas = cache.get(clave_datos)
+            if filas is None:
+                filas = self._filas_desde_db()
+                cache.set(clave_datos, filas, timeout=None)
+            return filas
+        return self._filas_desde_db()
+
+    def _filas_desde_db(self):
+        valores = self.modelo.objects.order_by().values_list('id', self.campo)
+        return [(normalizar_nombre(texto), pk, texto) for pk, texto in valores]
+
+    def _obtener_instantanea(self):
+        version = self._version_actual()
+        instantanea = self._instantanea
+        if instantanea is not None and instantanea.version == version:
+            return instantanea
+        with self._lock:
+            instantanea = self._instantanea
+            if instantanea is None or instantanea.version != version:
+                instantanea = _Instantanea(self._cargar_filas(version), version)
+                self._instantanea = instantanea
+        return instantanea
+
+    def _instantanea_de(self, request):
+        """_obtener_instantanea() una sola vez por request (None = sin anotar)."""
+        if request is None:
+            return self._obtener_instantanea()
+        comprobadas = request.__dict__.setdefault(_ATRIBUTO_REQUEST, {})
+        if self.nombre not in comprobadas:
+            comprobadas[self.nombre] = self._obtener_instantanea()
+        return comprobadas[self.nombre]
+
+    def huella(self, request=None):
+        """Identifica el contenido actual del índice (para el ETag de las vistas)."""
+        return self._instantanea_de(request).huella
+
+    # Variantes para las vistas async: con el índice al día solo se lee la
+    # versión (ORM async, sin cambiar de hilo); reconstruirlo lee la base en
+    # un hilo aparte.
+
+    async def _aversion_actual(self):
+        if self._usar_cache:
+            return (self._generacion, await cache.aget(self._clave_version, 0))
+        return (self._generacion, (await validadores.aversiones(self.modelo))[self._tabla][0])
+
+    async def _aobtener_instantanea(self):
+        instantanea = self._instantanea
+        if instantanea is not None and instantanea.version == await self._aversion_actual():
+            return instantanea
+        return await sync_to_async(self._obtener_instantanea)()
+
+    async def _ainstantanea_de(self, request):
+        if request is None:
+            return await self._aobtener_instantanea()
+        comprobadas = request.__dict__.setdefault(_ATRIBUTO_REQUEST, {})
+        if self.nombre not in comprobadas:
+            comprobadas[self.nombre] = await self._aobtener_instantanea()
+        return comprobadas[self.nombre]
+
+    async def ahuella(self, request=None):
+        return (await self._ainstantanea_de(request)).huella
+
+    # ------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------
+
+    def buscar(self, termino, limite=LIMITE_RESULTADOS, request=None):
+        """
+        Devuelve hasta `limite` tuplas (id, texto): primero prefijos, luego
+        subcadenas. Con `request`, reutiliza la instantánea que ya comprobó huella().
+        """
+        termino = normalizar_nombre(termino)
+        if not termino:
+            return []
+        return self._buscar_en(self._instantanea_de(request), termino, limite)
+
+    async def abuscar(self, termino, limite=LIMITE_RESULTADOS, request=None):
+        termino = normalizar_nombre(termino)
+        if not termino:
+            return []
+        return self._buscar_en(await self._ainstantanea_de(request), termino, limite)
+
+    @staticmethod
+    def _buscar_en(indice, termino, limite):
+        resultados = []
+
+        # 1) Prefijos: rango contiguo en la lista ordenada
+        posicion = bisect_left(indice.claves, termino)
+        while (posicion < len(indice.claves)
+               and indice.claves[posicion].startswith(termino)
+               and len(resultados) < limite):
+            _, pk, texto = indice.filas[posicion]
+            resultados.append((pk, texto))
+            posicion += 1
+
+        if len(resultados) >= limite:
+            return resultados
+
+        # 2) Subcadenas: candidatos por trigramas (o recorrido si el término es corto)
+        if len(termino) >= 3:
+            conjuntos = [indice.trigramas.get(t, set()) for t in _trigramas(termino)]
+            candidatos = sorted(set.intersection(*conjuntos)) if all(conjuntos) else []
+        else:
+            candidatos = range(len(indice.claves))
+
+        for posicion in candidatos:
+            clave = indice.claves[posicion]
+            if termino in clave and not clave.startswith(termino):
+                _, pk, texto = indice.filas[posicion]
+                resultados.append((pk, texto))
+                if len(resultados) >= limite:
+                    break
+
+        return resultados
+
+
+# ======================================================================
+# ÍNDICES DE LA APP (uno por catálogo)
+# ======================================================================
+
+TIPOS = IndiceCatalogo('tipos', TipoEquipo, 'nombre')
+MARCAS = IndiceCatalogo('marcas', Marca, 'nombre')
+MODELOS = IndiceCatalogo('modelos', Modelo, 'modelo')
+TECNICOS = IndiceCatalogo('tecnicos', Tecnico, 'nombre')
+
+INDICES_POR_MODELO = {
+    TipoEquipo: TIPOS,
+    Marca: MARCAS,
+    Modelo: MODELOS,
+    Tecnico: TECNICOS,
+}
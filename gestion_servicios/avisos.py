@@ -0,0 +1,236 @@
+# gestion_servicios/avisos.py
+
+"""
+Avisos por correo a los clientes, con una bandeja de salida en la base.
+
+Cuando una orden pasa a TERMINADA, encolar() crea un AvisoCliente en la misma
+transacción que el cambio (la señal transiciones.estado_cambiado, que envían
+save() y transiciones.aplicar()). El request nunca espera al servidor SMTP.
+Si la transacción se revierte, el aviso no existe; si se confirma, queda
+guardado aunque el proceso se caiga.
+
+`manage.py despachar_avisos` los envía con despachar():
+
+- Toma lotes de AVISOS_LOTE pendientes cuyo proximo_intento ya pasó y los
+  marca ENVIANDO por RESERVA. Si el despachador muere, al vencer la reserva
+  otro los vuelve a tomar.
+- Envía todos los lotes de la pasada por una sola conexión SMTP, y anota el
+  resultado al terminar cada lote.
+- Error temporal (4xx, conexión caída): reintento con espera exponencial,
+  AVISOS_REINTENTO_BASE * 2^(intentos - 1) segundos, hasta
+  AVISOS_REINTENTO_MAXIMO. Después de AVISOS_MAX_INTENTOS, FALLIDO. Error
+  permanente (5xx, destinatario rechazado): FALLIDO en el primer intento.
+
+Deduplicación: la restricción aviso_sin_enviar_unico admite un solo aviso
+sin enviar por orden y tipo. Guardar dos veces, o pasar TERMINADA ->
+EN_REPARACION -> TERMINADA antes del envío, no manda dos correos. La
+entrega es "al menos una vez": si el proceso muere entre el envío y la
+anotación, el aviso se reenvía con el mismo Message-ID, que sale del pk.
+"""
+
+import smtplib
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import DNS_NAME, EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import AvisoCliente, Reparacion
+
+RESERVA = timedelta(minutes=5)
+
+# tipo -> (asunto, plantilla del cuerpo)
+PLANTILLAS = {
+    'TERMINADA': (
+        "Su equipo está listo para retirar - OS N° {numero}",
+        'gestion_servicios/avisos/terminada.txt',
+    ),
+}
+
+
+def _ajuste(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+# ======================================================================
+# ENCOLADO
+# ======================================================================
+
+def encolar(tipo, reparacion_ids):
+    """
+    Crea los avisos `tipo` de las órdenes indicadas (las de clientes sin email
+    se omiten) dentro de la transacción en curso. Si una orden ya tiene un
+    aviso de ese tipo sin enviar, no se crea otro.
+    """
+    asunto, plantilla = PLANTILLAS[tipo]
+    ordenes = (
+        Reparacion.objects.filter(pk__in=list(reparacion_ids))
+        .exclude(cliente__email__isnull=True).exclude(cliente__email='')
+        .select_related('cliente', 'equipo__tipo', 'equipo__modelo__marca')
+    )
+    avisos = []
+    for rep in ordenes:
+        contexto = {
+            'taller': _ajuste('AVISOS_TALLER', 'Servicio Técnico'),
+            'reparacion': rep,
+            'numero': f'{rep.pk:06d}',
+            'cliente': rep.cliente,
+            'equipo': rep.equipo,
+        }
+        avisos.append(AvisoCliente(
+            reparacion=rep,
+            tipo=tipo,
+            destinatario=rep.cliente.email,
+            asunto=asunto.format(**contexto),
+            cuerpo=render_to_string(plantilla, contexto),
+        ))
+    # INSERT OR IGNORE contra el índice único parcial (PENDIENTE/ENVIANDO)
+    AvisoCliente.objects.bulk_create(avisos, ignore_conflicts=True)
+
+
+# ======================================================================
+# DESPACHO
+# ======================================================================
+
+@dataclass
+class ResultadoDespacho:
+    enviados: int = 0
+    reintentos: int = 0
+    fallidos: int = 0
+    lotes: int = 0
+    conexion_caida: bool = False
+
+    @property
+    def procesados(self):
+        return self.enviados + self.reintentos + self.fallidos
+
+
+def _tomar(cantidad):
+    """Reserva hasta `cantidad` avisos para este despachador y los devuelve."""
+    ahora = timezone.now()
+    disponibles = Q(estado__in=['PENDIENTE', 'ENVIANDO'], proximo_intento__lte=ahora)
+    with transaction.atomic():
+        pks = list(
+            AvisoCliente.objects.filter(disponibles)
+            .select_for_update(skip_locked=True)
+            .order_by('proximo_intento', 'pk')
+            .values_list('pk', flat=True)[:cantidad]
+        )
+        if not pks:
+            return []
+        AvisoCliente.objects.filter(pk__in=pks).update(estado='ENVIANDO', proximo_intento=ahora + RESERVA)
+    return list(AvisoCliente.objects.filter(pk__in=pks).order_by('pk'))
+
+
+def _mensaje(aviso, conexion):
+    return EmailMessage(
+        subject=aviso.asunto,
+        body=aviso.cuerpo,
+        to=[aviso.destinatario],
+        connection=conexion,
+        # Fijo por aviso: un reenvío tras una caída lleva el mismo identificador
+        headers={'Message-ID': f'<aviso.{aviso.pk}.{aviso.created_at:%Y%m%d%H%M%S}@{DNS_NAME}>'},
+    )
+
+
+def _es_permanente(error):
+    """Rechazos 5xx: reintentar no cambia el resultado."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(codigo >= 500 for codigo, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def _espera(intentos):
+    base = _ajuste('AVISOS_REINTENTO_BASE', 60)
+    return timedelta(seconds=min(base * 2 ** (intentos - 1), _ajuste('AVISOS_REINTENTO_MAXIMO', 6 * 3600)))
+
+
+def _fallar(aviso, error, ahora, resultado, permanente=False):
+    aviso.intentos += 1
+    aviso.ultimo_error = f'{type(error).__name__}: {error}'[:1000]
+    if permanente or aviso.intentos >= _ajuste('AVISOS_MAX_INTENTOS', 8):
+        aviso.estado = 'FALLIDO'
+        resultado.fallidos += 1
+    else:
+        aviso.estado = 'PENDIENTE'
+        aviso.proximo_intento = ahora + _espera(aviso.intentos)
+        resultado.reintentos += 1
+
+
+_CAMPOS_RESULTADO = ['estado', 'intentos', 'proximo_intento', 'ultimo_error', 'enviado_at']
+
+
+def _sin_conexion(avisos, error, resultado):
+    """Los avisos que no se llegaron a enviar vuelven a la cola, con su espera."""
+    ahora = timezone.now()
+    for aviso in avisos:
+        _fallar(aviso, error, ahora, resultado)
+    resultado.conexion_caida = True
+
+
+def _enviar_lote(avisos, conexion, resultado):
+    """Envía un lote por `conexion` (ya abierta) y anota el resultado de cada aviso."""
+    for indice, aviso in enumerate(avisos):
+        try:
+            conexion.send_messages([_mensaje(aviso, conexion)])
+        except smtplib.SMTPServerDisconnected as e:
+            _sin_conexion(avisos[indice:], e, resultado)
+            break
+        except smtplib.SMTPException as e:
+            # Rechazo de este mensaje; la conexión sigue sirviendo
+            _fallar(aviso, e, timezone.now(), resultado, permanente=_es_permanente(e))
+        except OSError as e:
+            # Socket caído o timeout (SMTPException también hereda de OSError: va después)
+            _sin_conexion(avisos[indice:], e, resultado)
+            break
+        else:
+            aviso.intentos += 1
+            aviso.estado = 'ENVIADO'
+            aviso.enviado_at = timezone.now()
+            aviso.ultimo_error = ''
+            resultado.enviados += 1
+    AvisoCliente.objects.bulk_update(avisos, _CAMPOS_RESULTADO)
+
+
+def despachar(lote=None, maximo_lotes=None):
+    """
+    Una pasada: envía lotes de pendientes por una sola conexión SMTP hasta
+    vaciar la cola (o `maximo_lotes`). Si no se puede conectar o se cae la
+    conexión, los avisos tomados vuelven a la cola con su espera y la pasada
+    termina (conexion_caida=True).
+    """
+    lote = lote or _ajuste('AVISOS_LOTE', 50)
+    resultado = ResultadoDespacho()
+    conexion = get_connection()
+    try:
+        while maximo_lotes is None or resultado.lotes < maximo_lotes:
+            avisos = _tomar(lote)
+            if not avisos:
+                break
+            resultado.lotes += 1
+            try:
+                # Se abre con el primer lote y queda abierta para los siguientes
+                conexion.open()
+            except OSError as e:
+                _sin_conexion(avisos, e, resultado)
+                AvisoCliente.objects.bulk_update(avisos, _CAMPOS_RESULTADO)
+                break
+            _enviar_lote(avisos, conexion, resultado)
+            if resultado.conexion_caida:
+                break
+    finally:
+        try:
+            conexion.close()
+        except OSError:
+            # QUIT sobre un socket ya roto; la conexión se descarta igual
+            pass
+    return resultado
+
+
+def pendientes():
+    """Avisos que esperan envío (incluye los que esperan un reintento)."""
+    return AvisoCliente.objects.filter(estado__in=['PENDIENTE', 'ENVIANDO']).count()
@@ -0,0 +1,259 @@
+# gestion_servicios/busqueda.py
+
+"""
+Búsqueda de texto completo sobre el historial de reparaciones.
+
+Indexa Reparacion.falla_reportada, Reparacion.informe_tecnico,
+Equipo.estado_general y Equipo.accesorios en una tabla virtual FTS5 de
+SQLite (una fila por reparación, rowid = id de la reparación). La mantienen
+sincronizada triggers, así que también cubre bulk_create() y update().
+
+Los resultados se ordenan por bm25 (la falla reportada pesa más que las
+notas del equipo) y se devuelven por páginas. Para que un término muy común
+("no enciende") no obligue a puntuar cientos de miles de filas, el ranking se
+hace sobre las VENTANA coincidencias más recientes, que FTS5 recorre por
+rowid y corta con LIMIT. En motores sin FTS5 se cae a una cadena de
+icontains, correcta pero lenta en historiales grandes.
+
+Ojo con las migraciones: SQLite recrea la tabla en cada ALTER, lo que borra
+sus triggers y falla si el trigger de otra tabla la referencia. Por eso
+signals.py quita los triggers en pre_migrate y los vuelve a crear en
+post_migrate. Los RunPython que modifiquen estas columnas deben terminar con
+reconstruir_indice().
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+
+from .models import Reparacion
+
+TABLA = 'gestion_servicios_busqueda_fts'
+COLUMNAS = ('falla_reportada', 'informe_tecnico', 'estado_general', 'accesorios')
+# Pesos de bm25 en el orden de COLUMNAS
+PESOS = (4.0, 2.0, 1.0, 1.0)
+
+TAMANIO_PAGINA = 20
+PAGINA_MAXIMA = 50
+# Coincidencias más recientes que entran al ranking (alcanza para todas las páginas)
+VENTANA = TAMANIO_PAGINA * PAGINA_MAXIMA
+
+_TABLA_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA} USING fts5(
+        {', '.join(COLUMNAS)},
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+_TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS gestion_servicios_busqueda_rep_ai
+    AFTER INSERT ON gestion_servicios_reparacion BEGIN
+        INSERT INTO {TABLA} (rowid, falla_reportada, informe_tecnico, estado_general, accesorios)
+        SELECT new.id, new.falla_reportada, new.informe_tecnico, e.estado_general, e.accesorios
+        FROM gestion_servicios_equipo e WHERE e.id = new.equipo_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS gestion_servicios_busqueda_rep_au
+    AFTER UPDATE OF falla_reportada, informe_tecnico, equipo_id ON gestion_servicios_reparacion BEGIN
+        UPDATE {TABLA} SET
+            falla_reportada = new.falla_reportada,
+            informe_tecnico = new.informe_tecnico,
+            estado_general = (SELECT estado_general FROM gestion_servicios_equipo WHERE id = new.equipo_id),
+            accesorios = (SELECT accesorios FROM gestion_servicios_equipo WHERE id = new.equipo_id)
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS gestion_servicios_busqueda_rep_ad
+    AFTER DELETE ON gestion_servicios_reparacion BEGIN
+        DELETE FROM {TABLA} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS gestion_servicios_busqueda_equipo_au
+    AFTER UPDATE OF estado_general, accesorios ON gestion_servicios_equipo BEGIN
+        UPDATE {TABLA} SET estado_general = new.estado_general, accesorios = new.accesorios
+        WHERE rowid IN (SELECT id FROM gestion_servicios_reparacion WHERE equipo_id = new.id);
+    END
+    """,
+]
+
+_CARGA_SQL = f"""
+    INSERT INTO {TABLA} (rowid, falla_reportada, informe_tecnico, estado_general, accesorios)
+    SELECT r.id, r.falla_reportada, r.informe_tecnico, e.estado_general, e.accesorios
+    FROM gestion_servicios_reparacion r JOIN gestion_servicios_equipo e ON e.id = r.equipo_id
+"""
+
+# Ranking por bm25 dentro de la ventana de coincidencias más recientes
+RANKING_SQL = f"""
+    SELECT rowid FROM (
+        SELECT rowid, bm25({TABLA}, {', '.join(str(peso) for peso in PESOS)}) AS puntaje
+        FROM {TABLA} WHERE {TABLA} MATCH %s ORDER BY rowid DESC LIMIT {VENTANA}
+    ) ORDER BY puntaje, rowid DESC LIMIT %s OFFSET %s
+"""
+
+# Fragmentos solo de las filas de la página (snippet() es caro)
+_FRAGMENTOS_SQL = f"""
+    SELECT rowid, snippet({TABLA}, -1, char(2), char(3), '…', 12)
+    FROM {TABLA} WHERE {TABLA} MATCH %s AND rowid IN (%s)
+"""
+
+_TRIGGERS = (
+    'gestion_servicios_busqueda_rep_ai', 'gestion_servicios_busqueda_rep_au',
+    'gestion_servicios_busqueda_rep_ad', 'gestion_servicios_busqueda_equipo_au',
+)
+
+
+# ======================================================================
+# MANTENIMIENTO DEL ÍNDICE
+# ======================================================================
+
+def disponible(conexion=connection):
+    return conexion.vendor == 'sqlite'
+
+
+def asegurar_indice(conexion=connection, triggers=True):
+    """
+    Crea la tabla FTS5 y sus triggers si faltan (idempotente). Si la tabla
+    es nueva, la carga con el historial existente. Dentro de una migración
+    se pasa triggers=False: los crea post_migrate, cuando ya no quedan ALTER.
+    """
+    if not disponible(conexion):
+        return
+    with conexion.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABLA])
+        existia = cursor.fetchone() is not None
+        cursor.execute(_TABLA_SQL)
+        for sql in _TRIGGERS_SQL if triggers else []:
+            cursor.execute(sql)
+        if not existia:
+            cursor.execute(_CARGA_SQL)
+
+
+def reconstruir_indice(conexion=connection):
+    """Vacía y recarga la tabla FTS5 desde las tablas de origen."""
+    if not disponible(conexion):
+        return
+    with conexion.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLA}")
+        cursor.execute(_CARGA_SQL)
+        cursor.execute(f"INSERT INTO {TABLA} ({TABLA}) VALUES ('optimize')")
+
+
+def quitar_triggers(conexion=connection):
+    if not disponible(conexion):
+        return
+    with conexion.cursor() as cursor:
+        for trigger in _TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+def eliminar_indice(conexion=connection):
+    if not disponible(conexion):
+        return
+    quitar_triggers(conexion)
+    with conexion.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLA}")
+
+
+# ======================================================================
+# CONSULTA
+# ======================================================================
+
+class BusquedaInvalida(ValueError):
+    """El texto no tiene ningún término buscable."""
+
+
+_TERMINOS = re.compile(r'"([^"]+)"|(\w+)')
+
+
+def terminos(texto):
+    """
+    Separa el texto del usuario en términos: palabras sueltas y frases entre
+    comillas ("pin de carga").
+    """
+    resultado = []
+    for frase, palabra in _TERMINOS.findall(texto or ''):
+        if frase:
+            palabras = re.findall(r'\w+', frase)
+            if palabras:
+                resultado.append(' '.join(palabras))
+        else:
+            resultado.append(palabra)
+    return resultado
+
+
+def consulta_fts(texto):
+    """
+    Traduce el texto del usuario a la sintaxis MATCH de FTS5: cada término
+    entre comillas (sin operadores del usuario) y todos obligatorios. La última
+    palabra suelta se busca como prefijo, para resultados mientras se escribe.
+    """
+    lista = terminos(texto)
+    if not lista:
+        raise BusquedaInvalida("Ingrese al menos una palabra para buscar.")
+    partes = [f'"{termino}"' for termino in lista]
+    if ' ' not in lista[-1]:
+        partes[-1] += '*'
+    return ' '.join(partes)
+
+
+@dataclass
+class PaginaBusqueda:
+    numero: int
+    resultados: list  # [(Reparacion, fragmento_html), ...]
+    hay_siguiente: bool
+
+
+def _fragmento(texto):
+    # Los marcadores \x02 / \x03 de snippet() se convierten en <mark> tras escapar
+    return escape(texto or '').replace('\x02', '<mark>').replace('\x03', '</mark>')
+
+
+def buscar_reparaciones(texto, pagina=1, tamanio=TAMANIO_PAGINA):
+    """
+    Devuelve la PaginaBusqueda `pagina` (desde 1) de las reparaciones que
+    contienen todos los términos, de mayor a menor relevancia.
+    """
+    if not 1 <= pagina <= PAGINA_MAXIMA:
+        raise BusquedaInvalida(f"La página debe estar entre 1 y {PAGINA_MAXIMA}.")
+    desde = (pagina - 1) * tamanio
+
+    if disponible():
+        consulta = consulta_fts(texto)
+        with connection.cursor() as cursor:
+            cursor.execute(RANKING_SQL, [consulta, tamanio + 1, desde])
+            filas = cursor.fetchall()
+            ids = [pk for pk, in filas[:tamanio]]
+            fragmentos = {}
+            if ids:
+                cursor.execute(_FRAGMENTOS_SQL % ('%s', ', '.join(['%s'] * len(ids))), [consulta, *ids])
+                fragmentos = {pk: _fragmento(fragmento) for pk, fragmento in cursor.fetchall()}
+    else:
+        lista = terminos(texto)
+        if not lista:
+            raise BusquedaInvalida("Ingrese al menos una palabra para buscar.")
+        filtro = Q()
+        for termino in lista:
+            filtro &= (
+                Q(falla_reportada__icontains=termino) | Q(informe_tecnico__icontains=termino)
+                | Q(equipo__estado_general__icontains=termino) | Q(equipo__accesorios__icontains=termino)
+            )
+        filas = list(
+            Reparacion.objects.filter(filtro).order_by('-fecha_ingreso', '-pk')
+            .values_list('pk', 'falla_reportada')[desde:desde + tamanio + 1]
+        )
+        ids = [pk for pk, _ in filas[:tamanio]]
+        fragmentos = {pk: escape(falla) for pk, falla in filas[:tamanio]}
+
+    reparaciones = Reparacion.objects.para_listado().in_bulk(ids)
+    return PaginaBusqueda(
+        numero=pagina,
+        resultados=[(reparaciones[pk], fragmentos.get(pk, '')) for pk in ids if pk in reparaciones],
+        hay_siguiente=len(filas) > tamanio,
+    )
@@ -0,0 +1,245 @@
+# gestion_servicios/catalogos.py
+
+"""
+Resolutor de catálogos (TipoEquipo, Marca, Modelo, Tecnico) compartido por
+los formularios de recepción y de taller.
+
+Convierte el valor que llega del autocompletado (un ID o un texto libre) en
+una instancia del catálogo:
+
+- Usa un LRU por proceso, así que los valores repetidos no consultan la base.
+- Busca por la clave normalizada, con una sola consulta ante un fallo. Es
+  única salvo en Tecnico: con homónimos se toma el de menor pk.
+- Si el texto no existe, lo crea dentro de un savepoint. Si otro mostrador lo
+  creó al mismo tiempo (IntegrityError), reintenta la lectura en lugar de fallar.
+- En Tecnico no hay índice único que frene el INSERT repetido: las altas se
+  serializan bloqueando la fila de ContadorCambios del catálogo y se relee
+  antes de insertar.
+"""
+
+import copy
+import logging
+import threading
+from collections import OrderedDict
+
+from django.db import IntegrityError, transaction
+
+from . import autocompletado
+from . import validadores
+from .models import TipoEquipo, Marca, Modelo, Tecnico
+from .normalizacion import normalizar_nombre
+
+CAPACIDAD_LRU = 2048
+REINTENTOS = 3
+
+logger = logging.getLogger('gestion_servicios.catalogos')
+
+
+class ValorInvalido(ValueError):
+    """El ID recibido no corresponde a ningún registro del catálogo."""
+
+
+class ResolutorCatalogo:
+    """Resuelve IDs o textos de un catálogo con caché LRU y alta atómica."""
+
+    def __init__(self, modelo, campo, campo_normalizado, por_marca=False, clave_unica=True,
+                 capacidad=CAPACIDAD_LRU):
+        self.modelo = modelo
+        self.campo = campo
+        self.campo_normalizado = campo_normalizado
+        self.por_marca = por_marca
+        # False si la base no impone unicidad sobre la clave normalizada
+        self.clave_unica = clave_unica
+        self.capacidad = capacidad
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # LRU
+    # ------------------------------------------------------------------
+
+    def _leer(self, clave):
+        with self._lock:
+            obj = self._cache.get(clave)
+            if obj is None:
+                return None
+            self._cache.move_to_end(clave)
+        # Copia: cada formulario recibe su propia instancia
+        return copy.copy(obj)
+
+    def _guardar(self, obj):
+        marca_id = obj.marca_id if self.por_marca else None
+        claves = [('pk', obj.pk), ('nombre', self._clave_nombre(getattr(obj, self.campo), marca_id))]
+        with self._lock:
+            for clave in claves:
+                self._cache[clave] = obj
+                self._cache.move_to_end(clave)
+            while len(self._cache) > self.capacidad:
+                self._cache.popitem(last=False)
+
+    def _clave_nombre(self, texto, marca_id=None):
+        return (marca_id, normalizar_nombre(texto))
+
+    def invalidar(self):
+        with self._lock:
+            self._cache.clear()
+
+    # ------------------------------------------------------------------
+    # Resolución
+    # ------------------------------------------------------------------
+
+    def por_id(self, pk):
+        """Devuelve la instancia con ese pk o lanza ValorInvalido."""
+        obj = self._leer(('pk', pk))
+        if obj is not None:
+            return obj
+        consulta = self.modelo.objects.select_related('marca') if self.por_marca else self.modelo.objects
+        try:
+            obj = consulta.get(pk=pk)
+        except self.modelo.DoesNotExist:
+            raise ValorInvalido(pk)
+        self._guardar(obj)
+        return obj
+
+    def por_nombre(self, texto, marca=None):
+        """Devuelve (o crea, en mayúsculas) el registro con ese nombre normalizado."""
+        clave = self._clave_nombre(texto, marca.pk if self.por_marca and marca else None)
+        obj = self._leer(('nombre', clave))
+        if obj is not None:
+            return obj
+
+        filtro = {self.campo_normalizado: clave[1]}
+        valores = {self.campo: ' '.join(texto.split()).upper()}
+        if self.por_marca:
+            filtro['marca'] = marca
+            valores['marca'] = marca
+
+        for intento in range(REINTENTOS):
+            obj = self.modelo.objects.filter(**filtro).order_by('pk').first()
+            if obj is not None:
+                creado = False
+                break
+            if not self.clave_unica:
+                obj, creado = self._crear_serializado(filtro, valores)
+                break
+            try:
+                # Savepoint: si otro proceso gana la carrera, solo se revierte este INSERT
+                with transaction.atomic():
+                    obj = self.modelo.objects.create(**valores)
+                creado = True
+                break
+            except IntegrityError:
+                if intento == REINTENTOS - 1:
+                    raise
+
+        if self.por_marca:
+            obj.marca = marca
+        if creado:
+            logger.info("%s creado automáticamente: %s", self.modelo._meta.verbose_name, getattr(obj, self.campo))
+            # Un alta solo se cachea si la transacción externa se confirma
+            transaction.on_commit(lambda: self._guardar(obj))
+        else:
+            self._guardar(obj)
+        return obj
+
+    def _crear_serializado(self, filtro, valores):
+        """
+        Alta para catálogos sin índice único, donde un IntegrityError nunca
+        avisaría de la carrera. El UPDATE de registrar_cambio() bloquea la fila
+        del contador del catálogo (en SQLite, el BEGIN IMMEDIATE ya tomó el
+        lock de escritura) y recién entonces se relee y se inserta.
+        """
+        with transaction.atomic():
+            validadores.registrar_cambio(self.modelo)
+            obj = self.modelo.objects.filter(**filtro).order_by('pk').first()
+            if obj is not None:
+                return obj, False
+            return self.modelo.objects.create(**valores), True
+
+    def resolver_muchos(self, textos, marcas=None):
+        """
+        Versión por lotes de por_nombre() para el ingreso masivo: resuelve
+        todos los textos con un número fijo de consultas (SELECT, INSERT de los
+        faltantes y SELECT de confirmación), sin importar cuántos sean.
+
+        `textos` es una lista de textos; si el catálogo es por marca, `marcas`
+        es la lista paralela de instancias de Marca. Devuelve un dict
+        (marca_id, nombre_normalizado) -> instancia.
+        """
+        marcas = marcas or [None] * len(textos)
+        pedidos = {}
+        for texto, marca in zip(textos, marcas):
+            clave = self._clave_nombre(texto, marca.pk if self.por_marca and marca else None)
+            pedidos.setdefault(clave, (' '.join(texto.split()).upper(), marca))
+        if not pedidos:
+            return {}
+
+        def _consultar(claves):
+            filtro = {f'{self.campo_normalizado}__in': {nombre for _, nombre in claves}}
+            if self.por_marca:
+                filtro['marca_id__in'] = {marca_id for marca_id, _ in claves}
+            encontrados = {}
+            for obj in self.modelo.objects.filter(**filtro).order_by('pk'):
+                clave = (obj.marca_id if self.por_marca else None, getattr(obj, self.campo_normalizado))
+                if clave in claves:
+                    encontrados.setdefault(clave, obj)
+            return encontrados
+
+        resultado = _consultar(set(pedidos))
+        faltantes = [clave for clave in pedidos if clave not in resultado]
+        if not faltantes:
+            return resultado
+        with transaction.atomic():
+            if not self.clave_unica:
+                # Ídem _crear_serializado(): se bloquea el contador y se relee
+                # antes del INSERT
+                validadores.registrar_cambio(self.modelo)
+                resultado.update(_consultar(set(faltantes)))
+                faltantes = [clave for clave in faltantes if clave not in resultado]
+            if faltantes:
+                nuevos = []
+                for clave in faltantes:
+                    texto, marca = pedidos[clave]
+                    obj = self.modelo(**{self.campo: texto, self.campo_normalizado: clave[1]})
+                    if self.por_marca:
+                        obj.marca = marca
+                    nuevos.append(obj)
+                # ignore_conflicts: si otro proceso insertó el mismo nombre, se relee abajo
+                self.modelo.objects.bulk_create(nuevos, ignore_conflicts=True)
+                resultado.update(_consultar(set(faltantes)))
+                # bulk_create no emite post_save: se invalidan los índices a mano
+                validadores.registrar_cambio(self.modelo)
+                transaction.on_commit(autocompletado.INDICES_POR_MODELO[self.modelo].invalidar)
+                transaction.on_commit(self.invalidar)
+        return resultado
+
+    def resolver(self, valor, marca=None):
+        """
+        Punto de entrada de los formularios: None si está vacío, por_id() si es
+        numérico y por_nombre() si es texto.
+        """
+        if valor is None:
+            return None
+        valor = str(valor).strip()
+        if not valor:
+            return None
+        if valor.isdigit():
+            return self.por_id(int(valor))
+        return self.por_nombre(valor, marca)
+
+
+# ======================================================================
+# RESOLUTORES DE LA APP (uno por catálogo)
+# ======================================================================
+
+TIPOS = ResolutorCatalogo(TipoEquipo, 'nombre', 'nombre_normalizado')
+MARCAS = ResolutorCatalogo(Marca, 'nombre', 'nombre_normalizado')
+MODELOS = ResolutorCatalogo(Modelo, 'modelo', 'modelo_normalizado', por_marca=True)
+TECNICOS = ResolutorCatalogo(Tecnico, 'nombre', 'nombre_normalizado', clave_unica=False)
+
+RESOLUTORES_POR_MODELO = {
+    TipoEquipo: TIPOS,
+    Marca: MARCAS,
+    Modelo: MODELOS,
+    Tecnico: TECNICOS,
+}
@@ -0,0 +1,214 @@
+# gestion_servicios/clientes.py
+
+"""
+Caché de lectura (read-through) para la búsqueda de clientes por clave.
+
+El formulario de recepción consulta el DNI en cada blur del campo, y el
+mismo cliente se busca varias veces mientras se completa la orden. La
+búsqueda pasa por dos niveles antes de llegar a la base:
+
+1. LRU por proceso con TTL corto: no sale del proceso (ni siquiera a la caché).
+2. Caché de Django (CACHES['default']) con TTL largo, solo si el backend es
+   compartido entre procesos (Redis, Memcached, base de datos...). Con
+   LocMemCache o DummyCache este nivel se saltea: sería una copia por
+   proceso que la invalidación de los demás workers nunca alcanza.
+
+También se cachea el "no existe", así que repetir un DNI nuevo tampoco
+consulta la base. signals.py invalida ambos niveles al guardar o borrar un
+Cliente; ingreso_lote lo hace a mano porque bulk_create no emite post_save.
+El LRU de otros procesos no se entera de la invalidación: por eso su TTL es
+de pocos segundos y es todo el desfase posible entre workers.
+
+Cada CLIENTES_CACHE_REPORTE búsquedas se registra una línea con los
+aciertos y fallos del proceso (logger gestion_servicios.clientes).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import Cliente
+from .normalizacion import normalizar_clave
+
+CAMPOS = ('id', 'nombre', 'direccion', 'telefono', 'celular', 'email')
+
+# Valor guardado para "no existe" (None es un valor válido en la caché de Django)
+_NO_EXISTE = 'no-existe'
+_FALTA = object()
+
+logger = logging.getLogger('gestion_servicios.clientes')
+
+
+class CacheClientes:
+    """
+    Búsqueda de clientes por clave normalizada con LRU local + caché de Django.
+
+    buscar() devuelve un dict con los datos del cliente (sin None, listos
+    para el JSON del formulario) o None si no existe.
+    """
+
+    def __init__(self, capacidad=1024, ttl_local=5, ttl_compartido=300, prefijo='cliente_clave', reporte=1000):
+        self.capacidad = capacidad
+        self.ttl_local = ttl_local
+        self.ttl_compartido = ttl_compartido
+        self.prefijo = prefijo
+        self.reporte = reporte
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.reiniciar_estadisticas()
+
+    # ------------------------------------------------------------------
+    # Estadísticas
+    # ------------------------------------------------------------------
+
+    def reiniciar_estadisticas(self):
+        self.aciertos_locales = 0
+        self.aciertos_compartidos = 0
+        self.fallos = 0
+        self._busquedas = 0
+
+    def estadisticas(self):
+        """Contadores de este proceso desde el arranque (o el último reinicio)."""
+        total = self.aciertos_locales + self.aciertos_compartidos + self.fallos
+        return {
+            'aciertos_locales': self.aciertos_locales,
+            'aciertos_compartidos': self.aciertos_compartidos,
+            'fallos': self.fallos,
+            'tasa_aciertos': (total - self.fallos) / total if total else 0.0,
+        }
+
+    def _contar_busqueda(self):
+        """Registra las estadísticas cada `reporte` búsquedas (0 = nunca)."""
+        with self._lock:
+            self._busquedas += 1
+            reportar = self.reporte and self._busquedas % self.reporte == 0
+        if reportar:
+            datos = self.estadisticas()
+            logger.info(
+                "Caché de clientes: %d aciertos locales, %d compartidos, %d fallos (%.1f%% de aciertos)",
+                datos['aciertos_locales'], datos['aciertos_compartidos'], datos['fallos'], datos['tasa_aciertos'] * 100,
+            )
+
+    # ------------------------------------------------------------------
+    # Niveles
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _compartida():
+        """True si CACHES['default'] la ven todos los procesos."""
+        return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+    def _clave_cache(self, normalizada):
+        return f'{self.prefijo}:{quote(normalizada, safe="")}'
+
+    def _leer_local(self, normalizada):
+        with self._lock:
+            entrada = self._local.get(normalizada)
+            if entrada is None:
+                return _FALTA
+            vence, valor = entrada
+            if vence < time.monotonic():
+                del self._local[normalizada]
+                return _FALTA
+            self._local.move_to_end(normalizada)
+            self.aciertos_locales += 1
+            return valor
+
+    def _guardar_local(self, normalizada, valor):
+        with self._lock:
+            self._local[normalizada] = (time.monotonic() + self.ttl_local, valor)
+            self._local.move_to_end(normalizada)
+            while len(self._local) > self.capacidad:
+                self._local.popitem(last=False)
+
+    def _filas(self, normalizada):
+        return Cliente.objects.filter(clave_normalizada=normalizada).order_by('pk').values(*CAMPOS)
+
+    @staticmethod
+    def _datos(fila):
+        if fila is None:
+            return _NO_EXISTE
+        datos = {campo: valor if valor is not None else '' for campo, valor in fila.items()}
+        datos['pk'] = datos.pop('id')
+        return datos
+
+    def _consultar(self, normalizada):
+        return self._datos(self._filas(normalizada).first())
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def buscar(self, clave):
+        normalizada = normalizar_clave(clave)
+        if not normalizada:
+            return None
+
+        valor = self._leer_local(normalizada)
+        if valor is _FALTA:
+            compartida = self._compartida()
+            valor = cache.get(self._clave_cache(normalizada), _FALTA) if compartida else _FALTA
+            if valor is _FALTA:
+                with self._lock:
+                    self.fallos += 1
+                valor = self._consultar(normalizada)
+                if compartida:
+                    cache.set(self._clave_cache(normalizada), valor, self.ttl_compartido)
+            else:
+                with self._lock:
+                    self.aciertos_compartidos += 1
+            self._guardar_local(normalizada, valor)
+
+        self._contar_busqueda()
+        return None if valor == _NO_EXISTE else dict(valor)
+
+    async def abuscar(self, clave):
+        """buscar() para vistas async: mismos niveles, con las APIs async de la caché y del ORM."""
+        normalizada = normalizar_clave(clave)
+        if not normalizada:
+            return None
+
+        valor = self._leer_local(normalizada)
+        if valor is _FALTA:
+            compartida = self._compartida()
+            valor = await cache.aget(self._clave_cache(normalizada), _FALTA) if compartida else _FALTA
+            if valor is _FALTA:
+                with self._lock:
+                    self.fallos += 1
+                valor = self._datos(await self._filas(normalizada).afirst())
+                if compartida:
+                    await cache.aset(self._clave_cache(normalizada), valor, self.ttl_compartido)
+            else:
+                with self._lock:
+                    self.aciertos_compartidos += 1
+            self._guardar_local(normalizada, valor)
+
+        self._contar_busqueda()
+        return None if valor == _NO_EXISTE else dict(valor)
+
+    def invalidar(self, *claves):
+        """Descarta de ambos niveles las claves dadas (originales o normalizadas)."""
+        normalizadas = {normalizar_clave(clave) for clave in claves if clave}
+        with self._lock:
+            for normalizada in normalizadas:
+                self._local.pop(normalizada, None)
+        if self._compartida():
+            cache.delete_many([self._clave_cache(normalizada) for normalizada in normalizadas])
+
+    def vaciar_local(self):
+        with self._lock:
+            self._local.clear()
+
+
+POR_CLAVE = CacheClientes(
+    ttl_local=getattr(settings, 'CLIENTES_CACHE_TTL_LOCAL', 5),
+    ttl_compartido=getattr(settings, 'CLIENTES_CACHE_TTL', 300),
+    reporte=getattr(settings, 'CLIENTES_CACHE_REPORTE', 1000),
+)
@@ -0,0 +1,154 @@
+# gestion_servicios/contadores.py
+
+"""
+Contadores de órdenes por estado y técnico para los badges del listado.
+
+Contar cada pestaña con COUNT(*) crece con el historial. En cambio,
+ContadorEstado guarda una fila por (estado, técnico) que se ajusta con
+UPDATE ... SET cantidad = cantidad ± 1 en la misma transacción que el alta o
+el cambio de estado, así que leer los badges es traer unas pocas filas.
+
+Quién los mueve:
+
+- save() / delete() de Reparacion: señales en signals.py, que leen de la
+  base la clave anterior de la fila. Las vistas que cambian el estado
+  envuelven el save() en transaction.atomic().
+- Escrituras que no pasan por save() (bulk_create, update): llaman a
+  sumar() / mover() a mano.
+- Baja de un técnico (SET_NULL en sus órdenes): quitar_tecnico(), desde
+  una señal pre_delete de Tecnico.
+
+`manage.py reconciliar_contadores` los recalcula desde Reparacion.
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import ContadorEstado, Reparacion
+
+# Igual que ReparacionListView.get_queryset(): TALLER es todo lo demás
+ESTADOS_TERMINADAS = ('TERMINADA', 'NO_REPARABLE')
+ESTADOS_ENTREGADAS = ('ENTREGADA',)
+PESTANIAS = ('TALLER', 'TERMINADAS', 'ENTREGADAS')
+
+
+def clave(estado, tecnico_id):
+    return (estado, tecnico_id or 0)
+
+
+def sumar(deltas):
+    """
+    Aplica {(estado, tecnico_id): delta} dentro de la transacción en curso.
+    Las claves se recorren ordenadas para que dos transacciones no se
+    bloqueen mutuamente en motores con bloqueo por fila.
+    """
+    for (estado, tecnico), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        actualizados = ContadorEstado.objects.filter(estado=estado, tecnico=tecnico).update(
+            cantidad=F('cantidad') + delta
+        )
+        if not actualizados:
+            try:
+                with transaction.atomic():
+                    ContadorEstado.objects.create(estado=estado, tecnico=tecnico, cantidad=delta)
+            except IntegrityError:
+                # Otro proceso creó la fila primero
+                ContadorEstado.objects.filter(estado=estado, tecnico=tecnico).update(
+                    cantidad=F('cantidad') + delta
+                )
+
+
+def mover(anterior, nueva):
+    """Una orden pasa de la clave `anterior` a `nueva` (None = alta o baja)."""
+    if anterior == nueva:
+        return
+    deltas = Counter()
+    if anterior is not None:
+        deltas[anterior] -= 1
+    if nueva is not None:
+        deltas[nueva] += 1
+    sumar(deltas)
+
+
+def sumar_altas(reparaciones):
+    """Altas hechas con bulk_create()."""
+    sumar(Counter(clave(rep.estado, rep.tecnico_asignado_id) for rep in reparaciones))
+
+
+def quitar_tecnico(tecnico_id):
+    """
+    Baja de un técnico: sus órdenes pasan a la clave sin técnico y se borran
+    sus filas. Se llama antes del UPDATE de on_delete=SET_NULL, que no emite
+    señales de Reparacion.
+    """
+    deltas = Counter()
+    for estado, cantidad in (
+        Reparacion.objects.filter(tecnico_asignado_id=tecnico_id).order_by()
+        .values_list('estado').annotate(cantidad=Count('pk'))
+    ):
+        deltas[clave(estado, None)] += cantidad
+    sumar(deltas)
+    ContadorEstado.objects.filter(tecnico=tecnico_id).delete()
+
+
+# ======================================================================
+# LECTURA
+# ======================================================================
+
+def por_estado():
+    """{estado: cantidad} sumando los técnicos."""
+    totales = Counter()
+    for estado, cantidad in ContadorEstado.objects.values_list('estado', 'cantidad'):
+        totales[estado] += cantidad
+    return dict(totales)
+
+
+def pestania(estado):
+    """Pestaña del listado en la que aparece una orden con ese estado."""
+    if estado in ESTADOS_TERMINADAS:
+        return 'TERMINADAS'
+    if estado in ESTADOS_ENTREGADAS:
+        return 'ENTREGADAS'
+    return 'TALLER'
+
+
+def por_pestania():
+    """Cantidades de las pestañas del listado: TALLER, TERMINADAS, ENTREGADAS."""
+    pestanias = Counter(dict.fromkeys(PESTANIAS, 0))
+    for estado, cantidad in por_estado().items():
+        pestanias[pestania(estado)] += cantidad
+    return dict(pestanias)
+
+
+# ======================================================================
+# RECONCILIACIÓN
+# ======================================================================
+
+def diferencias():
+    """{(estado, tecnico): (guardado, real)} de las claves que no coinciden."""
+    reales = {
+        clave(estado, tecnico): cantidad
+        for estado, tecnico, cantidad in Reparacion.objects.order_by()
+        .values_list('estado', 'tecnico_asignado').annotate(cantidad=Count('pk'))
+    }
+    guardados = {
+        (estado, tecnico): cantidad
+        for estado, tecnico, cantidad in ContadorEstado.objects.values_list('estado', 'tecnico', 'cantidad')
+    }
+    return {
+        llave: (guardados.get(llave, 0), reales.get(llave, 0))
+        for llave in guardados.keys() | reales.keys()
+        if guardados.get(llave, 0) != reales.get(llave, 0)
+    }
+
+
+@transaction.atomic
+def reconciliar():
+    """Corrige los contadores desfasados. Devuelve las diferencias encontradas."""
+    encontradas = diferencias()
+    sumar({llave: real - guardado for llave, (guardado, real) in encontradas.items()})
+    ContadorEstado.objects.filter(cantidad=0).delete()
+    return encontradas
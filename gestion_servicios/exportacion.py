@@ -0,0 +1,122 @@
+# gestion_servicios/exportacion.py
+
+"""
+Exportación de órdenes de servicio (CSV / JSONL) en memoria constante.
+
+Las filas se leen con QuerySet.iterator(chunk_size=...) sobre una proyección
+values() (sin instanciar modelos) y se van emitiendo línea por línea, tanto
+para StreamingHttpResponse (vista exportar_reparaciones) como para el comando
+`manage.py exportar_reparaciones`.
+"""
+
+import csv
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .models import Reparacion
+
+TAMANIO_LOTE = 2000
+FORMATOS = ('csv', 'jsonl')
+
+# (nombre de columna exportada, campo en values())
+COLUMNAS = [
+    ('orden', 'pk'),
+    ('fecha_ingreso', 'fecha_ingreso'),
+    ('fecha_entrega', 'fecha_entrega'),
+    ('estado', 'estado'),
+    ('cliente_clave', 'cliente__clave'),
+    ('cliente_nombre', 'cliente__nombre'),
+    ('serie_imei', 'equipo__serie_imei'),
+    ('tipo', 'equipo__tipo__nombre'),
+    ('marca', 'equipo__marca__nombre'),
+    ('modelo', 'equipo__modelo__modelo'),
+    ('tecnico', 'tecnico_asignado__nombre'),
+    ('mano_de_obra', 'mano_de_obra'),
+    ('total_repuestos', 'total_repuestos'),
+    ('total', 'total'),
+    ('saldo_final', 'saldo_final'),
+]
+
+
+class FiltroInvalido(ValueError):
+    """Algún parámetro de filtro de la exportación no es válido."""
+
+
+def _parsear_fecha(valor, nombre):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise FiltroInvalido(f"'{nombre}' debe tener el formato AAAA-MM-DD.")
+
+
+def consulta_exportacion(desde=None, hasta=None, estados=None):
+    """
+    Arma el queryset (values()) a exportar.
+
+    - desde / hasta: fechas 'AAAA-MM-DD' inclusivas sobre fecha_ingreso.
+    - estados: lista de códigos de Reparacion.ESTADO_CHOICES.
+    """
+    # total_repuestos / total son columnas de la orden (ver totales.py): sin agregaciones
+    queryset = Reparacion.objects.all()
+
+    # Se filtra con rangos sobre la columna (no con __date) para poder usar el índice
+    zona = timezone.get_current_timezone()
+    if desde:
+        inicio = datetime.combine(_parsear_fecha(desde, 'desde'), time.min)
+        queryset = queryset.filter(fecha_ingreso__gte=timezone.make_aware(inicio, zona))
+    if hasta:
+        fin = datetime.combine(_parsear_fecha(hasta, 'hasta') + timedelta(days=1), time.min)
+        queryset = queryset.filter(fecha_ingreso__lt=timezone.make_aware(fin, zona))
+
+    if estados:
+        validos = {codigo for codigo, _ in Reparacion.ESTADO_CHOICES}
+        desconocidos = set(estados) - validos
+        if desconocidos:
+            raise FiltroInvalido(f"Estado(s) desconocido(s): {', '.join(sorted(desconocidos))}.")
+        queryset = queryset.filter(estado__in=estados)
+
+    return queryset.order_by('pk').values(*[campo for _, campo in COLUMNAS])
+
+
+def _valor_plano(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, (Decimal, float)):
+        # SQLite devuelve las sumas sin escala fija: se normaliza a 2 decimales
+        return f"{Decimal(str(valor)):.2f}"
+    return str(valor)
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve la línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def lineas_csv(queryset, chunk_size=TAMANIO_LOTE):
+    """Genera el CSV línea por línea (encabezado incluido)."""
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow([nombre for nombre, _ in COLUMNAS])
+    for fila in queryset.iterator(chunk_size=chunk_size):
+        yield escritor.writerow([_valor_plano(fila[campo]) for _, campo in COLUMNAS])
+
+
+def lineas_jsonl(queryset, chunk_size=TAMANIO_LOTE):
+    """Genera un objeto JSON por línea."""
+    for fila in queryset.iterator(chunk_size=chunk_size):
+        registro = {nombre: fila[campo] for nombre, campo in COLUMNAS}
+        yield json.dumps(registro, default=_valor_plano, ensure_ascii=False) + '\n'
+
+
+def generar_lineas(formato, queryset, chunk_size=TAMANIO_LOTE):
+    if formato == 'csv':
+        return lineas_csv(queryset, chunk_size)
+    if formato == 'jsonl':
+        return lineas_jsonl(queryset, chunk_size)
+    raise FiltroInvalido(f"Formato desconocido '{formato}'. Opciones: {', '.join(FORMATOS)}.")
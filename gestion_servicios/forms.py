@@ -2,11 +2,27 @@
 
 from django import forms
 from .models import Cliente, Equipo, Reparacion, TipoEquipo, Marca, Modelo, Tecnico
+from . import catalogos
+from .normalizacion import normalizar_nombre
 
 # ======================================================================
 # 1. FORMULARIOS DE CREACIÓN (RECEPCIÓN)
 # ======================================================================
 
+class CamposCatalogoMixin:
+    """
+    Para formularios cuyas FK de catálogo (`campos_catalogo`) ya llegan
+    resueltas por catalogos.py: existen, así que Model.full_clean() no vuelve
+    a consultar su existencia.
+    """
+    campos_catalogo = ()
+
+    def _get_validation_exclusions(self):
+        exclusiones = super()._get_validation_exclusions()
+        exclusiones.update(self.campos_catalogo)
+        return exclusiones
+
+
 class ClienteForm(forms.ModelForm):
     """Formulario para crear/editar clientes."""
 
@@ -37,7 +53,7 @@ class ClienteForm(forms.ModelForm):
         
         return clave
 
-class EquipoForm(forms.ModelForm):
+class EquipoForm(CamposCatalogoMixin, forms.ModelForm):
     """
     Formulario para crear equipos con autocompletado.
     Los campos tipo, marca y modelo aceptan IDs (si se seleccionan de la lista)
@@ -68,6 +84,8 @@ class EquipoForm(forms.ModelForm):
             'fecha_compra': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
         }
     
+    campos_catalogo = ('tipo', 'marca', 'modelo')
+
     # ======================================================================
     # MÉTODOS CLEAN - CONVERSIÓN INTELIGENTE DE IDs/TEXTO A OBJETOS
     # ======================================================================
@@ -78,33 +96,10 @@ class EquipoForm(forms.ModelForm):
         - Si recibe un número: busca el registro existente
         - Si recibe texto: crea o busca el tipo (case-insensitive)
         """
-        tipo_valor = self.cleaned_data.get('tipo')
-        
-        # Si está vacío, retornar None
-        if not tipo_valor or tipo_valor == '':
-            return None
-        
-        # Convertir a string y limpiar espacios
-        tipo_valor = str(tipo_valor).strip()
-        
-        # CASO 1: Es un número (ID) → Buscar registro existente
-        if tipo_valor.isdigit():
-            try:
-                return TipoEquipo.objects.get(pk=int(tipo_valor))
-            except TipoEquipo.DoesNotExist:
-                raise forms.ValidationError("El tipo de equipo seleccionado no es válido.")
-        
-        # CASO 2: Es texto → Buscar o crear (case-insensitive)
         try:
-            # Intentar encontrar existente
-            tipo_obj = TipoEquipo.objects.get(nombre__iexact=tipo_valor)
-            print(f"✅ Tipo de equipo encontrado: {tipo_obj.nombre}")
-            return tipo_obj
-        except TipoEquipo.DoesNotExist:
-            # Si no existe, crear nuevo
-            tipo_obj = TipoEquipo.objects.create(nombre=tipo_valor.upper())
-            print(f"✅ Tipo de equipo creado automáticamente: {tipo_obj.nombre}")
-            return tipo_obj
+            return catalogos.TIPOS.resolver(self.cleaned_data.get('tipo'))
+        except catalogos.ValorInvalido:
+            raise forms.ValidationError("El tipo de equipo seleccionado no es válido.")
     
     def clean_marca(self):
         """
@@ -112,33 +107,10 @@ class EquipoForm(forms.ModelForm):
         - Si recibe un número: busca el registro existente
         - Si recibe texto: crea o busca la marca (case-insensitive)
         """
-        marca_valor = self.cleaned_data.get('marca')
-        
-        # Si está vacío, retornar None
-        if not marca_valor or marca_valor == '':
-            return None
-        
-        # Convertir a string y limpiar espacios
-        marca_valor = str(marca_valor).strip()
-        
-        # CASO 1: Es un número (ID) → Buscar registro existente
-        if marca_valor.isdigit():
-            try:
-                return Marca.objects.get(pk=int(marca_valor))
-            except Marca.DoesNotExist:
-                raise forms.ValidationError("La marca seleccionada no es válida.")
-        
-        # CASO 2: Es texto → Buscar o crear (case-insensitive)
         try:
-            # Intentar encontrar existente
-            marca_obj = Marca.objects.get(nombre__iexact=marca_valor)
-            print(f"✅ Marca encontrada: {marca_obj.nombre}")
-            return marca_obj
-        except Marca.DoesNotExist:
-            # Si no existe, crear nueva
-            marca_obj = Marca.objects.create(nombre=marca_valor.upper())
-            print(f"✅ Marca creada automáticamente: {marca_obj.nombre}")
-            return marca_obj
+            return catalogos.MARCAS.resolver(self.cleaned_data.get('marca'))
+        except catalogos.ValorInvalido:
+            raise forms.ValidationError("La marca seleccionada no es válida.")
     
     def clean_modelo(self):
         """
@@ -146,20 +118,17 @@ class EquipoForm(forms.ModelForm):
         - Si recibe un número: busca el registro existente
         - Si recibe texto: crea o busca el modelo asociado a la marca
         """
-        modelo_valor = self.cleaned_data.get('modelo')
+        modelo_valor = str(self.cleaned_data.get('modelo') or '').strip()
         
         # Si está vacío, retornar None
-        if not modelo_valor or modelo_valor == '':
+        if not modelo_valor:
             return None
         
-        # Convertir a string y limpiar espacios
-        modelo_valor = str(modelo_valor).strip()
-        
         # CASO 1: Es un número (ID) → Buscar registro existente
         if modelo_valor.isdigit():
             try:
-                return Modelo.objects.get(pk=int(modelo_valor))
-            except Modelo.DoesNotExist:
+                return catalogos.MODELOS.por_id(int(modelo_valor))
+            except catalogos.ValorInvalido:
                 raise forms.ValidationError("El modelo seleccionado no es válido.")
         
         # CASO 2: Es texto → Verificar que exista una marca primero
@@ -167,25 +136,21 @@ class EquipoForm(forms.ModelForm):
         if not marca:
             raise forms.ValidationError("Debe seleccionar o escribir una marca antes de especificar el modelo.")
         
-        # Intentar encontrar el modelo existente para esta marca (case-insensitive)
-        try:
-            modelo_obj = Modelo.objects.get(
-                modelo__iexact=modelo_valor,
-                marca=marca
-            )
-            print(f"✅ Modelo encontrado: {modelo_obj.modelo} (Marca: {marca.nombre})")
-            return modelo_obj
-        except Modelo.DoesNotExist:
-            # Si no existe, crearlo asociado a la marca
-            modelo_obj = Modelo.objects.create(
-                modelo=modelo_valor.upper(),
-                marca=marca
-            )
-            print(f"✅ Modelo creado automáticamente: {modelo_obj.modelo} (Marca: {marca.nombre})")
-            return modelo_obj
-
-
-class ReparacionForm(forms.ModelForm):
+        return catalogos.MODELOS.por_nombre(modelo_valor, marca)
+
+
+def _resolver_tecnico(valor):
+    """
+    Convierte el ID o crea un nuevo Tecnico si es texto.
+    Compartido por ReparacionForm y ReparacionUpdateForm.
+    """
+    try:
+        return catalogos.TECNICOS.resolver(valor)
+    except catalogos.ValorInvalido:
+        raise forms.ValidationError("El técnico seleccionado no es válido.")
+
+
+class ReparacionForm(CamposCatalogoMixin, forms.ModelForm):
     """Formulario para crear reparaciones (Orden de Servicio)."""
 
     # 🌟 PASO 1: Redefinir el campo como CharField con HiddenInput
@@ -209,45 +174,20 @@ class ReparacionForm(forms.ModelForm):
 
     # 🌟 PASO 2: Añadir el método 'clean_' para la conversión inteligente
     # (Copiado de la lógica de clean_marca)
+    campos_catalogo = ('tecnico_asignado',)
+
     def clean_tecnico_asignado(self):
         """
         Convierte el ID o crea un nuevo Tecnico si es texto.
         """
-        tecnico_valor = self.cleaned_data.get('tecnico_asignado')
-        
-        # Si está vacío, retornar None
-        if not tecnico_valor or tecnico_valor == '':
-            return None
-        
-        # Convertir a string y limpiar espacios
-        tecnico_valor = str(tecnico_valor).strip()
-        
-        # CASO 1: Es un número (ID) → Buscar registro existente
-        if tecnico_valor.isdigit():
-            try:
-                return Tecnico.objects.get(pk=int(tecnico_valor))
-            except Tecnico.DoesNotExist:
-                raise forms.ValidationError("El técnico seleccionado no es válido.")
-        
-        # CASO 2: Es texto → Buscar o crear (case-insensitive)
-        # Asumiendo que el modelo Tecnico tiene un campo 'nombre'
-        try:
-            # Intentar encontrar existente
-            tecnico_obj = Tecnico.objects.get(nombre__iexact=tecnico_valor)
-            print(f"✅ Técnico encontrado: {tecnico_obj.nombre}")
-            return tecnico_obj
-        except Tecnico.DoesNotExist:
-            # Si no existe, crear nuevo
-            tecnico_obj = Tecnico.objects.create(nombre=tecnico_valor.upper())
-            print(f"✅ Técnico creado automáticamente: {tecnico_obj.nombre}")
-            return tecnico_obj
+        return _resolver_tecnico(self.cleaned_data.get('tecnico_asignado'))
 
 
 # ======================================================================
 # 2. FORMULARIOS DE MODIFICACIÓN (TALLER/SEGUIMIENTO)
 # ======================================================================
 
-class ReparacionUpdateForm(forms.ModelForm):
+class ReparacionUpdateForm(CamposCatalogoMixin, forms.ModelForm):
     """Formulario para actualizar el estado de la reparación."""
 
     # 🌟 PASO 1: Redefinir el campo como CharField con HiddenInput
@@ -274,39 +214,28 @@ class ReparacionUpdateForm(forms.ModelForm):
             'saldo_final': forms.NumberInput(attrs={'class': 'form-control'}),
         }
 
+    campos_catalogo = ('tecnico_asignado',)
+
     # 🌟 PASO 2: Añadir el método 'clean_' para la conversión inteligente
     # (Exactamente el mismo que en ReparacionForm)
     def clean_tecnico_asignado(self):
-        tecnico_valor = self.cleaned_data.get('tecnico_asignado')
-        
-        if not tecnico_valor or tecnico_valor == '':
-            return None
-        
-        tecnico_valor = str(tecnico_valor).strip()
-        
-        # CASO 1: Es un número (ID)
-        if tecnico_valor.isdigit():
-            try:
-                # 🌟 Asegúrate de tener 'Tecnico' importado al inicio de forms.py
-                return Tecnico.objects.get(pk=int(tecnico_valor))
-            except Tecnico.DoesNotExist:
-                raise forms.ValidationError("El técnico seleccionado no es válido.")
-        
-        # CASO 2: Es texto (autocreación)
-        try:
-            tecnico_obj = Tecnico.objects.get(nombre__iexact=tecnico_valor)
-            print(f"✅ Técnico encontrado: {tecnico_obj.nombre}")
-            return tecnico_obj
-        except Tecnico.DoesNotExist:
-            tecnico_obj = Tecnico.objects.create(nombre=tecnico_valor.upper())
-            print(f"✅ Técnico creado automáticamente: {tecnico_obj.nombre}")
-            return tecnico_obj
+        return _resolver_tecnico(self.cleaned_data.get('tecnico_asignado'))
 
 
 # ======================================================================
 # 3. FORMULARIOS PARA MODALES (CREACIÓN RÁPIDA)
 # ======================================================================
 
+def _validar_nombre_unico(modelo, nombre, campo='nombre_normalizado', **filtro):
+    """
+    Rechaza nombres que ya existen salvo por mayúsculas/espacios (clave
+    normalizada). `filtro` acota la búsqueda, p. ej. a la marca de un modelo.
+    """
+    if modelo.objects.filter(**{campo: normalizar_nombre(nombre)}, **filtro).exists():
+        raise forms.ValidationError(f"Ya existe un registro con el nombre \"{nombre}\".")
+    return nombre
+
+
 class TipoEquipoForm(forms.ModelForm):
     """Formulario simple para crear TipoEquipo desde el modal."""
     class Meta:
@@ -319,6 +248,9 @@ class TipoEquipoForm(forms.ModelForm):
             })
         }
 
+    def clean_nombre(self):
+        return _validar_nombre_unico(TipoEquipo, self.cleaned_data.get('nombre'))
+
 
 class MarcaForm(forms.ModelForm):
     """Formulario simple para crear Marca desde el modal."""
@@ -332,6 +264,9 @@ class MarcaForm(forms.ModelForm):
             })
         }
 
+    def clean_nombre(self):
+        return _validar_nombre_unico(Marca, self.cleaned_data.get('nombre'))
+
 
 class ModeloForm(forms.ModelForm):
     """Formulario simple para crear Modelo desde el modal."""
@@ -344,7 +279,21 @@ class ModeloForm(forms.ModelForm):
                 'placeholder': 'Ej: Galaxy S21, iPhone 13, Pavilion...'
             })
         }
-        
+
+    def __init__(self, *args, marca=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # La marca llega aparte (la elegida en el formulario principal)
+        self.marca = marca
+        if marca is not None:
+            self.instance.marca = marca
+
+    def clean_modelo(self):
+        modelo = self.cleaned_data.get('modelo')
+        if self.marca is None:
+            return modelo
+        return _validar_nombre_unico(Modelo, modelo, 'modelo_normalizado', marca=self.marca)
+
+
 class TecnicoForm(forms.ModelForm):
     """Formulario simple para crear Tecnico desde el modal."""
     class Meta:
@@ -0,0 +1,40 @@
+# gestion_servicios/garantia.py
+
+"""
+Cálculo del vencimiento de garantía de un equipo.
+
+El plazo sale, en este orden, de Marca.meses_garantia, TipoEquipo.meses_garantia
+o settings.GARANTIA_MESES_POR_DEFECTO (12). Equipo guarda el resultado en la
+columna indexada vence_garantia, así que "equipos en garantía" es un filtro
+de rango en SQL en lugar de evaluar una propiedad fila por fila.
+"""
+
+import calendar
+from datetime import date
+
+from django.conf import settings
+
+
+def meses_por_defecto():
+    return getattr(settings, 'GARANTIA_MESES_POR_DEFECTO', 12)
+
+
+def sumar_meses(fecha, meses):
+    """fecha + meses, ajustando al último día si el mes destino es más corto (31/01 + 1 -> 28/02)."""
+    indice = fecha.month - 1 + meses
+    anio, mes = fecha.year + indice // 12, indice % 12 + 1
+    return date(anio, mes, min(fecha.day, calendar.monthrange(anio, mes)[1]))
+
+
+def meses_garantia(tipo=None, marca=None):
+    for catalogo in (marca, tipo):
+        if catalogo is not None and catalogo.meses_garantia is not None:
+            return catalogo.meses_garantia
+    return meses_por_defecto()
+
+
+def vencimiento(fecha_compra, tipo=None, marca=None):
+    """Último día cubierto, o None si no se conoce la fecha de compra."""
+    if fecha_compra is None:
+        return None
+    return sumar_meses(fecha_compra, meses_garantia(tipo, marca))
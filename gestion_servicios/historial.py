@@ -0,0 +1,148 @@
+# gestion_servicios/historial.py
+
+"""
+Historial de estados de las órdenes (solo se agregan filas).
+
+Reparacion.estado se pisa en cada cambio. TransicionEstado guarda además una
+fila por alta o cambio de estado, con la fecha, y con eso se calcula cuánto
+tiempo pasa cada orden en cada estado (ver permanencia()).
+
+Las filas salen de la señal transiciones.estado_cambiado, que envían tanto
+save() como transiciones.aplicar() y el ingreso por lote. Dentro de
+`with historial.registrando(usuario):` se acumulan y se escriben con un solo
+bulk_create al final del bloque, en la misma transacción que los cambios; si
+el bloque falla no se escribe nada. Fuera de un bloque se escriben en el
+momento.
+"""
+
+import contextlib
+import statistics
+import threading
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TransicionEstado
+
+_local = threading.local()
+
+
+def _pendientes():
+    # Pila de (usuario, eventos) de los bloques registrando() anidados del hilo
+    if not hasattr(_local, 'pila'):
+        _local.pila = []
+    return _local.pila
+
+
+@contextlib.contextmanager
+def registrando(usuario=None):
+    """
+    Transacción que acumula los eventos del historial y los escribe juntos al
+    salir. `usuario` se asigna a los eventos que llegan sin uno (los de save()).
+    Anidado, el bloque interior pasa sus eventos al exterior al terminar bien.
+    """
+    pila = _pendientes()
+    with transaction.atomic():
+        pila.append((usuario, []))
+        try:
+            yield
+        except BaseException:
+            pila.pop()
+            raise
+        _, eventos = pila.pop()
+        if pila:
+            pila[-1][1].extend(eventos)
+        elif eventos:
+            TransicionEstado.objects.bulk_create(eventos)
+
+
+def registrar(cambios, usuario=None):
+    """cambios: [(reparacion_id, estado_anterior o None si es alta, estado_nuevo), ...]"""
+    ahora = timezone.now()
+    pila = _pendientes()
+    if pila and usuario is None:
+        usuario = pila[-1][0]
+    eventos = [
+        TransicionEstado(
+            reparacion_id=pk,
+            estado_anterior=anterior or '',
+            estado_nuevo=nuevo,
+            usuario=usuario,
+            created_at=ahora,
+        )
+        for pk, anterior, nuevo in cambios
+    ]
+    if pila:
+        pila[-1][1].extend(eventos)
+    else:
+        TransicionEstado.objects.bulk_create(eventos)
+
+
+# ======================================================================
+# PERMANENCIA EN CADA ESTADO
+# ======================================================================
+
+def _inicio_del_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def permanencia(desde=None, hasta=None, incluir_actual=False):
+    """
+    Horas que las órdenes pasaron en cada estado:
+    {estado: {'cantidad', 'promedio_horas', 'mediana_horas', 'maximo_horas'}}.
+
+    Cada tramo va de una transición a la siguiente de la misma orden. Se
+    cuentan los tramos que empezaron entre los días `desde` y `hasta`
+    (fechas, inclusivas y opcionales). Con incluir_actual, el estado en el que
+    está cada orden cuenta hasta ahora (excepto ENTREGADA, que es final).
+
+    Las filas se recorren ordenadas por (reparacion, created_at), el orden
+    del índice historial_orden_fecha.
+    """
+    # Un tramo que empieza después de `desde` termina en una transición
+    # posterior a `desde`: ese filtro puede ir a SQL, el de `hasta` no
+    eventos = TransicionEstado.objects.order_by('reparacion_id', 'created_at', 'pk')
+    if desde is not None:
+        eventos = eventos.filter(created_at__gte=_inicio_del_dia(desde))
+    if hasta is not None:
+        hasta = _inicio_del_dia(hasta + timedelta(days=1))
+    ahora = timezone.now()
+
+    horas = defaultdict(list)
+
+    def sumar_tramo(estado, inicio, fin):
+        if hasta is None or inicio < hasta:
+            horas[estado].append((fin - inicio).total_seconds() / 3600)
+
+    anterior = None
+    filas = eventos.values_list('reparacion_id', 'estado_nuevo', 'created_at').iterator(chunk_size=5000)
+    for pk, estado, fecha in filas:
+        if anterior is not None:
+            if anterior[0] == pk:
+                sumar_tramo(anterior[1], anterior[2], fecha)
+            elif incluir_actual and anterior[1] != 'ENTREGADA':
+                sumar_tramo(anterior[1], anterior[2], ahora)
+        anterior = (pk, estado, fecha)
+    if anterior is not None and incluir_actual and anterior[1] != 'ENTREGADA':
+        sumar_tramo(anterior[1], anterior[2], ahora)
+
+    return {
+        estado: {
+            'cantidad': len(valores),
+            'promedio_horas': round(statistics.fmean(valores), 2),
+            'mediana_horas': round(statistics.median(valores), 2),
+            'maximo_horas': round(max(valores), 2),
+        }
+        for estado, valores in sorted(horas.items())
+    }
+
+
+def historial_de(reparacion_id):
+    """Transiciones de una orden, en orden."""
+    return list(
+        TransicionEstado.objects.filter(reparacion_id=reparacion_id)
+        .order_by('created_at', 'pk')
+        .values('estado_anterior', 'estado_nuevo', 'created_at', 'usuario_id')
+    )
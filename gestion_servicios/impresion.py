@@ -0,0 +1,286 @@
+# gestion_servicios/impresion.py
+
+"""
+Impresión de comprobantes de ingreso y etiquetas (PDF, ver pdf.py).
+
+- Las páginas se componen en un pool de procesos acotado
+  (IMPRESION_PROCESOS), así un lote grande no ocupa el hilo ni el event loop
+  que atiende requests. Las vistas son async y esperan el resultado sin
+  bloquear.
+- Admisión: hay IMPRESION_MAX_PENDIENTES cupos para todo el proceso y cada
+  tarea en el pool ocupa uno. Un pedido toma al entrar hasta un cupo por
+  proceso del pool (más no lo acelera) y reutiliza los suyos, en tandas,
+  hasta componer todas sus páginas: un lote de cualquier tamaño termina. Si
+  no consigue ni un cupo se responde "ocupado" en lugar de encolar sin
+  límite. Si el pedido falla o se cancela, sus tareas sin empezar se cancelan.
+- Cada página queda en disco (IMPRESION_CACHE_DIR) con una clave que incluye
+  pk, updated_at y el resto de los datos impresos: reimprimir la misma orden
+  sin cambios es leer un archivo, y cualquier cambio (la orden, el cliente o
+  el equipo) genera una página nueva.
+- El lote de "ingresos del día" reparte las páginas que faltan entre todos
+  los procesos del pool.
+
+Los datos se leen de la base en el proceso del request; al pool solo viajan
+dicts de textos.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, time, timedelta
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import pdf
+from .models import Reparacion
+
+TIPOS = tuple(pdf.DISENIOS)
+ORDENES_POR_TAREA = 20
+
+
+class ImpresionOcupada(Exception):
+    """Los IMPRESION_MAX_PENDIENTES cupos del pool están ocupados por otros pedidos."""
+
+
+# ======================================================================
+# DATOS
+# ======================================================================
+
+def ordenes_para_imprimir():
+    return Reparacion.objects.select_related('cliente', 'equipo__tipo', 'equipo__marca', 'equipo__modelo')
+
+
+def datos_orden(reparacion):
+    """Textos que imprime pdf.py (requiere ordenes_para_imprimir())."""
+    cliente, equipo = reparacion.cliente, reparacion.equipo
+    return {
+        'taller': getattr(settings, 'IMPRESION_TALLER', 'Servicio Técnico'),
+        'pk': reparacion.pk,
+        'updated_at': reparacion.updated_at.isoformat(),
+        'numero': f'{reparacion.pk:06d}',
+        'fecha_ingreso': timezone.localtime(reparacion.fecha_ingreso).strftime('%d/%m/%Y %H:%M'),
+        'cliente': cliente.nombre,
+        'clave': cliente.clave,
+        'telefono': cliente.celular or cliente.telefono or '',
+        'email': cliente.email or '',
+        'tipo': equipo.tipo.nombre if equipo.tipo else '',
+        'marca': equipo.marca.nombre if equipo.marca else '',
+        'modelo': equipo.modelo.modelo if equipo.modelo else '',
+        'serie_imei': equipo.serie_imei,
+        'vence_garantia': equipo.vence_garantia.strftime('%d/%m/%Y') if equipo.vence_garantia else '',
+        'falla_reportada': reparacion.falla_reportada,
+        'accesorios': equipo.accesorios or '',
+        'estado_general': equipo.estado_general or '',
+    }
+
+
+# ======================================================================
+# CACHÉ EN DISCO
+# ======================================================================
+
+def _directorio():
+    return Path(getattr(settings, 'IMPRESION_CACHE_DIR', Path(settings.BASE_DIR) / 'cache_impresion'))
+
+
+def _ruta(tipo, datos):
+    huella = hashlib.blake2b(repr(sorted(datos.items())).encode(), digest_size=10).hexdigest()
+    return _directorio() / tipo / f"{datos['pk']}-{huella}.pag"
+
+
+def _leer(tipo, datos):
+    try:
+        return _ruta(tipo, datos).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _guardar(tipo, datos, contenido):
+    ruta = _ruta(tipo, datos)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    # Escritura atómica: otro request puede estar leyendo la misma página
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, suffix='.tmp')
+    with os.fdopen(descriptor, 'wb') as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, ruta)
+    # Las versiones anteriores de la orden ya no se van a pedir
+    for vieja in ruta.parent.glob(f"{datos['pk']}-*.pag"):
+        if vieja != ruta:
+            vieja.unlink(missing_ok=True)
+
+
+# ======================================================================
+# POOL DE PROCESOS
+# ======================================================================
+
+_pool = None
+_pool_lock = threading.Lock()
+_cupos = None
+
+
+def _procesos():
+    return getattr(settings, 'IMPRESION_PROCESOS', None) or min(4, os.cpu_count() or 1)
+
+
+def _obtener_pool():
+    global _pool, _cupos
+    with _pool_lock:
+        if _pool is None:
+            # spawn: los hijos no heredan conexiones ni hilos del servidor (pdf.py no usa Django)
+            _pool = ProcessPoolExecutor(max_workers=_procesos(), mp_context=multiprocessing.get_context('spawn'))
+        if _cupos is None:
+            # Uno solo para la vida del proceso: sobrevive a cerrar_pool() con cupos tomados
+            _cupos = threading.BoundedSemaphore(getattr(settings, 'IMPRESION_MAX_PENDIENTES', 64))
+        return _pool
+
+
+def cerrar_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def _reservar(tareas):
+    """Toma sin esperar hasta un cupo por proceso (y por tarea); al menos uno o ImpresionOcupada."""
+    cupos = 0
+    while cupos < min(tareas, _procesos()) and _cupos.acquire(blocking=False):
+        cupos += 1
+    if tareas and not cupos:
+        raise ImpresionOcupada("Hay demasiadas impresiones en curso; reintente en unos segundos.")
+    return cupos
+
+
+def _liberar(cupos, pendientes):
+    """
+    Cancela las tareas `pendientes` y devuelve los `cupos` del pedido; el de
+    una tarea que ya está corriendo vuelve cuando termina.
+    """
+    for futuro in pendientes:
+        if not futuro.cancel():
+            cupos -= 1
+            futuro.add_done_callback(lambda _: _cupos.release())
+    for _ in range(cupos):
+        _cupos.release()
+
+
+def _tareas_faltantes(datos_por_pk, contenidos):
+    """
+    Las páginas que no están en `contenidos`, de a ORDENES_POR_TAREA órdenes;
+    así un lote grande se reparte entre todos los procesos.
+    """
+    faltantes = [(pk, datos) for pk, datos in datos_por_pk.items() if contenidos.get(pk) is None]
+    return [faltantes[inicio:inicio + ORDENES_POR_TAREA] for inicio in range(0, len(faltantes), ORDENES_POR_TAREA)]
+
+
+def _componer(tipo, tareas, anotar):
+    """
+    Compone `tareas` en el pool, con a lo sumo tantas en curso como cupos
+    tomó el pedido: cada una que termina deja su cupo a la siguiente.
+    `anotar` recibe cada resultado.
+    """
+    if not tareas:
+        return
+    pool = _obtener_pool()
+    cupos = _reservar(len(tareas))
+    restantes = iter(tareas)
+    pendientes = set()
+    try:
+        for tarea in islice(restantes, cupos):
+            pendientes.add(pool.submit(pdf.componer_lote, tipo, tarea))
+        while pendientes:
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                anotar(futuro.result())
+                for tarea in islice(restantes, 1):
+                    pendientes.add(pool.submit(pdf.componer_lote, tipo, tarea))
+    finally:
+        _liberar(cupos, pendientes)
+
+
+async def _acomponer(tipo, tareas, anotar):
+    """_componer() para el event loop: espera los resultados sin bloquearlo."""
+    if not tareas:
+        return
+    pool = _obtener_pool()
+    cupos = _reservar(len(tareas))
+    restantes = iter(tareas)
+    pendientes = {}  # futuro de asyncio -> futuro del pool
+
+    def enviar(tarea):
+        futuro = pool.submit(pdf.componer_lote, tipo, tarea)
+        pendientes[asyncio.wrap_future(futuro)] = futuro
+
+    try:
+        for tarea in islice(restantes, cupos):
+            enviar(tarea)
+        while pendientes:
+            listos, _ = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+            for espera in listos:
+                del pendientes[espera]
+                anotar(espera.result())
+                for tarea in islice(restantes, 1):
+                    enviar(tarea)
+    finally:
+        # También si se cancela el request (el cliente cerró la conexión)
+        _liberar(cupos, pendientes.values())
+
+
+def _anotador(tipo, datos_por_pk, contenidos):
+    """Guarda en disco y en `contenidos` las páginas que devuelve una tarea."""
+    def anotar(resultado):
+        for pk, contenido in resultado:
+            _guardar(tipo, datos_por_pk[pk], contenido)
+            contenidos[pk] = contenido
+    return anotar
+
+
+def _armar(tipo, pks, contenidos):
+    ancho, alto = pdf.TAMANIOS[tipo]
+    return pdf.documento([(ancho, alto, contenidos[pk]) for pk in pks])
+
+
+# ======================================================================
+# API
+# ======================================================================
+
+def _validar_tipo(tipo):
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de impresión desconocido '{tipo}'. Opciones: {', '.join(TIPOS)}.")
+
+
+async def apdf(reparaciones, tipo):
+    """
+    PDF (bytes) con una página `tipo` por orden, en el orden recibido; las
+    órdenes deben venir de ordenes_para_imprimir(). Para vistas async.
+    """
+    _validar_tipo(tipo)
+    datos_por_pk = {rep.pk: datos_orden(rep) for rep in reparaciones}
+    contenidos = {pk: _leer(tipo, datos) for pk, datos in datos_por_pk.items()}
+    await _acomponer(tipo, _tareas_faltantes(datos_por_pk, contenidos), _anotador(tipo, datos_por_pk, contenidos))
+    return _armar(tipo, list(datos_por_pk), contenidos)
+
+
+def pdf_ordenes(reparaciones, tipo):
+    """apdf() para código síncrono (comandos de gestión)."""
+    _validar_tipo(tipo)
+    datos_por_pk = {rep.pk: datos_orden(rep) for rep in reparaciones}
+    contenidos = {pk: _leer(tipo, datos) for pk, datos in datos_por_pk.items()}
+    _componer(tipo, _tareas_faltantes(datos_por_pk, contenidos), _anotador(tipo, datos_por_pk, contenidos))
+    return _armar(tipo, list(datos_por_pk), contenidos)
+
+
+def ingresos_del_dia(dia=None):
+    """Órdenes que ingresaron el día `dia` (hoy, en hora local), en orden de ingreso."""
+    dia = dia or timezone.localdate()
+    inicio = timezone.make_aware(datetime.combine(dia, time.min))
+    return ordenes_para_imprimir().filter(
+        fecha_ingreso__gte=inicio, fecha_ingreso__lt=inicio + timedelta(days=1)
+    ).order_by('fecha_ingreso', 'pk')
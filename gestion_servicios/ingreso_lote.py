@@ -0,0 +1,221 @@
+# gestion_servicios/ingreso_lote.py
+
+"""
+Ingreso masivo de equipos (entregas corporativas de 50-200 equipos).
+
+Recibe una lista de registros con la forma:
+
+    {
+        "cliente": {"clave": "30-12345678-9", "nombre": "ACME S.A.", "telefono": "...", "email": "..."},
+        "equipo": {"serie_imei": "...", "tipo": "NOTEBOOK", "marca": "HP", "modelo": "PAVILION",
+                   "accesorios": "...", "estado_general": "...", "fecha_compra": "AAAA-MM-DD"},
+        "falla": "No enciende",
+        "tecnico": "JUAN PEREZ"            # opcional
+    }
+
+y genera todas las órdenes dentro de una sola transacción, con un número fijo
+de consultas por lote: los catálogos, clientes y equipos se resuelven con
+consultas IN y los faltantes se insertan con bulk_create. Los registros
+inválidos no abortan el lote: se informan en el resultado de su fila.
+"""
+
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import catalogos
+from . import clientes as cache_clientes
+from . import contadores
+from . import transiciones
+from . import validadores
+from .models import Cliente, Equipo, Marca, Modelo, Reparacion, Tecnico, TipoEquipo
+from .normalizacion import normalizar_clave, normalizar_nombre
+
+MAXIMO_REGISTROS = 500
+
+CAMPOS_CLIENTE = ('nombre', 'direccion', 'telefono', 'celular', 'email')
+CAMPOS_EQUIPO = ('accesorios', 'estado_general')
+
+
+class LoteInvalido(ValueError):
+    """El lote completo no se puede procesar (formato o tamaño)."""
+
+
+def _texto(diccionario, campo):
+    valor = diccionario.get(campo)
+    return str(valor).strip() if valor is not None else ''
+
+
+def _validar_campos(instancia, campos, errores, renombrar=None):
+    """
+    Valida `campos` con las reglas del modelo (clean_fields: largo máximo,
+    email, etc.) y suma los errores a `errores`, con la clave del registro
+    (`renombrar`: campo del modelo -> campo del registro). Un campo que ya
+    tiene error conserva el primero. No consulta la base.
+    """
+    excluir = [campo.name for campo in instancia._meta.fields if campo.name not in campos]
+    try:
+        instancia.clean_fields(exclude=excluir)
+    except ValidationError as e:
+        for campo, mensajes in e.message_dict.items():
+            errores.setdefault((renombrar or {}).get(campo, campo), mensajes)
+
+
+def _validar_registro(registro):
+    """Devuelve (datos_normalizados, errores) de un registro individual."""
+    errores = {}
+    if not isinstance(registro, dict):
+        return None, {'__all__': ["El registro debe ser un objeto JSON."]}
+
+    cliente = registro.get('cliente') or {}
+    equipo = registro.get('equipo') or {}
+    datos = {
+        'clave': _texto(cliente, 'clave'),
+        'cliente': {campo: _texto(cliente, campo) or None for campo in CAMPOS_CLIENTE},
+        'serie_imei': _texto(equipo, 'serie_imei'),
+        'tipo': _texto(equipo, 'tipo'),
+        'marca': _texto(equipo, 'marca'),
+        'modelo': _texto(equipo, 'modelo'),
+        'equipo': {campo: _texto(equipo, campo) for campo in CAMPOS_EQUIPO},
+        'fecha_compra': None,
+        'falla': _texto(registro, 'falla'),
+        'tecnico': _texto(registro, 'tecnico'),
+    }
+
+    if not datos['clave']:
+        errores['clave'] = ["Este campo es obligatorio."]
+    if not datos['cliente']['nombre']:
+        errores['nombre'] = ["Este campo es obligatorio."]
+    if not datos['serie_imei']:
+        errores['serie_imei'] = ["Este campo es obligatorio."]
+    if not datos['falla']:
+        errores['falla'] = ["Este campo es obligatorio."]
+    if datos['modelo'] and not datos['marca']:
+        errores['modelo'] = ["Debe indicar una marca antes de especificar el modelo."]
+
+    fecha = _texto(equipo, 'fecha_compra')
+    if fecha:
+        try:
+            datos['fecha_compra'] = datetime.strptime(fecha, '%Y-%m-%d').date()
+        except ValueError:
+            errores['fecha_compra'] = ["Formato de fecha inválido (AAAA-MM-DD)."]
+
+    # Mismas reglas que los formularios de recepción
+    _validar_campos(Cliente(clave=datos['clave'], **datos['cliente']), ('clave',) + CAMPOS_CLIENTE, errores)
+    _validar_campos(
+        Equipo(serie_imei=datos['serie_imei'], **datos['equipo']), ('serie_imei',) + CAMPOS_EQUIPO, errores
+    )
+    for campo, instancia in [
+        ('tipo', TipoEquipo(nombre=datos['tipo'])),
+        ('marca', Marca(nombre=datos['marca'])),
+        ('modelo', Modelo(modelo=datos['modelo'])),
+        ('tecnico', Tecnico(nombre=datos['tecnico'])),
+    ]:
+        if datos[campo]:
+            _validar_campos(instancia, (instancia.campo_nombre,), errores, {instancia.campo_nombre: campo})
+
+    return datos, errores
+
+
+@transaction.atomic
+def ingresar_lote(registros):
+    """
+    Procesa el lote y devuelve una lista con el resultado de cada fila:
+    {'fila': i, 'ok': True, 'orden': pk} o {'fila': i, 'ok': False, 'errores': {...}}.
+    """
+    if not isinstance(registros, list):
+        raise LoteInvalido("Se esperaba una lista de registros.")
+    if len(registros) > MAXIMO_REGISTROS:
+        raise LoteInvalido(f"El lote supera el máximo de {MAXIMO_REGISTROS} registros.")
+
+    resultados = [None] * len(registros)
+    validos = []
+    for fila, registro in enumerate(registros):
+        datos, errores = _validar_registro(registro)
+        if errores:
+            resultados[fila] = {'fila': fila, 'ok': False, 'errores': errores}
+        else:
+            validos.append((fila, datos))
+
+    if not validos:
+        return resultados
+
+    # 1) Catálogos: una tanda de consultas por catálogo para todo el lote
+    tipos = catalogos.TIPOS.resolver_muchos([d['tipo'] for _, d in validos if d['tipo']])
+    marcas = catalogos.MARCAS.resolver_muchos([d['marca'] for _, d in validos if d['marca']])
+    tecnicos = catalogos.TECNICOS.resolver_muchos([d['tecnico'] for _, d in validos if d['tecnico']])
+
+    def _marca_de(datos):
+        return marcas.get((None, normalizar_nombre(datos['marca']))) if datos['marca'] else None
+
+    con_modelo = [d for _, d in validos if d['modelo']]
+    modelos = catalogos.MODELOS.resolver_muchos(
+        [d['modelo'] for d in con_modelo], [_marca_de(d) for d in con_modelo]
+    )
+
+    # 2) Clientes: los existentes (por clave normalizada) se reutilizan tal
+    # cual; los nuevos, en un INSERT
+    claves = {normalizar_clave(d['clave']) for _, d in validos}
+    clientes = {}
+    for cliente in Cliente.objects.filter(clave_normalizada__in=claves).order_by('pk'):
+        clientes.setdefault(cliente.clave_normalizada, cliente)
+    nuevos_clientes = {}
+    for _, datos in validos:
+        clave = normalizar_clave(datos['clave'])
+        if clave not in clientes and clave not in nuevos_clientes:
+            cliente = Cliente(clave=datos['clave'], **datos['cliente'])
+            cliente.preparar_campos_derivados()
+            nuevos_clientes[clave] = cliente
+    for cliente in Cliente.objects.bulk_create(list(nuevos_clientes.values())):
+        clientes[cliente.clave_normalizada] = cliente
+    if nuevos_clientes:
+        # bulk_create no emite post_save: descartar los "no existe" cacheados
+        transaction.on_commit(lambda: cache_clientes.POR_CLAVE.invalidar(*nuevos_clientes))
+
+    # 3) Equipos: ídem, por Nro. de Serie / IMEI
+    series = {d['serie_imei'] for _, d in validos}
+    equipos = {e.serie_imei: e for e in Equipo.objects.filter(serie_imei__in=series)}
+    nuevos_equipos = {}
+    for _, datos in validos:
+        serie = datos['serie_imei']
+        if serie in equipos or serie in nuevos_equipos:
+            continue
+        marca = _marca_de(datos)
+        equipo = Equipo(
+            serie_imei=serie,
+            tipo=tipos.get((None, normalizar_nombre(datos['tipo']))) if datos['tipo'] else None,
+            marca=marca,
+            modelo=modelos.get((marca.pk, normalizar_nombre(datos['modelo']))) if datos['modelo'] else None,
+            fecha_compra=datos['fecha_compra'],
+            **datos['equipo'],
+        )
+        # bulk_create no pasa por save(): calcular las columnas derivadas aquí
+        equipo.preparar_campos_derivados()
+        nuevos_equipos[serie] = equipo
+    for equipo in Equipo.objects.bulk_create(list(nuevos_equipos.values())):
+        equipos[equipo.serie_imei] = equipo
+
+    # 4) Órdenes de servicio
+    ordenes = [
+        Reparacion(
+            cliente=clientes[normalizar_clave(datos['clave'])],
+            equipo=equipos[datos['serie_imei']],
+            tecnico_asignado=tecnicos.get((None, normalizar_nombre(datos['tecnico']))) if datos['tecnico'] else None,
+            falla_reportada=datos['falla'],
+        )
+        for _, datos in validos
+    ]
+    Reparacion.objects.bulk_create(ordenes)
+    # bulk_create no emite post_save: contadores por estado, los de los ETag e historial, a mano
+    contadores.sumar_altas(ordenes)
+    transiciones.estado_cambiado.send(
+        sender=Reparacion, cambios=[(orden.pk, None, orden.estado) for orden in ordenes], usuario=None
+    )
+    validadores.registrar_cambio(
+        Reparacion, *([Cliente] if nuevos_clientes else []), *([Equipo] if nuevos_equipos else [])
+    )
+
+    for (fila, _), orden in zip(validos, ordenes):
+        resultados[fila] = {'fila': fila, 'ok': True, 'orden': orden.pk}
+    return resultados
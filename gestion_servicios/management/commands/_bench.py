@@ -0,0 +1,50 @@
+# gestion_servicios/management/commands/_bench.py
+
+"""
+Utilidades compartidas por los comandos bench_* / stress_*.
+(El guion bajo evita que Django lo registre como comando.)
+"""
+
+import contextlib
+import multiprocessing
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.db import connections
+
+
+@contextlib.contextmanager
+def base_temporal(opciones=None):
+    """
+    Apunta la conexión 'default' a un archivo SQLite temporal recién migrado,
+    para que los benchmarks nunca escriban sobre la base real.
+    `opciones` reemplaza DATABASES['default']['OPTIONS'] mientras dure el bloque.
+    """
+    conexion = connections['default']
+    original = dict(conexion.settings_dict)
+    connections.close_all()
+
+    with tempfile.TemporaryDirectory(prefix='bench_st_') as directorio:
+        conexion.settings_dict['NAME'] = os.path.join(directorio, 'bench.sqlite3')
+        if opciones is not None:
+            conexion.settings_dict['OPTIONS'] = dict(opciones)
+        try:
+            call_command('migrate', verbosity=0, interactive=False)
+            yield conexion.settings_dict['NAME']
+        finally:
+            connections.close_all()
+            conexion.settings_dict.clear()
+            conexion.settings_dict.update(original)
+
+
+def ejecutar_en_procesos(funcion, procesos, *args):
+    """
+    Ejecuta funcion(indice, *args) en `procesos` procesos hijos (fork) y
+    devuelve la lista de resultados. Las conexiones se cierran antes del fork
+    para que cada hijo abra la suya.
+    """
+    connections.close_all()
+    contexto = multiprocessing.get_context('fork')
+    with contexto.Pool(procesos) as pool:
+        return pool.starmap(funcion, [(indice, *args) for indice in range(procesos)])
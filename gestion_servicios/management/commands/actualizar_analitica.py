@@ -0,0 +1,53 @@
+# gestion_servicios/management/commands/actualizar_analitica.py
+
+"""
+Actualiza el resumen diario de demoras (ver analitica.py) con las órdenes
+modificadas desde la última corrida. Pensado para cron, p. ej. cada 15 minutos:
+
+    python manage.py actualizar_analitica
+    python manage.py actualizar_analitica --reconstruir
+    python manage.py actualizar_analitica --mostrar tecnico --desde 2025-01 --hasta 2025-06
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion_servicios import analitica
+
+
+class Command(BaseCommand):
+    help = "Procesa las órdenes nuevas o modificadas en el resumen diario de demoras."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reconstruir', action='store_true',
+                            help="Recalcula todo el historial (p. ej. después de borrar órdenes).")
+        parser.add_argument('--mostrar', choices=list(analitica.DIMENSIONES),
+                            help="Después de actualizar, muestra los percentiles por mes de esta dimensión.")
+        parser.add_argument('--desde', help="Mes inicial a mostrar (AAAA-MM).")
+        parser.add_argument('--hasta', help="Mes final a mostrar (AAAA-MM).")
+
+    def handle(self, *args, **opciones):
+        try:
+            desde = analitica.parsear_mes(opciones['desde'], 'desde')
+            hasta = analitica.parsear_mes(opciones['hasta'], 'hasta')
+        except analitica.ConsultaInvalida as e:
+            raise CommandError(str(e))
+
+        inicio = time.perf_counter()
+        resultado = analitica.actualizar(reconstruir=opciones['reconstruir'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado.dias} días recalculados, {resultado.filas} filas de resumen "
+            f"(marca de agua {resultado.hasta:%Y-%m-%d %H:%M}) en {time.perf_counter() - inicio:.2f} s."
+        ))
+
+        if opciones['mostrar']:
+            inicio = time.perf_counter()
+            filas = analitica.percentiles(opciones['mostrar'], desde, hasta)
+            self.stdout.write(f"\n{'mes':<8} {'valor':<30} {'órdenes':>8} {'p50 h':>9} {'p90 h':>9} {'p99 h':>9}")
+            for fila in filas:
+                self.stdout.write(
+                    f"{fila['mes']:<8} {fila['nombre'][:30]:<30} {fila['cantidad']:8d} "
+                    f"{fila['p50']:9.1f} {fila['p90']:9.1f} {fila['p99']:9.1f}"
+                )
+            self.stdout.write(f"({len(filas)} grupos en {(time.perf_counter() - inicio) * 1000:.1f} ms)")
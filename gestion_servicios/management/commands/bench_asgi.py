@@ -0,0 +1,240 @@
+# gestion_servicios/management/commands/bench_asgi.py
+
+"""
+Carga de búsquedas "por tecla" del mostrador contra las dos pilas, en el
+mismo proceso y sobre una base temporal:
+
+- WSGI: WSGIHandler con las vistas síncronas de views.py, atendido por un
+  pool de --hilos hilos (como un servidor WSGI con hilos).
+- ASGI: el `application` de servicio_tecnico/asgi.py con ASGI_VISTAS_ASYNC
+  (vistas_async.py), con un cliente ASGI mínimo que habla el protocolo
+  directamente.
+
+En ambos casos hay --concurrencia clientes simultáneos que repiten la misma
+secuencia de requests: autocompletado de catálogos, cliente por DNI, serie
+por prefijo y la búsqueda combinada de recepción. Se informan requests/s y
+latencias p50/p99 (la latencia incluye la espera por un hilo libre).
+
+En proceso no hay red que esperar, así que mide el costo de CPU de cada
+pila. Bajo ASGI cada middleware síncrono de Django (sesión, CSRF, auth,
+mensajes...) se adapta con un salto al hilo compartido de sync_to_async; con
+--middleware-minimo se ve cuánto de la diferencia viene de ahí.
+
+    python manage.py bench_asgi --concurrencia 300 --requests 6000 --hilos 32
+"""
+
+import asyncio
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from gestion_servicios import autocompletado
+from gestion_servicios import clientes as cache_clientes
+from gestion_servicios.models import Cliente, Equipo, Marca, Modelo, Reparacion, Tecnico, TipoEquipo
+from gestion_servicios.normalizacion import normalizar_nombre
+
+from ._bench import base_temporal
+
+HOST = 'localhost'
+
+
+def _catalogo(clase, **campos):
+    # bulk_create no pasa por save(): la columna normalizada, a mano
+    fila = clase(**campos)
+    setattr(fila, fila.campo_normalizado, normalizar_nombre(getattr(fila, fila.campo_nombre)))
+    return fila
+
+
+def _crear_datos(cantidad):
+    tipos = TipoEquipo.objects.bulk_create([
+        _catalogo(TipoEquipo, nombre=nombre) for nombre in ('CELULAR', 'NOTEBOOK', 'TABLET', 'CONSOLA', 'SMARTWATCH')
+    ])
+    marcas = Marca.objects.bulk_create([_catalogo(Marca, nombre=f'MARCA {numero:03d}') for numero in range(200)])
+    modelos = Modelo.objects.bulk_create([
+        _catalogo(Modelo, modelo=f'MODELO {numero:04d}', marca=marcas[numero % len(marcas)]) for numero in range(2000)
+    ])
+    tecnicos = Tecnico.objects.bulk_create([_catalogo(Tecnico, nombre=f'TECNICO {numero:02d}') for numero in range(30)])
+    clientes = []
+    for numero in range(cantidad):
+        cliente = Cliente(clave=f'{30000000 + numero}', nombre=f'Cliente {numero}')
+        cliente.preparar_campos_derivados()
+        clientes.append(cliente)
+    clientes = Cliente.objects.bulk_create(clientes)
+    equipos = []
+    for numero in range(cantidad):
+        equipo = Equipo(
+            serie_imei=f'35{numero:013d}', tipo=tipos[numero % len(tipos)],
+            marca=marcas[numero % len(marcas)], modelo=modelos[numero % len(modelos)],
+        )
+        equipo.preparar_campos_derivados()
+        equipos.append(equipo)
+    equipos = Equipo.objects.bulk_create(equipos)
+    Reparacion.objects.bulk_create([
+        Reparacion(cliente=cliente, equipo=equipo, falla_reportada='No enciende',
+                   tecnico_asignado=tecnicos[numero % len(tecnicos)])
+        for numero, (cliente, equipo) in enumerate(zip(clientes, equipos))
+    ])
+    for indice in autocompletado.INDICES_POR_MODELO.values():
+        indice.invalidar()
+    cache_clientes.POR_CLAVE.vaciar_local()
+
+
+def _requests(cantidad, clientes, semilla=7):
+    """(ruta, query) de una sesión de tipeo: prefijos crecientes de cada campo."""
+    azar = random.Random(semilla)
+    pedidos = []
+    while len(pedidos) < cantidad:
+        numero = azar.randrange(clientes)
+        serie = f'35{numero:013d}'
+        marca = f'marca {azar.randrange(200):03d}'
+        modelo = f'modelo {azar.randrange(2000):04d}'
+        pedidos += [('/servicios/equipo/buscar-tipo/', f'term={t}') for t in ('c', 'ce', 'cel')]
+        pedidos += [('/servicios/equipo/buscar-marca/', f'term={marca[:largo]}') for largo in (3, 7, 9)]
+        pedidos += [('/servicios/equipo/buscar-modelo/', f'term={modelo[:largo]}') for largo in (4, 8, 11)]
+        pedidos += [('/servicios/tecnico/buscar/', 'term=tec')]
+        pedidos += [('/servicios/api/buscar_cliente/', f'clave={30000000 + numero}')]
+        pedidos += [('/servicios/equipo/buscar-serie/', f'term={serie[-largo:]}') for largo in (4, 6, 8)]
+        pedidos += [('/servicios/equipo/buscar/', f'imei={serie}')]
+        pedidos += [('/servicios/api/buscar-ingreso/', f'clave={30000000 + numero}&imei={serie}')]
+    return pedidos[:cantidad]
+
+
+# ----------------------------------------------------------------------
+# Clientes en proceso
+# ----------------------------------------------------------------------
+
+def _llamar_wsgi(handler, ruta, query):
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': ruta, 'QUERY_STRING': query, 'HTTP_HOST': HOST}
+    setup_testing_defaults(environ)
+    environ['wsgi.input'] = BytesIO(b'')
+    estado = []
+    cuerpo = handler(environ, lambda status, headers, exc_info=None: estado.append(status))
+    try:
+        b''.join(cuerpo)
+    finally:
+        if hasattr(cuerpo, 'close'):
+            cuerpo.close()
+    return int(estado[0].split()[0])
+
+
+async def _llamar_asgi(application, ruta, query):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': ruta, 'raw_path': ruta.encode(),
+        'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', HOST.encode())],
+        'client': ('127.0.0.1', 50000), 'server': (HOST, 80),
+    }
+    terminado = asyncio.Event()
+    pedido_enviado = False
+    estado = []
+
+    async def recibir():
+        nonlocal pedido_enviado
+        if not pedido_enviado:
+            pedido_enviado = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Django escucha la desconexión mientras atiende: responder solo al final
+        await terminado.wait()
+        return {'type': 'http.disconnect'}
+
+    async def enviar(mensaje):
+        if mensaje['type'] == 'http.response.start':
+            estado.append(mensaje['status'])
+        elif mensaje['type'] == 'http.response.body' and not mensaje.get('more_body'):
+            terminado.set()
+
+    await application(scope, recibir, enviar)
+    return estado[0]
+
+
+async def _correr(llamar, pedidos, concurrencia):
+    """`concurrencia` clientes que se reparten los pedidos; devuelve (segundos, latencias_ms, errores)."""
+    cola = iter(pedidos)
+    latencias = []
+    errores = 0
+
+    async def cliente():
+        nonlocal errores
+        for ruta, query in cola:
+            inicio = time.perf_counter()
+            estado = await llamar(ruta, query)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            if estado >= 400 and estado != 404:
+                errores += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    return time.perf_counter() - inicio, latencias, errores
+
+
+def _medir_wsgi(pedidos, concurrencia, hilos):
+    handler = WSGIHandler()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        async def llamar(ruta, query):
+            return await asyncio.get_running_loop().run_in_executor(pool, _llamar_wsgi, handler, ruta, query)
+        return asyncio.run(_correr(llamar, pedidos, concurrencia))
+
+
+def _medir_asgi(pedidos, concurrencia):
+    from servicio_tecnico.asgi import ASGIHandlerServicio
+
+    # Instancia nueva: toma el MIDDLEWARE vigente (--middleware-minimo)
+    application = ASGIHandlerServicio()
+
+    async def llamar(ruta, query):
+        return await _llamar_asgi(application, ruta, query)
+    return asyncio.run(_correr(llamar, pedidos, concurrencia))
+
+
+class Command(BaseCommand):
+    help = "Compara requests/s y p99 de las búsquedas del mostrador bajo WSGI (síncronas) y ASGI (async)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=5000, help="Clientes/equipos de la base temporal.")
+        parser.add_argument('--requests', type=int, default=6000)
+        parser.add_argument('--concurrencia', type=int, default=300)
+        parser.add_argument('--hilos', type=int, default=32, help="Hilos del pool WSGI.")
+        parser.add_argument(
+            '--middleware-minimo', action='store_true',
+            help="Ambas pilas solo con CommonMiddleware, para aislar el costo de adaptar "
+                 "los middleware síncronos (sesión, auth, mensajes...) bajo ASGI.",
+        )
+
+    def handle(self, *args, **opciones):
+        pedidos = _requests(opciones['requests'], opciones['clientes'])
+        calentamiento = pedidos[:200]
+
+        ajustes = {'DEBUG': False, 'ALLOWED_HOSTS': [HOST], 'ASGI_VISTAS_ASYNC': True}
+        if opciones['middleware_minimo']:
+            ajustes['MIDDLEWARE'] = ['django.middleware.common.CommonMiddleware']
+
+        with base_temporal(), override_settings(**ajustes):
+            _crear_datos(opciones['clientes'])
+            resultados = {}
+            for nombre, medir in (
+                ('WSGI', lambda p: _medir_wsgi(p, opciones['concurrencia'], opciones['hilos'])),
+                ('ASGI', lambda p: _medir_asgi(p, opciones['concurrencia'])),
+            ):
+                cache_clientes.POR_CLAVE.vaciar_local()
+                medir(calentamiento)
+                resultados[nombre] = medir(pedidos)
+
+        self.stdout.write(
+            f"{len(pedidos)} requests, {opciones['concurrencia']} clientes simultáneos, "
+            f"pool WSGI de {opciones['hilos']} hilos"
+            + (", solo CommonMiddleware" if opciones['middleware_minimo'] else "")
+        )
+        for nombre, (segundos, latencias, errores) in resultados.items():
+            percentiles = statistics.quantiles(latencias, n=100)
+            self.stdout.write(
+                f"{nombre}  {len(latencias) / segundos:8.0f} req/s   "
+                f"p50 {percentiles[49]:7.1f} ms   p99 {percentiles[98]:7.1f} ms   errores {errores}"
+            )
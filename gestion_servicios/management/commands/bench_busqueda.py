@@ -0,0 +1,123 @@
+# gestion_servicios/management/commands/bench_busqueda.py
+
+"""
+Benchmark de búsqueda por síntoma en el historial de reparaciones.
+
+Genera, en una base SQLite en memoria, millones de órdenes con textos de
+falla / informe / estado / accesorios sintéticos y compara la cadena de
+icontains (LIKE '%x%' por columna y por término) contra la tabla FTS5, con
+bm25 sobre todas las coincidencias y con la ventana de busqueda.py.
+
+    python manage.py bench_busqueda --filas 1000000 --consultas 50
+"""
+
+import random
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand
+
+from gestion_servicios.busqueda import COLUMNAS, PESOS, RANKING_SQL, TABLA, TAMANIO_PAGINA, consulta_fts
+
+FALLAS = [
+    'no enciende', 'no carga', 'pin de carga flojo', 'pantalla rota', 'táctil no responde',
+    'se apaga solo', 'batería hinchada', 'mojado', 'no da imagen', 'sin señal',
+    'micrófono no funciona', 'parlante distorsiona', 'se calienta', 'cámara borrosa',
+    'botón de encendido trabado', 'no reconoce chip', 'wifi no conecta', 'teclado no responde',
+]
+INFORMES = [
+    'se reemplaza pin de carga', 'limpieza de placa por humedad', 'cambio de módulo de pantalla',
+    'cambio de batería', 'reinstalación de sistema', 'reballing de chip de video',
+    'cambio de flex de encendido', 'sin reparación posible', 'ajuste de conector', '',
+]
+ESTADOS = ['rayones en tapa', 'marco golpeado', 'sin detalles', 'pantalla astillada', 'tapa despegada', '']
+ACCESORIOS = ['cargador', 'funda', 'cargador y funda', 'sin accesorios', 'cable usb', 'chip', '']
+BUSQUEDAS = ['no enciende', 'pin de carga', 'bateria', 'pantalla rota', 'humedad', 'wifi', 'flex encendido']
+
+
+class Command(BaseCommand):
+    help = "Mide búsquedas de texto en el historial: cadena de icontains vs FTS5 + bm25."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=1_000_000)
+        parser.add_argument('--consultas', type=int, default=50)
+        parser.add_argument('--semilla', type=int, default=1234)
+
+    def handle(self, *args, **opciones):
+        rnd = random.Random(opciones['semilla'])
+        filas = opciones['filas']
+
+        db = sqlite3.connect(':memory:')
+        db.execute(
+            "CREATE TABLE reparacion (id INTEGER PRIMARY KEY, fecha_ingreso TEXT, "
+            "falla_reportada TEXT, informe_tecnico TEXT, estado_general TEXT, accesorios TEXT)"
+        )
+        db.execute("CREATE INDEX reparacion_fecha ON reparacion (fecha_ingreso)")
+        db.execute(
+            f"CREATE VIRTUAL TABLE {TABLA} USING fts5({', '.join(COLUMNAS)}, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+        self.stdout.write(f"Generando {filas:,} órdenes sintéticas...")
+        inicio = time.perf_counter()
+
+        def _filas():
+            for numero in range(filas):
+                falla = rnd.choice(FALLAS)
+                if rnd.random() < 0.3:
+                    falla += ', ' + rnd.choice(FALLAS)
+                yield (
+                    f"20{10 + numero * 15 // filas:02d}-01-01 {numero:09d}", falla,
+                    rnd.choice(INFORMES), rnd.choice(ESTADOS), rnd.choice(ACCESORIOS),
+                )
+
+        db.executemany(
+            "INSERT INTO reparacion (fecha_ingreso, falla_reportada, informe_tecnico, estado_general, accesorios) "
+            "VALUES (?, ?, ?, ?, ?)",
+            _filas(),
+        )
+        db.execute(
+            f"INSERT INTO {TABLA} (rowid, {', '.join(COLUMNAS)}) "
+            f"SELECT id, {', '.join(COLUMNAS)} FROM reparacion"
+        )
+        db.execute(f"INSERT INTO {TABLA} ({TABLA}) VALUES ('optimize')")
+        db.commit()
+        self.stdout.write(f"  carga + índice FTS5: {time.perf_counter() - inicio:.1f} s")
+
+        muestras = [rnd.choice(BUSQUEDAS) for _ in range(opciones['consultas'])]
+
+        def _icontains(texto):
+            condiciones, parametros = [], []
+            for palabra in texto.split():
+                condiciones.append('(' + ' OR '.join(f"{col} LIKE ?" for col in COLUMNAS) + ')')
+                parametros += [f'%{palabra}%'] * len(COLUMNAS)
+            sql = (f"SELECT id FROM reparacion WHERE {' AND '.join(condiciones)} "
+                   f"ORDER BY fecha_ingreso DESC LIMIT {TAMANIO_PAGINA}")
+            return sql, parametros
+
+        def _fts_completo(texto):
+            pesos = ', '.join(str(peso) for peso in PESOS)
+            sql = (f"SELECT rowid FROM {TABLA} WHERE {TABLA} MATCH ? "
+                   f"ORDER BY bm25({TABLA}, {pesos}) LIMIT {TAMANIO_PAGINA}")
+            return sql, [consulta_fts(texto)]
+
+        def _fts_ventana(texto):
+            return RANKING_SQL.replace('%s', '?'), [consulta_fts(texto), TAMANIO_PAGINA, 0]
+
+        self.stdout.write(f"\n{len(muestras)} búsquedas (primera página de {TAMANIO_PAGINA}):")
+        escenarios = (
+            ('cadena de icontains', _icontains),
+            ('FTS5, bm25 completo', _fts_completo),
+            ('FTS5, bm25 en ventana', _fts_ventana),
+        )
+        for nombre, armar in escenarios:
+            tiempos = []
+            for texto in muestras:
+                sql, parametros = armar(texto)
+                t0 = time.perf_counter()
+                db.execute(sql, parametros).fetchall()
+                tiempos.append(time.perf_counter() - t0)
+            tiempos.sort()
+            promedio = sum(tiempos) / len(tiempos) * 1000
+            p99 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))] * 1000
+            self.stdout.write(f"  {nombre:<22} prom {promedio:9.2f} ms   p99 {p99:9.2f} ms")
@@ -0,0 +1,94 @@
+# gestion_servicios/management/commands/bench_escrituras_sqlite.py
+
+"""
+Benchmark de escrituras concurrentes sobre SQLite.
+
+Lanza varios procesos que envían a la vez el formulario de recepción
+(ReparacionCreateView.post) contra una base temporal, primero con la
+configuración por defecto de SQLite ("antes") y luego con los PRAGMAs de
+settings.SQLITE_PRAGMAS y transaction_mode IMMEDIATE ("después").
+
+    python manage.py bench_escrituras_sqlite --procesos 6 --ordenes 100
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from gestion_servicios.models import Marca, Modelo, TipoEquipo
+
+from ._bench import base_temporal, ejecutar_en_procesos
+
+
+def _intake(indice, ordenes):
+    """Cuerpo de cada proceso: envía `ordenes` formularios de recepción."""
+    cliente_http = Client(HTTP_HOST='localhost')
+    url = reverse('crear_servicio')
+    correctas = bloqueos = otros_errores = 0
+    # Los "database is locked" se cuentan aquí; no hace falta su traza completa
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    logging.getLogger('gestion_servicios').setLevel(logging.WARNING)
+
+    inicio = time.perf_counter()
+    for numero in range(ordenes):
+        datos = {
+            'clave': f'B{indice:02d}{numero:06d}',
+            'nombre': f'Cliente {indice}-{numero}',
+            'serie_imei': f'BENCH{indice:02d}{numero:08d}',
+            'tipo': 'NOTEBOOK',
+            'marca': 'HP',
+            'modelo': 'PAVILION',
+            'falla_reportada': 'No enciende',
+        }
+        try:
+            respuesta = cliente_http.post(url, datos)
+        except OperationalError as e:
+            if 'locked' in str(e):
+                bloqueos += 1
+            else:
+                otros_errores += 1
+            continue
+        if respuesta.status_code == 302:
+            correctas += 1
+        else:
+            otros_errores += 1
+    return correctas, bloqueos, otros_errores, time.perf_counter() - inicio
+
+
+class Command(BaseCommand):
+    help = "Compara el throughput de recepción concurrente con y sin los ajustes de SQLite."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=6)
+        parser.add_argument('--ordenes', type=int, default=100, help="Órdenes enviadas por proceso.")
+
+    def handle(self, *args, **opciones):
+        configurado = settings.DATABASES['default'].get('OPTIONS', {})
+        escenarios = [
+            ('antes (SQLite por defecto)', {}, {'timeout': 5}),
+            ('después (SQLITE_PRAGMAS)', settings.SQLITE_PRAGMAS, configurado),
+        ]
+
+        for nombre, pragmas, opciones_db in escenarios:
+            with override_settings(SQLITE_PRAGMAS=pragmas), base_temporal(opciones_db):
+                # Catálogos precargados: se mide la contención de escritura, no la carrera de alta
+                TipoEquipo.objects.create(nombre='NOTEBOOK')
+                marca = Marca.objects.create(nombre='HP')
+                Modelo.objects.create(modelo='PAVILION', marca=marca)
+
+                inicio = time.perf_counter()
+                resultados = ejecutar_en_procesos(_intake, opciones['procesos'], opciones['ordenes'])
+                total = time.perf_counter() - inicio
+
+            correctas = sum(r[0] for r in resultados)
+            bloqueos = sum(r[1] for r in resultados)
+            otros = sum(r[2] for r in resultados)
+            self.stdout.write(
+                f"{nombre:<28} {correctas:6d} ok  {bloqueos:5d} 'database is locked'  "
+                f"{otros:4d} otros errores  {correctas / total:8.1f} órdenes/s  ({total:.1f} s)"
+            )
@@ -0,0 +1,94 @@
+# gestion_servicios/management/commands/bench_fragmentos.py
+
+"""
+Benchmark del render de lista_servicios.html con y sin la caché de
+fragmentos por fila.
+
+Crea N órdenes abiertas en una base temporal y renderiza la tabla completa
+(sin paginar) en tres escenarios:
+
+- sin caché: CACHES['fragmentos'] apunta a DummyCache (todas las filas se renderizan)
+- caché fría: primera pasada sobre una caché vacía (render + escritura)
+- caché caliente: las filas salen de la caché
+
+    python manage.py bench_fragmentos --ordenes 500 --repeticiones 20
+"""
+
+import statistics
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+
+from gestion_servicios.models import Cliente, Equipo, Marca, Modelo, Reparacion, Tecnico
+
+from ._bench import base_temporal
+
+
+def _crear_ordenes(cantidad):
+    marca = Marca.objects.create(nombre='SAMSUNG')
+    modelo = Modelo.objects.create(modelo='GALAXY A10', marca=marca)
+    tecnico = Tecnico.objects.create(nombre='JUAN PEREZ')
+    clientes = Cliente.objects.bulk_create([
+        Cliente(clave=f'F{numero:06d}', clave_normalizada=f'f{numero:06d}', nombre=f'Cliente {numero}')
+        for numero in range(cantidad)
+    ])
+    equipos = []
+    for numero in range(cantidad):
+        equipo = Equipo(serie_imei=f'FRAG{numero:010d}', marca=marca, modelo=modelo)
+        equipo.preparar_campos_derivados()
+        equipos.append(equipo)
+    equipos = Equipo.objects.bulk_create(equipos)
+    Reparacion.objects.bulk_create([
+        Reparacion(cliente=cliente, equipo=equipo, falla_reportada='No enciende',
+                   estado='EN_REPARACION', tecnico_asignado=tecnico)
+        for cliente, equipo in zip(clientes, equipos)
+    ])
+
+
+def _medir(contexto, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        render_to_string('gestion_servicios/lista_servicios.html', contexto)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+class Command(BaseCommand):
+    help = "Mide el render del listado de reparaciones con y sin caché de fragmentos por fila."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ordenes', type=int, default=500)
+        parser.add_argument('--repeticiones', type=int, default=20)
+
+    def handle(self, *args, **opciones):
+        with base_temporal():
+            _crear_ordenes(opciones['ordenes'])
+            reparaciones = list(Reparacion.objects.para_listado().order_by('-fecha_ingreso', '-pk'))
+            request = RequestFactory().get('/servicios/')
+            contexto = {
+                'request': request,
+                'reparaciones': reparaciones,
+                'filtro_activo': 'TALLER',
+                'is_paginated': False,
+            }
+            # Primera pasada para que la carga/compilación de la plantilla no cuente
+            render_to_string('gestion_servicios/lista_servicios.html', contexto)
+
+            sin_cache = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+            with override_settings(CACHES={'default': sin_cache, 'fragmentos': sin_cache}):
+                sin = _medir(contexto, opciones['repeticiones'])
+
+            caches['fragmentos'].clear()
+            fria = _medir(contexto, 1)
+            caliente = _medir(contexto, opciones['repeticiones'])
+
+        filas = len(reparaciones)
+        for nombre, tiempos in (('sin caché', sin), ('caché fría', fria), ('caché caliente', caliente)):
+            mediana = statistics.median(tiempos)
+            self.stdout.write(
+                f"{nombre:<16} {mediana:8.2f} ms por render  ({mediana * 1000 / filas:6.1f} µs por fila, {filas} filas)"
+            )
@@ -0,0 +1,104 @@
+# gestion_servicios/management/commands/bench_serie_imei.py
+
+"""
+Benchmark de búsqueda de equipos por Nro. de Serie / IMEI.
+
+Compara, sobre una tabla SQLite en memoria con millones de series sintéticas,
+el LIKE '%...%' que generaba serie_imei__icontains contra los recorridos de
+rango sobre las columnas serie_normalizada / serie_invertida.
+
+    python manage.py bench_serie_imei --filas 2000000 --consultas 200
+"""
+
+import random
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand
+
+from gestion_servicios.normalizacion import normalizar_serie, rango_prefijo
+
+
+def _imei_sintetico(rnd):
+    cuerpo = f"{rnd.randrange(10 ** 15):015d}"
+    # Una parte de los equipos trae S/N alfanumérico con separadores
+    if rnd.random() < 0.2:
+        return f"SN-{cuerpo[:6]}-{cuerpo[6:]}"
+    return cuerpo
+
+
+class Command(BaseCommand):
+    help = "Mide búsquedas por prefijo/sufijo de IMEI: LIKE vs índice de rango."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=2_000_000)
+        parser.add_argument('--consultas', type=int, default=200)
+        parser.add_argument('--digitos', type=int, default=5,
+                            help="Cantidad de dígitos finales tipeados en cada búsqueda.")
+        parser.add_argument('--semilla', type=int, default=1234)
+
+    def handle(self, *args, **opciones):
+        rnd = random.Random(opciones['semilla'])
+        filas = opciones['filas']
+
+        db = sqlite3.connect(':memory:')
+        db.execute(
+            "CREATE TABLE equipo (id INTEGER PRIMARY KEY, serie_imei TEXT UNIQUE, "
+            "serie_normalizada TEXT, serie_invertida TEXT)"
+        )
+
+        self.stdout.write(f"Generando {filas:,} series sintéticas...")
+        inicio = time.perf_counter()
+        series = set()
+        while len(series) < filas:
+            series.add(_imei_sintetico(rnd))
+        series = list(series)
+
+        def _filas():
+            for serie in series:
+                normalizada = normalizar_serie(serie)
+                yield serie, normalizada, normalizada[::-1]
+
+        db.executemany(
+            "INSERT INTO equipo (serie_imei, serie_normalizada, serie_invertida) VALUES (?, ?, ?)",
+            _filas(),
+        )
+        db.execute("CREATE INDEX equipo_norm ON equipo (serie_normalizada)")
+        db.execute("CREATE INDEX equipo_inv ON equipo (serie_invertida)")
+        db.commit()
+        self.stdout.write(f"  carga + índices: {time.perf_counter() - inicio:.1f} s")
+
+        digitos = opciones['digitos']
+        muestras = [normalizar_serie(rnd.choice(series))[-digitos:] for _ in range(opciones['consultas'])]
+
+        consultas = {
+            'icontains (LIKE %x%)': (
+                "SELECT serie_imei FROM equipo WHERE serie_imei LIKE ? ESCAPE '\\' LIMIT 10",
+                lambda t: (f"%{t}%",),
+            ),
+            'sufijo (rango invertido)': (
+                "SELECT serie_imei FROM equipo WHERE serie_invertida >= ? AND serie_invertida < ? "
+                "ORDER BY serie_invertida LIMIT 10",
+                lambda t: rango_prefijo(t[::-1]),
+            ),
+            'prefijo (rango normalizado)': (
+                "SELECT serie_imei FROM equipo WHERE serie_normalizada >= ? AND serie_normalizada < ? "
+                "ORDER BY serie_normalizada LIMIT 10",
+                lambda t: rango_prefijo(t),
+            ),
+        }
+
+        self.stdout.write(f"\n{len(muestras)} búsquedas de {digitos} dígitos:")
+        for nombre, (sql, parametros) in consultas.items():
+            plan = db.execute("EXPLAIN QUERY PLAN " + sql, parametros(muestras[0])).fetchall()
+            tiempos = []
+            for termino in muestras:
+                t0 = time.perf_counter()
+                db.execute(sql, parametros(termino)).fetchall()
+                tiempos.append(time.perf_counter() - t0)
+            tiempos.sort()
+            promedio = sum(tiempos) / len(tiempos) * 1000
+            p99 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))] * 1000
+            self.stdout.write(
+                f"  {nombre:<28} prom {promedio:9.3f} ms   p99 {p99:9.3f} ms   plan: {plan[-1][-1]}"
+            )
@@ -0,0 +1,57 @@
+# gestion_servicios/management/commands/despachar_avisos.py
+
+"""
+Envía los avisos por correo pendientes (ver avisos.py), en lotes y por una
+sola conexión SMTP por pasada. Como proceso permanente (systemd, supervisor):
+
+    python manage.py despachar_avisos
+    python manage.py despachar_avisos --una-vez      # una pasada, p. ej. desde cron
+
+Para probar en local, con un servidor SMTP de depuración que imprime los
+correos en la consola (EMAIL_HOST/EMAIL_PORT de settings):
+
+    pip install aiosmtpd
+    python -m aiosmtpd -n -l localhost:1025
+
+o sin servidor, con EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend',
+que los imprime en la salida del comando.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from gestion_servicios import avisos
+
+
+class Command(BaseCommand):
+    help = "Envía los avisos a clientes pendientes de la bandeja de salida."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help="Una pasada y termina.")
+        parser.add_argument('--lote', type=int, help="Avisos por lote (por defecto, AVISOS_LOTE).")
+        parser.add_argument('--espera', type=float, default=15,
+                            help="Segundos entre pasadas cuando la cola queda vacía.")
+
+    def handle(self, *args, **opciones):
+        try:
+            while True:
+                inicio = time.perf_counter()
+                resultado = avisos.despachar(lote=opciones['lote'])
+                if resultado.procesados:
+                    estilo = self.style.WARNING if resultado.conexion_caida else self.style.SUCCESS
+                    self.stdout.write(estilo(
+                        f"{resultado.enviados} enviado(s), {resultado.reintentos} a reintentar, "
+                        f"{resultado.fallidos} fallido(s) en {resultado.lotes} lote(s) "
+                        f"({time.perf_counter() - inicio:.2f} s)"
+                        + (" - conexión SMTP caída" if resultado.conexion_caida else "")
+                    ))
+                if opciones['una_vez']:
+                    break
+                # Proceso de larga vida: que no quede una conexión a la base vieja o rota
+                close_old_connections()
+                time.sleep(opciones['espera'])
+        except KeyboardInterrupt:
+            self.stdout.write("Despachador detenido.")
+        self.stdout.write(f"Pendientes: {avisos.pendientes()}")
@@ -0,0 +1,50 @@
+# gestion_servicios/management/commands/exportar_reparaciones.py
+
+"""
+Exporta las órdenes de servicio a CSV o JSONL sin cargar todo en memoria.
+
+    python manage.py exportar_reparaciones --formato csv --desde 2025-01-01 --hasta 2025-12-31 \
+        --estado ENTREGADA --salida reparaciones_2025.csv
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion_servicios import exportacion
+
+
+class Command(BaseCommand):
+    help = "Exporta órdenes de servicio (cliente, equipo, técnico y totales) en CSV o JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=exportacion.FORMATOS, default='csv')
+        parser.add_argument('--desde', help="Fecha de ingreso mínima (AAAA-MM-DD, inclusiva).")
+        parser.add_argument('--hasta', help="Fecha de ingreso máxima (AAAA-MM-DD, inclusiva).")
+        parser.add_argument('--estado', action='append', default=[],
+                            help="Código de estado a incluir; se puede repetir.")
+        parser.add_argument('--salida', help="Archivo de destino (por defecto, la salida estándar).")
+        parser.add_argument('--lote', type=int, default=exportacion.TAMANIO_LOTE,
+                            help="Filas leídas por cada viaje a la base (chunk_size).")
+
+    def handle(self, *args, **opciones):
+        try:
+            queryset = exportacion.consulta_exportacion(
+                desde=opciones['desde'],
+                hasta=opciones['hasta'],
+                estados=opciones['estado'],
+            )
+            lineas = exportacion.generar_lineas(opciones['formato'], queryset, opciones['lote'])
+        except exportacion.FiltroInvalido as e:
+            raise CommandError(str(e))
+
+        if opciones['salida']:
+            destino = open(opciones['salida'], 'w', encoding='utf-8', newline='')
+        else:
+            destino = sys.stdout
+        try:
+            for linea in lineas:
+                destino.write(linea)
+        finally:
+            if destino is not sys.stdout:
+                destino.close()
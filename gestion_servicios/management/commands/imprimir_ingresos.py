@@ -0,0 +1,50 @@
+# gestion_servicios/management/commands/imprimir_ingresos.py
+
+"""
+Genera en un solo PDF los comprobantes o etiquetas de los ingresos de un día
+(hoy por defecto). Las páginas que no están en la caché de impresión se
+componen en paralelo en el pool de procesos (ver impresion.py).
+
+    python manage.py imprimir_ingresos --tipo etiqueta --fecha 2025-03-14 --salida etiquetas.pdf
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from gestion_servicios import impresion
+
+
+class Command(BaseCommand):
+    help = "PDF con los comprobantes o etiquetas de todas las órdenes ingresadas en un día."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipo', choices=impresion.TIPOS, default='etiqueta')
+        parser.add_argument('--fecha', help="Día de ingreso (AAAA-MM-DD); por defecto, hoy.")
+        parser.add_argument('--salida', required=True, help="Archivo PDF de destino.")
+
+    def handle(self, *args, **opciones):
+        dia = None
+        if opciones['fecha']:
+            dia = parse_date(opciones['fecha'])
+            if dia is None:
+                raise CommandError("--fecha debe tener el formato AAAA-MM-DD.")
+
+        reparaciones = list(impresion.ingresos_del_dia(dia))
+        if not reparaciones:
+            raise CommandError("No hay ingresos en la fecha indicada.")
+
+        inicio = time.perf_counter()
+        try:
+            contenido = impresion.pdf_ordenes(reparaciones, opciones['tipo'])
+        except impresion.ImpresionOcupada as e:
+            raise CommandError(str(e))
+        finally:
+            impresion.cerrar_pool()
+        with open(opciones['salida'], 'wb') as destino:
+            destino.write(contenido)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(reparaciones)} página(s) en {opciones['salida']} ({time.perf_counter() - inicio:.2f} s)"
+        ))
@@ -0,0 +1,46 @@
+# gestion_servicios/management/commands/ingresar_lote.py
+
+"""
+Ingreso masivo de equipos desde un archivo JSON (lista de registros o
+{"registros": [...]}), con el formato descrito en gestion_servicios/ingreso_lote.py.
+
+    python manage.py ingresar_lote entrega_acme.json
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion_servicios import ingreso_lote
+
+
+class Command(BaseCommand):
+    help = "Genera órdenes de servicio en lote a partir de un archivo JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="Ruta del archivo JSON con los registros.")
+
+    def handle(self, *args, **opciones):
+        try:
+            with open(opciones['archivo'], encoding='utf-8') as f:
+                contenido = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo leer el archivo: {e}")
+
+        registros = contenido.get('registros') if isinstance(contenido, dict) else contenido
+        try:
+            resultados = ingreso_lote.ingresar_lote(registros)
+        except ingreso_lote.LoteInvalido as e:
+            raise CommandError(str(e))
+
+        creadas = 0
+        for resultado in resultados:
+            if resultado['ok']:
+                creadas += 1
+                self.stdout.write(f"Fila {resultado['fila']}: Orden #{resultado['orden']}")
+            else:
+                self.stderr.write(f"Fila {resultado['fila']}: {json.dumps(resultado['errores'], ensure_ascii=False)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{creadas} órdenes generadas, {len(resultados) - creadas} filas rechazadas."
+        ))
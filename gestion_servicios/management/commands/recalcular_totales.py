@@ -0,0 +1,63 @@
+# gestion_servicios/management/commands/recalcular_totales.py
+
+"""
+Verifica y recalcula los totales desnormalizados de las órdenes
+(Reparacion.total_repuestos / total, ver totales.py) contra sus líneas de
+repuestos, por lotes de ids para no bloquear la base en historiales grandes.
+
+    python manage.py recalcular_totales --verificar   # solo informa
+    python manage.py recalcular_totales               # corrige las desfasadas
+    python manage.py recalcular_totales --todas       # reescribe todas
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from gestion_servicios import totales
+from gestion_servicios.models import Reparacion
+
+
+class Command(BaseCommand):
+    help = "Verifica y recalcula por lotes los totales guardados en las órdenes de servicio."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=2000, help="Órdenes por transacción.")
+        parser.add_argument('--verificar', action='store_true', help="Solo informa; no modifica nada.")
+        parser.add_argument('--todas', action='store_true', help="Recalcula también las que coinciden.")
+
+    def handle(self, *args, **opciones):
+        lote = opciones['lote']
+        if lote <= 0:
+            raise CommandError("--lote debe ser mayor que cero.")
+        if opciones['verificar'] and opciones['todas']:
+            raise CommandError("--verificar y --todas son excluyentes.")
+
+        revisadas = desfasadas = corregidas = 0
+        ultimo = 0
+        while True:
+            ids = list(
+                Reparacion.objects.filter(pk__gt=ultimo).order_by('pk').values_list('pk', flat=True)[:lote]
+            )
+            if not ids:
+                break
+            ultimo = ids[-1]
+            revisadas += len(ids)
+
+            with transaction.atomic():
+                malas = list(
+                    totales.desfasadas(Reparacion.objects.filter(pk__in=ids))
+                    .values_list('pk', 'total_repuestos', 'total_repuestos_real')
+                )
+                desfasadas += len(malas)
+                for pk, guardado, real in malas[:10] if opciones['verbosity'] > 1 else []:
+                    self.stdout.write(f"  orden #{pk}: guardado {guardado}, líneas {real}")
+                if not opciones['verificar']:
+                    corregidas += totales.recalcular(ids if opciones['todas'] else [pk for pk, _, _ in malas])
+
+        resumen = f"{revisadas} órdenes revisadas, {desfasadas} con totales desfasados"
+        if opciones['verificar']:
+            if desfasadas:
+                raise CommandError(resumen + ".")
+            self.stdout.write(self.style.SUCCESS(resumen + "."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{resumen}, {corregidas} recalculadas."))
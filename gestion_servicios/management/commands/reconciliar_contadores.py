@@ -0,0 +1,33 @@
+# gestion_servicios/management/commands/reconciliar_contadores.py
+
+"""
+Compara los contadores por estado y técnico (ver contadores.py) con un
+COUNT(*) agrupado de las órdenes y corrige los desfasados (p. ej. después
+de modificar órdenes por SQL o con update()).
+
+    python manage.py reconciliar_contadores --verificar   # solo informa
+    python manage.py reconciliar_contadores               # corrige
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion_servicios import contadores
+
+
+class Command(BaseCommand):
+    help = "Verifica y corrige los contadores de órdenes por estado y técnico."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verificar', action='store_true', help="Solo informa; no modifica nada.")
+
+    def handle(self, *args, **opciones):
+        encontradas = contadores.diferencias() if opciones['verificar'] else contadores.reconciliar()
+        for (estado, tecnico), (guardado, real) in sorted(encontradas.items()):
+            self.stdout.write(f"  {estado:<15} técnico {tecnico or '-':>5}: guardado {guardado}, real {real}")
+
+        if not encontradas:
+            self.stdout.write(self.style.SUCCESS("Los contadores coinciden con las órdenes."))
+        elif opciones['verificar']:
+            raise CommandError(f"{len(encontradas)} contadores desfasados.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(encontradas)} contadores corregidos."))
@@ -0,0 +1,25 @@
+# gestion_servicios/management/commands/reconstruir_busqueda.py
+
+"""
+Reconstruye la tabla FTS5 de búsqueda de reparaciones desde cero (p. ej.
+después de una carga masiva por SQL o si se sospecha que quedó desfasada).
+
+    python manage.py reconstruir_busqueda
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from gestion_servicios import busqueda
+
+
+class Command(BaseCommand):
+    help = "Vacía y recarga el índice de texto completo de reparaciones."
+
+    def handle(self, *args, **opciones):
+        if not busqueda.disponible():
+            raise CommandError("La búsqueda de texto completo requiere SQLite (FTS5).")
+        with transaction.atomic():
+            busqueda.asegurar_indice()
+            busqueda.reconstruir_indice()
+        self.stdout.write(self.style.SUCCESS("Índice de búsqueda reconstruido."))
@@ -0,0 +1,157 @@
+# gestion_servicios/management/commands/stress_repuestos.py
+
+"""
+Prueba de estrés del consumo de repuestos con muchos técnicos a la vez.
+
+Lanza varios hilos (cada uno con su conexión) que piden repuestos al azar
+sobre pocas filas de stock, para forzar la contención, contra una base
+temporal. Se corren dos escenarios:
+
+- ingenuo: lee el stock, compara y guarda con save() (leer-modificar-escribir)
+- servicio: repuestos.consumir_repuestos() (UPDATE condicional con F())
+
+Al final verifica, por repuesto, que el stock nunca quede negativo y que
+stock inicial - stock final == unidades registradas en las órdenes, y que
+el total guardado de cada orden coincida con sus líneas.
+Termina con error si el servicio viola alguna de las dos condiciones.
+
+    python manage.py stress_repuestos --hilos 16 --pedidos 200 --stock 300
+"""
+
+import random
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connections, transaction
+from django.db.models import Sum
+
+from gestion_servicios import repuestos, totales
+from gestion_servicios.models import Cliente, DetalleRepuestoReparacion, Equipo, Repuesto, Reparacion
+
+from ._bench import base_temporal
+
+
+def _consumo_ingenuo(reparacion, lineas):
+    """Lo que NO hay que hacer: verificar y descontar en Python."""
+    for repuesto_id, cantidad in lineas:
+        repuesto = Repuesto.objects.get(pk=repuesto_id)
+        if repuesto.stock_actual < cantidad:
+            raise repuestos.StockInsuficiente({repuesto_id: (cantidad, repuesto.stock_actual)})
+        time.sleep(0)  # cede el GIL: otro técnico lee el mismo stock
+        repuesto.stock_actual -= cantidad
+        repuesto.save(update_fields=['stock_actual'])
+        with transaction.atomic():
+            detalle, _ = DetalleRepuestoReparacion.objects.get_or_create(
+                reparacion=reparacion, repuesto_id=repuesto_id,
+                defaults={'cantidad': 0, 'precio_unitario': repuesto.precio_venta},
+            )
+            detalle.cantidad += cantidad
+            detalle.save(update_fields=['cantidad'])
+
+
+def _tecnico(consumir, ordenes, repuesto_ids, pedidos, semilla, resultados):
+    rnd = random.Random(semilla)
+    aceptados = rechazados = bloqueos = 0
+    try:
+        for _ in range(pedidos):
+            lineas = [(rnd.choice(repuesto_ids), rnd.randint(1, 3)) for _ in range(rnd.randint(1, 4))]
+            try:
+                consumir(rnd.choice(ordenes), lineas)
+                aceptados += 1
+            except repuestos.StockInsuficiente:
+                rechazados += 1
+            except OperationalError:
+                bloqueos += 1
+    finally:
+        connections.close_all()
+        resultados.append((aceptados, rechazados, bloqueos))
+
+
+class Command(BaseCommand):
+    help = "Estresa el consumo concurrente de repuestos y verifica que el stock nunca quede negativo."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=16)
+        parser.add_argument('--pedidos', type=int, default=200, help="Pedidos por hilo.")
+        parser.add_argument('--repuestos', type=int, default=5)
+        parser.add_argument('--stock', type=int, default=300, help="Stock inicial de cada repuesto.")
+        parser.add_argument('--semilla', type=int, default=1234)
+
+    def handle(self, *args, **opciones):
+        escenarios = [
+            ('ingenuo (leer-modificar-escribir)', _consumo_ingenuo),
+            ('servicio (UPDATE condicional)', repuestos.consumir_repuestos),
+        ]
+        errores_servicio = []
+        for nombre, consumir in escenarios:
+            with base_temporal():
+                errores = self._correr(nombre, consumir, opciones)
+            if consumir is repuestos.consumir_repuestos:
+                errores_servicio = errores
+
+        if errores_servicio:
+            raise CommandError("El servicio violó las invariantes de stock: " + '; '.join(errores_servicio))
+        self.stdout.write(self.style.SUCCESS("OK: el servicio nunca dejó stock negativo ni perdió descuentos."))
+
+    def _correr(self, nombre, consumir, opciones):
+        ordenes = []
+        for numero in range(20):
+            cliente = Cliente.objects.create(clave=f'S{numero:04d}', nombre=f'Cliente {numero}')
+            equipo = Equipo.objects.create(serie_imei=f'STRESS{numero:06d}')
+            ordenes.append(Reparacion.objects.create(cliente=cliente, equipo=equipo, falla_reportada='No enciende'))
+        stock_inicial = opciones['stock']
+        repuesto_ids = [
+            Repuesto.objects.create(
+                descripcion=f'Repuesto {numero}', codigo=f'R{numero:03d}', stock_actual=stock_inicial,
+                precio_compra=Decimal('10.00'), precio_venta=Decimal('25.00'),
+            ).pk
+            for numero in range(opciones['repuestos'])
+        ]
+        connections.close_all()
+
+        resultados = []
+        hilos = [
+            threading.Thread(
+                target=_tecnico,
+                args=(consumir, ordenes, repuesto_ids, opciones['pedidos'], opciones['semilla'] + indice, resultados),
+            )
+            for indice in range(opciones['hilos'])
+        ]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        total = time.perf_counter() - inicio
+        close_old_connections()
+
+        errores = []
+        if len(resultados) != len(hilos):
+            errores.append(f"{len(hilos) - len(resultados)} hilos terminaron con una excepción inesperada")
+        consumidos = dict(
+            DetalleRepuestoReparacion.objects.values_list('repuesto_id').annotate(Sum('cantidad'))
+        )
+        for pk, stock in Repuesto.objects.filter(pk__in=repuesto_ids).values_list('pk', 'stock_actual'):
+            if stock < 0:
+                errores.append(f"repuesto #{pk} quedó con stock {stock}")
+            if stock_inicial - stock != consumidos.get(pk, 0):
+                errores.append(
+                    f"repuesto #{pk}: descontado {stock_inicial - stock}, registrado {consumidos.get(pk, 0)}"
+                )
+
+        desfasadas = totales.desfasadas(Reparacion.objects.filter(pk__in=[orden.pk for orden in ordenes])).count()
+        if desfasadas:
+            errores.append(f"{desfasadas} órdenes con el total desfasado de sus líneas")
+
+        aceptados = sum(r[0] for r in resultados)
+        rechazados = sum(r[1] for r in resultados)
+        bloqueos = sum(r[2] for r in resultados)
+        self.stdout.write(
+            f"{nombre:<34} {aceptados:5d} aceptados  {rechazados:5d} sin stock  {bloqueos:3d} bloqueos  "
+            f"{total:5.1f} s  -> {'OK' if not errores else f'{len(errores)} violaciones'}"
+        )
+        for error in errores[:5]:
+            self.stdout.write(f"    {error}")
+        return errores
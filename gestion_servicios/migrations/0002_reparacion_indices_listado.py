@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reparacion',
+            index=models.Index(fields=['estado', 'fecha_ingreso'], name='rep_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reparacion',
+            index=models.Index(fields=['fecha_ingreso'], name='rep_fecha_ingreso_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+from gestion_servicios.normalizacion import normalizar_serie
+
+
+def completar_series(apps, schema_editor):
+    """Calcula las columnas derivadas para los equipos ya existentes."""
+    Equipo = apps.get_model('gestion_servicios', 'Equipo')
+    pendientes = []
+    for equipo in Equipo.objects.only('id', 'serie_imei').iterator(chunk_size=2000):
+        equipo.serie_normalizada = normalizar_serie(equipo.serie_imei)
+        equipo.serie_invertida = equipo.serie_normalizada[::-1]
+        pendientes.append(equipo)
+        if len(pendientes) >= 2000:
+            Equipo.objects.bulk_update(pendientes, ['serie_normalizada', 'serie_invertida'])
+            pendientes = []
+    if pendientes:
+        Equipo.objects.bulk_update(pendientes, ['serie_normalizada', 'serie_invertida'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0002_reparacion_indices_listado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipo',
+            name='serie_invertida',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='equipo',
+            name='serie_normalizada',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(completar_series, migrations.RunPython.noop),
+    ]
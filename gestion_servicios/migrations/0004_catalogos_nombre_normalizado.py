@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:36
+
+from django.db import migrations, models
+
+from gestion_servicios.normalizacion import normalizar_nombre
+
+
+def completar_normalizados(apps, schema_editor):
+    """
+    Calcula la clave normalizada de los catálogos existentes. Si ya había
+    duplicados que solo difieren en mayúsculas/espacios, el primero (menor pk)
+    se queda con la clave y los demás quedan en NULL: el resolutor de catálogos
+    siempre devolverá el primero.
+    """
+    for nombre_modelo, campo, normalizado, agrupar_por in [
+        ('TipoEquipo', 'nombre', 'nombre_normalizado', None),
+        ('Marca', 'nombre', 'nombre_normalizado', None),
+        ('Tecnico', 'nombre', 'nombre_normalizado', None),
+        ('Modelo', 'modelo', 'modelo_normalizado', 'marca_id'),
+    ]:
+        Modelo = apps.get_model('gestion_servicios', nombre_modelo)
+        vistos = set()
+        pendientes = []
+        for obj in Modelo.objects.order_by('pk'):
+            clave = (getattr(obj, agrupar_por) if agrupar_por else None, normalizar_nombre(getattr(obj, campo)))
+            if clave in vistos:
+                continue
+            vistos.add(clave)
+            setattr(obj, normalizado, clave[1])
+            pendientes.append(obj)
+        Modelo.objects.bulk_update(pendientes, [normalizado], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0003_equipo_serie_indices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='marca',
+            name='nombre_normalizado',
+            field=models.CharField(editable=False, max_length=50, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='modelo',
+            name='modelo_normalizado',
+            field=models.CharField(editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='tecnico',
+            name='nombre_normalizado',
+            field=models.CharField(editable=False, max_length=150, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='tipoequipo',
+            name='nombre_normalizado',
+            field=models.CharField(editable=False, max_length=50, null=True, unique=True),
+        ),
+        migrations.RunPython(completar_normalizados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='modelo',
+            constraint=models.UniqueConstraint(fields=('marca', 'modelo_normalizado'), name='modelo_normalizado_unico_por_marca'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:42
+
+from django.db import migrations, models
+
+from gestion_servicios.normalizacion import normalizar_clave
+
+
+def completar_claves(apps, schema_editor):
+    """Calcula la clave normalizada de los clientes ya existentes."""
+    Cliente = apps.get_model('gestion_servicios', 'Cliente')
+    pendientes = []
+    for cliente in Cliente.objects.only('id', 'clave').iterator(chunk_size=2000):
+        cliente.clave_normalizada = normalizar_clave(cliente.clave)
+        pendientes.append(cliente)
+        if len(pendientes) >= 2000:
+            Cliente.objects.bulk_update(pendientes, ['clave_normalizada'])
+            pendientes = []
+    if pendientes:
+        Cliente.objects.bulk_update(pendientes, ['clave_normalizada'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0004_catalogos_nombre_normalizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='clave_normalizada',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(completar_claves, migrations.RunPython.noop),
+    ]
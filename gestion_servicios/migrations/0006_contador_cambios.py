@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+TABLAS = ('reparacion', 'cliente', 'equipo', 'tipoequipo', 'marca', 'modelo', 'tecnico')
+
+
+def crear_contadores(apps, schema_editor):
+    """Una fila por tabla, para que el Last-Modified sea conocido desde el inicio."""
+    ContadorCambios = apps.get_model('gestion_servicios', 'ContadorCambios')
+    ContadorCambios.objects.bulk_create(
+        [ContadorCambios(tabla=f'gestion_servicios.{tabla}') for tabla in TABLAS],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0005_cliente_clave_normalizada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorCambios',
+            fields=[
+                ('tabla', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('actualizado', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Contador de Cambios',
+                'verbose_name_plural': 'Contadores de Cambios',
+            },
+        ),
+        migrations.RunPython(crear_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:50
+
+from django.db import migrations
+
+
+def crear_indice(apps, schema_editor):
+    """
+    Tabla FTS5 (solo SQLite) y carga del historial existente. Los triggers los
+    crea post_migrate (signals.py), después de los ALTER de migraciones posteriores.
+    """
+    from gestion_servicios import busqueda
+    busqueda.asegurar_indice(schema_editor.connection, triggers=False)
+
+
+def eliminar_indice(apps, schema_editor):
+    from gestion_servicios import busqueda
+    busqueda.eliminar_indice(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0006_contador_cambios'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:55
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def calcular_totales(apps, schema_editor):
+    """Carga los totales de las órdenes existentes desde sus líneas de repuestos."""
+    Reparacion = apps.get_model('gestion_servicios', 'Reparacion')
+    Detalle = apps.get_model('gestion_servicios', 'DetalleRepuestoReparacion')
+    decimal = DecimalField(max_digits=12, decimal_places=2)
+    suma = (
+        Detalle.objects.filter(reparacion=OuterRef('pk')).order_by().values('reparacion')
+        .annotate(suma=Sum(F('cantidad') * F('precio_unitario'), output_field=decimal))
+        .values('suma')
+    )
+    Reparacion.objects.update(total_repuestos=Coalesce(Subquery(suma), Value(0), output_field=decimal))
+    Reparacion.objects.update(total=F('mano_de_obra') + F('total_repuestos'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0007_busqueda_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reparacion',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Total de la Orden'),
+        ),
+        migrations.AddField(
+            model_name='reparacion',
+            name='total_repuestos',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Total de Repuestos'),
+        ),
+        migrations.RunPython(calcular_totales, migrations.RunPython.noop),
+    ]
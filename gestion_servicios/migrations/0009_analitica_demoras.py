@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0008_reparacion_totales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaProceso',
+            fields=[
+                ('nombre', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('hasta', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Marca de Proceso',
+                'verbose_name_plural': 'Marcas de Proceso',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenDiarioDemora',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Día de Ingreso')),
+                ('dimension', models.CharField(choices=[('total', 'Todas las órdenes'), ('tecnico', 'Técnico'), ('marca', 'Marca'), ('tipo', 'Tipo de equipo')], max_length=10)),
+                ('valor', models.PositiveIntegerField(default=0)),
+                ('cantidad', models.PositiveIntegerField()),
+                ('duraciones', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Demoras',
+                'verbose_name_plural': 'Resúmenes Diarios de Demoras',
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'dia', 'valor'), name='resumen_demora_unico')],
+            },
+        ),
+    ]
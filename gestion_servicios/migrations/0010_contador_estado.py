@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:02
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def contar_ordenes(apps, schema_editor):
+    """Carga los contadores con las órdenes existentes."""
+    Reparacion = apps.get_model('gestion_servicios', 'Reparacion')
+    ContadorEstado = apps.get_model('gestion_servicios', 'ContadorEstado')
+    ContadorEstado.objects.bulk_create([
+        ContadorEstado(estado=estado, tecnico=tecnico or 0, cantidad=cantidad)
+        for estado, tecnico, cantidad in Reparacion.objects.order_by()
+        .values_list('estado', 'tecnico_asignado').annotate(cantidad=Count('pk'))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0009_analitica_demoras'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorEstado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(max_length=20)),
+                ('tecnico', models.PositiveIntegerField(default=0)),
+                ('cantidad', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador por Estado',
+                'verbose_name_plural': 'Contadores por Estado',
+                'constraints': [models.UniqueConstraint(fields=('estado', 'tecnico'), name='contador_estado_unico')],
+            },
+        ),
+        migrations.RunPython(contar_ordenes, migrations.RunPython.noop),
+    ]
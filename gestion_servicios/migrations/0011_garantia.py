@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:05
+
+from django.db import migrations, models
+
+from gestion_servicios.garantia import vencimiento
+
+
+def calcular_vencimientos(apps, schema_editor):
+    """Vencimiento de los equipos existentes con el plazo por defecto (los catálogos aún no tienen plazo)."""
+    Equipo = apps.get_model('gestion_servicios', 'Equipo')
+    pendientes = []
+    for equipo in Equipo.objects.filter(fecha_compra__isnull=False).only('id', 'fecha_compra').iterator(chunk_size=2000):
+        equipo.vence_garantia = vencimiento(equipo.fecha_compra)
+        pendientes.append(equipo)
+        if len(pendientes) >= 2000:
+            Equipo.objects.bulk_update(pendientes, ['vence_garantia'])
+            pendientes = []
+    if pendientes:
+        Equipo.objects.bulk_update(pendientes, ['vence_garantia'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0010_contador_estado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipo',
+            name='vence_garantia',
+            field=models.DateField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='marca',
+            name='meses_garantia',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Vacío: se usa el plazo del tipo de equipo o el general (ver garantia.py).', null=True, verbose_name='Meses de Garantía'),
+        ),
+        migrations.AddField(
+            model_name='tipoequipo',
+            name='meses_garantia',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Vacío: se usa el plazo de la marca o el general (ver garantia.py).', null=True, verbose_name='Meses de Garantía'),
+        ),
+        migrations.RunPython(calcular_vencimientos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def historial_inicial(apps, schema_editor):
+    """
+    De las órdenes existentes solo se conoce el estado actual: una fila por
+    orden con ese estado desde su última modificación (o desde la entrega).
+    """
+    Reparacion = apps.get_model('gestion_servicios', 'Reparacion')
+    TransicionEstado = apps.get_model('gestion_servicios', 'TransicionEstado')
+    lote = []
+    for pk, estado, updated_at, fecha_entrega in Reparacion.objects.order_by('pk').values_list(
+        'pk', 'estado', 'updated_at', 'fecha_entrega'
+    ).iterator(chunk_size=2000):
+        desde = fecha_entrega if estado == 'ENTREGADA' and fecha_entrega else updated_at
+        lote.append(TransicionEstado(reparacion_id=pk, estado_nuevo=estado, created_at=desde))
+        if len(lote) >= 2000:
+            TransicionEstado.objects.bulk_create(lote)
+            lote = []
+    TransicionEstado.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0011_garantia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransicionEstado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado_anterior', models.CharField(blank=True, default='', max_length=20)),
+                ('estado_nuevo', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha del Cambio')),
+                ('reparacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transiciones', to='gestion_servicios.reparacion')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Transición de Estado',
+                'verbose_name_plural': 'Transiciones de Estado',
+                'indexes': [models.Index(fields=['reparacion', 'created_at'], name='historial_orden_fecha')],
+            },
+        ),
+        migrations.RunPython(historial_inicial, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0012_historial_estados'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reparacion',
+            index=models.Index(fields=['updated_at'], name='rep_updated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0013_reparacion_indice_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvisoCliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('TERMINADA', 'Reparación terminada')], max_length=20)),
+                ('destinatario', models.EmailField(max_length=255)),
+                ('asunto', models.CharField(max_length=255)),
+                ('cuerpo', models.TextField()),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('ENVIANDO', 'Tomado por un despachador'), ('ENVIADO', 'Enviado'), ('FALLIDO', 'Fallido (sin más reintentos)')], default='PENDIENTE', max_length=10)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de Creación')),
+                ('enviado_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Envío')),
+                ('reparacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='avisos', to='gestion_servicios.reparacion')),
+            ],
+            options={
+                'verbose_name': 'Aviso al Cliente',
+                'verbose_name_plural': 'Avisos a Clientes',
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='aviso_estado_proximo')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado__in', ['PENDIENTE', 'ENVIANDO'])), fields=('reparacion', 'tipo'), name='aviso_sin_enviar_unico')],
+            },
+        ),
+    ]
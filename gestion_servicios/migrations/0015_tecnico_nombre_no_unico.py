@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_servicios', '0014_avisos_clientes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tecnico',
+            name='nombre_normalizado',
+            field=models.CharField(db_index=True, editable=False, max_length=150, null=True),
+        ),
+    ]
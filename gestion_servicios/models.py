@@ -1,5 +1,12 @@
 
-from django.db import models
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import models, router, transaction
+from django.utils import timezone
+
+from .garantia import vencimiento
+from .normalizacion import normalizar_clave, normalizar_nombre, normalizar_serie, rango_prefijo
 
 # ======================================================================
 # 0. CLASE ABSTRACTA (AUDITORÍA)
@@ -18,13 +25,50 @@ class TimeStampedModel(models.Model):
         ordering = ['-created_at'] 
 
 
+class NombreNormalizadoMixin:
+    """
+    Mantiene una copia normalizada (normalizar_nombre) del campo de texto de un
+    catálogo, usada como clave de búsqueda: "Samsung", "SAMSUNG" y " samsung "
+    son el mismo registro. Es única salvo en Tecnico. Ver catalogos.py.
+    """
+    campo_nombre = 'nombre'
+    campo_normalizado = 'nombre_normalizado'
+
+    def save(self, *args, **kwargs):
+        setattr(self, self.campo_normalizado, normalizar_nombre(getattr(self, self.campo_nombre)))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.campo_nombre in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {self.campo_normalizado}
+        super().save(*args, **kwargs)
+
+
+class MesesGarantiaMixin:
+    """
+    Catálogos con plazo de garantía propio. Recuerda el plazo con el que se
+    leyó la fila: si cambia, signals.py recalcula vence_garantia de sus equipos.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._meses_garantia_db = instancia.__dict__.get('meses_garantia')
+        return instancia
+
+
 # ======================================================================
 # 1. MODELOS DE CATÁLOGO (Tipo, Marca, Modelo)
 # ======================================================================
 
-class TipoEquipo(models.Model):
+class TipoEquipo(MesesGarantiaMixin, NombreNormalizadoMixin, models.Model):
     """Catálogo de tipos de equipos (Notebook, Smartphone, Tablet, etc.)"""
     nombre = models.CharField(max_length=50, unique=True, verbose_name="Tipo de Equipo")
+    nombre_normalizado = models.CharField(max_length=50, unique=True, null=True, editable=False)
+    meses_garantia = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Meses de Garantía",
+        help_text="Vacío: se usa el plazo de la marca o el general (ver garantia.py)."
+    )
     
     class Meta:
         verbose_name = "Tipo de Equipo"
@@ -35,9 +79,16 @@ class TipoEquipo(models.Model):
         return self.nombre
 
 
-class Marca(models.Model):
+class Marca(MesesGarantiaMixin, NombreNormalizadoMixin, models.Model):
     """Catálogo de marcas (Samsung, Apple, HP, etc.)"""
     nombre = models.CharField(max_length=50, unique=True, verbose_name="Marca")
+    nombre_normalizado = models.CharField(max_length=50, unique=True, null=True, editable=False)
+    meses_garantia = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Meses de Garantía",
+        help_text="Vacío: se usa el plazo del tipo de equipo o el general (ver garantia.py)."
+    )
 
     class Meta:
         verbose_name = "Marca"
@@ -48,12 +99,13 @@ class Marca(models.Model):
         return self.nombre
 
 
-class Modelo(models.Model):
+class Modelo(NombreNormalizadoMixin, models.Model):
     """
     Catálogo de modelos asociados a una marca.
     Ejemplo: Galaxy S21 (Samsung), iPhone 13 (Apple), Pavilion (HP)
     """
     modelo = models.CharField(max_length=100, verbose_name="Modelo")
+    modelo_normalizado = models.CharField(max_length=100, null=True, editable=False)
     marca = models.ForeignKey(
         Marca, 
         on_delete=models.CASCADE, 
@@ -61,10 +113,16 @@ class Modelo(models.Model):
         verbose_name="Marca"
     )
 
+    campo_nombre = 'modelo'
+    campo_normalizado = 'modelo_normalizado'
+
     class Meta:
         verbose_name = "Modelo"
         verbose_name_plural = "Modelos"
         unique_together = [['modelo', 'marca']]  # Un modelo único por marca
+        constraints = [
+            models.UniqueConstraint(fields=['marca', 'modelo_normalizado'], name='modelo_normalizado_unico_por_marca'),
+        ]
         ordering = ['marca', 'modelo']
 
     def __str__(self):
@@ -87,6 +145,9 @@ class Cliente(TimeStampedModel):
         unique=True, 
         verbose_name="DNI/Identificación"
     )
+    # Índice para la búsqueda sin distinción de mayúsculas (el índice único
+    # de `clave` no sirve para clave__iexact, que termina recorriendo la tabla)
+    clave_normalizada = models.CharField(max_length=50, db_index=True, default='', editable=False)
 
     class Meta:
         verbose_name = "Cliente"
@@ -95,10 +156,30 @@ class Cliente(TimeStampedModel):
     def __str__(self):
         return self.nombre
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Clave con la que se leyó: si cambia, también hay que invalidar la caché vieja
+        instancia._clave_normalizada_db = instancia.__dict__.get('clave_normalizada')
+        return instancia
+
+    def preparar_campos_derivados(self):
+        """Igual que en Equipo: llamarla antes de bulk_create()."""
+        self.clave_normalizada = normalizar_clave(self.clave)
 
-class Tecnico(TimeStampedModel):
+    def save(self, *args, **kwargs):
+        self.preparar_campos_derivados()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'clave' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'clave_normalizada'}
+        super().save(*args, **kwargs)
+
+
+class Tecnico(NombreNormalizadoMixin, TimeStampedModel):
     """Técnicos que realizan las reparaciones"""
     nombre = models.CharField(max_length=150, verbose_name="Nombre Completo del Técnico")
+    # Sin unique: dos técnicos pueden llamarse igual (el resolutor toma el primero)
+    nombre_normalizado = models.CharField(max_length=150, db_index=True, null=True, editable=False)
     # Sugerencia: user = models.OneToOneField(User, on_delete=models.CASCADE)
 
     class Meta:
@@ -109,6 +190,58 @@ class Tecnico(TimeStampedModel):
         return self.nombre
 
 
+class EquipoQuerySet(models.QuerySet):
+    """
+    Búsquedas por Nro. de Serie / IMEI sobre las columnas normalizadas.
+    Ambas se resuelven como recorridos de rango sobre un índice (sin LIKE '%...%').
+    """
+
+    def con_serie_que_empieza(self, texto):
+        normalizada = normalizar_serie(texto)
+        if not normalizada:
+            return self.none()
+        desde, hasta = rango_prefijo(normalizada)
+        return self.filter(
+            serie_normalizada__gte=desde, serie_normalizada__lt=hasta
+        ).order_by('serie_normalizada')
+
+    def con_serie_que_termina(self, texto):
+        invertida = normalizar_serie(texto)[::-1]
+        if not invertida:
+            return self.none()
+        desde, hasta = rango_prefijo(invertida)
+        return self.filter(
+            serie_invertida__gte=desde, serie_invertida__lt=hasta
+        ).order_by('serie_invertida')
+
+    def en_garantia(self, fecha=None):
+        """Equipos con garantía vigente a `fecha` (hoy): rango sobre vence_garantia."""
+        return self.filter(vence_garantia__gte=fecha or timezone.localdate())
+
+    def recalcular_vencimientos(self, lote=2000):
+        """
+        Recalcula vence_garantia (p. ej. al cambiar el plazo de una marca).
+        Escribe por lotes con bulk_update y devuelve cuántos equipos cambiaron.
+        """
+        cambiados = []
+        total = 0
+        for equipo in self.select_related('tipo', 'marca').only(
+            'id', 'fecha_compra', 'vence_garantia', 'tipo__meses_garantia', 'marca__meses_garantia'
+        ).iterator(chunk_size=lote):
+            nuevo = vencimiento(equipo.fecha_compra, equipo.tipo, equipo.marca)
+            if nuevo != equipo.vence_garantia:
+                equipo.vence_garantia = nuevo
+                cambiados.append(equipo)
+            if len(cambiados) >= lote:
+                total += len(cambiados)
+                self.model.objects.bulk_update(cambiados, ['vence_garantia'])
+                cambiados = []
+        if cambiados:
+            total += len(cambiados)
+            self.model.objects.bulk_update(cambiados, ['vence_garantia'])
+        return total
+
+
 class Equipo(TimeStampedModel):
     """
     Representa un equipo físico traído para reparación.
@@ -121,6 +254,10 @@ class Equipo(TimeStampedModel):
         verbose_name="Nro. Serie / IMEI",
         help_text="Clave única para identificar el equipo (IMEI, S/N, etc.)"
     )
+    # 🔎 Columnas derivadas de serie_imei (se calculan en save()) para que las
+    # búsquedas por prefijo y por últimos dígitos usen un índice.
+    serie_normalizada = models.CharField(max_length=100, editable=False, db_index=True, default='')
+    serie_invertida = models.CharField(max_length=100, editable=False, db_index=True, default='')
     
     # 📋 CATÁLOGO (OPCIONALES)
     tipo = models.ForeignKey(
@@ -161,7 +298,11 @@ class Equipo(TimeStampedModel):
         null=True, 
         verbose_name="Fecha de Compra"
     )
+    # Derivada de fecha_compra y del plazo del tipo / marca (ver garantia.py)
+    vence_garantia = models.DateField(null=True, editable=False, db_index=True)
     
+    objects = EquipoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Equipo"
         verbose_name_plural = "Equipos"
@@ -172,13 +313,36 @@ class Equipo(TimeStampedModel):
         modelo_nombre = self.modelo.modelo if self.modelo else ""
         return f"{tipo_nombre} {marca_nombre} {modelo_nombre} (SN: {self.serie_imei})".strip()
 
+    def preparar_campos_derivados(self):
+        """
+        Calcula las columnas derivadas de búsqueda. save() la invoca siempre;
+        llamarla explícitamente antes de bulk_create() (que no pasa por save()).
+        """
+        self.serie_normalizada = normalizar_serie(self.serie_imei)
+        self.serie_invertida = self.serie_normalizada[::-1]
+        # Sin fecha de compra no hace falta leer el tipo ni la marca
+        self.vence_garantia = vencimiento(
+            self.fecha_compra,
+            self.tipo if self.fecha_compra and self.tipo_id else None,
+            self.marca if self.fecha_compra and self.marca_id else None,
+        )
+
+    def save(self, *args, **kwargs):
+        self.preparar_campos_derivados()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            derivados = set()
+            if 'serie_imei' in update_fields:
+                derivados |= {'serie_normalizada', 'serie_invertida'}
+            if {'fecha_compra', 'tipo', 'tipo_id', 'marca', 'marca_id'} & set(update_fields):
+                derivados.add('vence_garantia')
+            kwargs['update_fields'] = set(update_fields) | derivados
+        super().save(*args, **kwargs)
+
     @property
     def en_garantia(self):
-        """Verifica si el equipo está en garantía (1 año desde la compra)"""
-        if self.fecha_compra:
-            from datetime import date, timedelta
-            return self.fecha_compra + timedelta(days=365) >= date.today()
-        return False
+        """Verifica si el equipo está en garantía (ver garantia.py)"""
+        return self.vence_garantia is not None and self.vence_garantia >= timezone.localdate()
 
 
 class Repuesto(TimeStampedModel):
@@ -207,6 +371,36 @@ class Repuesto(TimeStampedModel):
 # 3. TRANSACCIONES (Reparacion y Detalle)
 # ======================================================================
 
+class ReparacionQuerySet(models.QuerySet):
+    """Consultas reutilizables sobre las órdenes de servicio."""
+
+    def para_listado(self):
+        """
+        Proyección para los listados: trae en un único JOIN el cliente, el
+        equipo con su modelo y marca (usados por Modelo.__str__) y el técnico,
+        y solo las columnas que se muestran. Evita el N+1 al renderizar filas.
+        Los updated_at forman la clave de la caché de fragmentos por fila.
+        """
+        return self.select_related(
+            'cliente', 'equipo__modelo__marca', 'tecnico_asignado'
+        ).only(
+            'id', 'estado', 'fecha_ingreso', 'updated_at', 'total',
+            'cliente__nombre', 'cliente__clave', 'cliente__updated_at',
+            'equipo__serie_imei', 'equipo__updated_at',
+            'equipo__modelo__modelo', 'equipo__modelo__marca__nombre',
+            'tecnico_asignado__nombre',
+        )
+
+    def con_garantia(self, vigente=True, fecha=None):
+        """Órdenes cuyo equipo está (o no) en garantía a `fecha` (hoy)."""
+        fecha = fecha or timezone.localdate()
+        if vigente:
+            return self.filter(equipo__vence_garantia__gte=fecha)
+        return self.filter(
+            models.Q(equipo__vence_garantia__lt=fecha) | models.Q(equipo__vence_garantia__isnull=True)
+        )
+
+
 class Reparacion(TimeStampedModel):
     """Orden de servicio de reparación"""
     ESTADO_CHOICES = [
@@ -238,6 +432,8 @@ class Reparacion(TimeStampedModel):
         related_name='servicios_asignados'
     )
 
+    objects = ReparacionQuerySet.as_manager()
+
     # FECHAS Y ESTADO
     fecha_ingreso = models.DateTimeField(
         auto_now_add=True, 
@@ -276,14 +472,76 @@ class Reparacion(TimeStampedModel):
         verbose_name="Saldo a Cobrar"
     )
 
+    # TOTALES DESNORMALIZADOS (los mantiene totales.py; no editar a mano)
+    total_repuestos = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name="Total de Repuestos"
+    )
+    total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name="Total de la Orden"
+    )
+
     class Meta:
         verbose_name = "Orden de Servicio"
         verbose_name_plural = "Órdenes de Servicio"
         ordering = ['-fecha_ingreso'] 
+        indexes = [
+            # Paginación keyset del listado: (estado, fecha_ingreso) para las
+            # pestañas TERMINADAS/ENTREGADAS y fecha_ingreso sola para TALLER
+            # (que filtra por exclusión y recorre el índice en orden).
+            models.Index(fields=['estado', 'fecha_ingreso'], name='rep_estado_fecha_idx'),
+            models.Index(fields=['fecha_ingreso'], name='rep_fecha_ingreso_idx'),
+            # Puesta al día del tablero en vivo: filas por (updated_at, pk)
+            models.Index(fields=['updated_at'], name='rep_updated_at_idx'),
+        ]
 
     def __str__(self):
         return f"Orden #{self.pk} - {self.equipo.serie_imei} ({self.estado})"
 
+    def save(self, *args, **kwargs):
+        """
+        total_repuestos se mantiene con UPDATE ... + delta (ver totales.py):
+        una instancia leída antes de cargar un repuesto no debe pisarlo, así
+        que al editar nunca se escribe. Si cambia la mano de obra, total se
+        recalcula con el total_repuestos de la fila, leído con la fila
+        bloqueada hasta el final de la transacción: las señales (post_save)
+        ya ven los dos valores definitivos.
+        """
+        if self._state.adding:
+            self.total = Decimal(str(self.mano_de_obra)) + Decimal(str(self.total_repuestos))
+            return super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            update_fields = [
+                campo.attname for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in ('total_repuestos', 'total')
+            ]
+        else:
+            update_fields = set(update_fields) - {'total_repuestos', 'total'}
+        if 'mano_de_obra' not in update_fields:
+            kwargs['update_fields'] = update_fields
+            return super().save(*args, **kwargs)
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            # Bloqueada, ninguna línea de repuestos mueve total_repuestos
+            # entre esta lectura y el UPDATE (en SQLite ya lo asegura BEGIN IMMEDIATE)
+            self.total_repuestos = (
+                type(self)._base_manager.using(using).select_for_update()
+                .values_list('total_repuestos', flat=True).get(pk=self.pk)
+            )
+            self.total = Decimal(str(self.mano_de_obra)) + Decimal(str(self.total_repuestos))
+            kwargs['update_fields'] = set(update_fields) | {'total'}
+            super().save(*args, **kwargs)
+
 
 class DetalleRepuestoReparacion(models.Model):
     """Relación entre reparaciones y repuestos utilizados"""
@@ -313,4 +571,193 @@ class DetalleRepuestoReparacion(models.Model):
         verbose_name_plural = "Repuestos en Reparaciones"
 
     def __str__(self):
-        return f"{self.cantidad} x {self.repuesto.descripcion} en Orden #{self.reparacion.id}"
\ No newline at end of file
+        return f"{self.cantidad} x {self.repuesto.descripcion} en Orden #{self.reparacion.id}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Importe con el que se leyó: la señal suma a la orden solo la diferencia
+        instancia._importe_db = (
+            instancia.__dict__.get('reparacion_id'),
+            instancia.__dict__.get('cantidad'),
+            instancia.__dict__.get('precio_unitario'),
+        )
+        return instancia
+
+class TransicionEstado(models.Model):
+    """
+    Una fila por alta o cambio de estado de una orden; nunca se modifican.
+    Las escribe historial.py (en tanda, ver historial.registrando()).
+    """
+    reparacion = models.ForeignKey(
+        Reparacion,
+        on_delete=models.CASCADE,
+        related_name='transiciones'
+    )
+    # Vacío en el alta de la orden
+    estado_anterior = models.CharField(max_length=20, blank=True, default='')
+    estado_nuevo = models.CharField(max_length=20)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha del Cambio")
+
+    class Meta:
+        verbose_name = "Transición de Estado"
+        verbose_name_plural = "Transiciones de Estado"
+        indexes = [
+            # Historial de una orden y cálculo de permanencia (tramos consecutivos)
+            models.Index(fields=['reparacion', 'created_at'], name='historial_orden_fecha'),
+        ]
+
+    def __str__(self):
+        return f"Orden #{self.reparacion_id}: {self.estado_anterior or '-'} -> {self.estado_nuevo}"
+
+
+# ======================================================================
+# 4. SOPORTE (contadores para validadores HTTP)
+# ======================================================================
+
+class ContadorCambios(models.Model):
+    """
+    Contador de cambios por tabla (ver validadores.py). Se incrementa en la
+    misma transacción que la escritura, así que leer la versión de una tabla
+    es una búsqueda por clave primaria en lugar de un MAX(updated_at).
+    """
+    tabla = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    actualizado = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Contador de Cambios"
+        verbose_name_plural = "Contadores de Cambios"
+
+    def __str__(self):
+        return f"{self.tabla} v{self.version}"
+
+
+class ContadorEstado(models.Model):
+    """
+    Cantidad de órdenes por (estado, técnico), mantenida en la misma
+    transacción que cada alta / cambio de estado (ver contadores.py). Los
+    badges del listado leen estas pocas filas en lugar de un COUNT(*).
+    """
+    estado = models.CharField(max_length=20)
+    # pk del técnico asignado; 0 = sin asignar
+    tecnico = models.PositiveIntegerField(default=0)
+    cantidad = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Contador por Estado"
+        verbose_name_plural = "Contadores por Estado"
+        constraints = [
+            models.UniqueConstraint(fields=['estado', 'tecnico'], name='contador_estado_unico'),
+        ]
+
+
+class MarcaProceso(models.Model):
+    """
+    Marca de agua de un proceso incremental (p. ej. analitica.py): hasta qué
+    updated_at ya se procesaron las filas de origen.
+    """
+    nombre = models.CharField(max_length=100, primary_key=True)
+    hasta = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Marca de Proceso"
+        verbose_name_plural = "Marcas de Proceso"
+
+
+# ======================================================================
+# 5. ANALÍTICA (resúmenes diarios, ver analitica.py)
+# ======================================================================
+
+class ResumenDiarioDemora(models.Model):
+    """
+    Demoras (fecha_entrega - fecha_ingreso) de las órdenes entregadas que
+    ingresaron un mismo día, por dimensión. Guarda las duraciones completas
+    (uint32 en segundos, empaquetadas con NumPy) para poder combinar días en
+    percentiles exactos por mes.
+    """
+    DIMENSIONES = [
+        ('total', 'Todas las órdenes'),
+        ('tecnico', 'Técnico'),
+        ('marca', 'Marca'),
+        ('tipo', 'Tipo de equipo'),
+    ]
+
+    dia = models.DateField(verbose_name="Día de Ingreso")
+    dimension = models.CharField(max_length=10, choices=DIMENSIONES)
+    # pk del técnico / marca / tipo; 0 = sin asignar (y siempre 0 en 'total')
+    valor = models.PositiveIntegerField(default=0)
+    cantidad = models.PositiveIntegerField()
+    duraciones = models.BinaryField()
+
+    class Meta:
+        verbose_name = "Resumen Diario de Demoras"
+        verbose_name_plural = "Resúmenes Diarios de Demoras"
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'dia', 'valor'], name='resumen_demora_unico'),
+        ]
+
+
+# ======================================================================
+# 6. AVISOS A CLIENTES (bandeja de salida de correos, ver avisos.py)
+# ======================================================================
+
+class AvisoCliente(models.Model):
+    """
+    Correo pendiente o enviado a un cliente. Se crea en la misma transacción
+    que el cambio que lo origina y lo envía `manage.py despachar_avisos`,
+    nunca el request.
+    """
+    TIPOS = [
+        ('TERMINADA', 'Reparación terminada'),
+    ]
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente'),
+        ('ENVIANDO', 'Tomado por un despachador'),
+        ('ENVIADO', 'Enviado'),
+        ('FALLIDO', 'Fallido (sin más reintentos)'),
+    ]
+
+    reparacion = models.ForeignKey(
+        Reparacion,
+        on_delete=models.CASCADE,
+        related_name='avisos'
+    )
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    destinatario = models.EmailField(max_length=255)
+    asunto = models.CharField(max_length=255)
+    cuerpo = models.TextField()
+
+    estado = models.CharField(max_length=10, choices=ESTADOS, default='PENDIENTE')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    # PENDIENTE: no antes de esta fecha; ENVIANDO: hasta cuándo lo reserva el despachador
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha de Creación")
+    enviado_at = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Envío")
+
+    class Meta:
+        verbose_name = "Aviso al Cliente"
+        verbose_name_plural = "Avisos a Clientes"
+        indexes = [
+            # Próximo lote del despachador
+            models.Index(fields=['estado', 'proximo_intento'], name='aviso_estado_proximo'),
+        ]
+        constraints = [
+            # Deduplicación: a lo sumo un aviso sin enviar por orden y tipo
+            models.UniqueConstraint(
+                fields=['reparacion', 'tipo'],
+                condition=models.Q(estado__in=['PENDIENTE', 'ENVIANDO']),
+                name='aviso_sin_enviar_unico',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - Orden #{self.reparacion_id} ({self.estado})"
@@ -0,0 +1,43 @@
+# gestion_servicios/normalizacion.py
+
+"""
+Funciones de normalización de texto compartidas por índices, cachés y
+claves únicas de la app. Mantenerlas en un solo lugar garantiza que
+"Samsung", " SAMSUNG " y "samsung" se traten siempre como el mismo valor.
+"""
+
+
+def normalizar_nombre(texto):
+    """Colapsa espacios y pasa a minúsculas sin distinción de mayúsculas (casefold)."""
+    if texto is None:
+        return ''
+    return ' '.join(str(texto).split()).casefold()
+
+
+def normalizar_clave(clave):
+    """
+    Forma canónica del DNI/identificación del cliente: sin espacios en los
+    extremos y sin distinción de mayúsculas (equivale a clave__iexact).
+    """
+    if clave is None:
+        return ''
+    return str(clave).strip().casefold()
+
+
+def normalizar_serie(serie):
+    """
+    Forma canónica de un Nro. de Serie / IMEI: mayúsculas y solo caracteres
+    alfanuméricos ("35-209 900/176148 1" -> "352099001761481").
+    """
+    if serie is None:
+        return ''
+    return ''.join(c for c in str(serie).upper() if c.isalnum())
+
+
+def rango_prefijo(prefijo):
+    """
+    Devuelve (desde, hasta) tal que desde <= x < hasta equivale a
+    x.startswith(prefijo). Permite resolver búsquedas por prefijo como un
+    recorrido de rango sobre un índice B-tree, en cualquier motor.
+    """
+    return prefijo, prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
@@ -0,0 +1,86 @@
+# gestion_servicios/paginacion.py
+
+"""
+Paginación por cursor (keyset) para los listados de órdenes.
+
+En lugar de OFFSET (que obliga a la base a recorrer todas las filas
+anteriores), cada página se pide "a partir de" la última fila vista,
+usando el par (fecha_ingreso, pk). Con el índice compuesto adecuado,
+cualquier página cuesta lo mismo, sin importar qué tan profunda sea.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no se pudo decodificar."""
+
+
+def codificar_cursor(fecha, pk):
+    """Convierte (fecha_ingreso, pk) en un token opaco apto para URL."""
+    crudo = f"{fecha.isoformat()}|{pk}".encode('ascii')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(token):
+    """Inverso de codificar_cursor(). Lanza CursorInvalido si el token no es válido."""
+    try:
+        relleno = '=' * (-len(token) % 4)
+        crudo = base64.urlsafe_b64decode(token + relleno).decode('ascii')
+        fecha_txt, pk_txt = crudo.split('|', 1)
+        return datetime.fromisoformat(fecha_txt), int(pk_txt)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise CursorInvalido(str(e)) from e
+
+
+class PaginaKeyset:
+    """
+    Resultado de una página keyset. Imita lo mínimo de django.core.paginator.Page
+    que usan los templates (object_list, has_next) y agrega el cursor siguiente.
+    """
+
+    def __init__(self, object_list, siguiente_cursor, cursor_actual):
+        self.object_list = object_list
+        self.siguiente_cursor = siguiente_cursor
+        self.cursor_actual = cursor_actual
+
+    def has_next(self):
+        return self.siguiente_cursor is not None
+
+    def has_previous(self):
+        return self.cursor_actual is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def paginar_por_cursor(queryset, cursor, tamanio):
+    """
+    Devuelve una PaginaKeyset con hasta `tamanio` filas posteriores al cursor.
+
+    El queryset se ordena por (-fecha_ingreso, -pk); se pide una fila extra
+    para saber si existe una página siguiente sin necesidad de un COUNT(*).
+    """
+    queryset = queryset.order_by('-fecha_ingreso', '-pk')
+
+    if cursor:
+        fecha, pk = decodificar_cursor(cursor)
+        queryset = queryset.filter(
+            Q(fecha_ingreso__lt=fecha) | Q(fecha_ingreso=fecha, pk__lt=pk)
+        )
+
+    filas = list(queryset[:tamanio + 1])
+    siguiente = None
+    if len(filas) > tamanio:
+        filas = filas[:tamanio]
+        ultima = filas[-1]
+        siguiente = codificar_cursor(ultima.fecha_ingreso, ultima.pk)
+
+    return PaginaKeyset(filas, siguiente, cursor)
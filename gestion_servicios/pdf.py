@@ -0,0 +1,240 @@
+# gestion_servicios/pdf.py
+
+"""
+Comprobante de ingreso y etiqueta de la orden en PDF, sin dependencias.
+
+Solo usa la biblioteca estándar: lo ejecutan los procesos del pool de
+impresion.py, que lo importan sin cargar Django. Recibe los datos ya
+armados (dict de textos) y devuelve bytes.
+
+- codigo128(): módulos de barras Code 128 (subconjunto C para números de
+  largo par, B para el resto), con su dígito de control.
+- Lienzo: texto (Helvetica, WinAnsi), líneas y rectángulos en puntos, origen
+  abajo a la izquierda.
+- componer(tipo, datos): contenido de la página (el stream), que es lo que
+  se cachea; documento() arma el PDF con una o muchas páginas.
+"""
+
+import textwrap
+
+# ======================================================================
+# CODE 128
+# ======================================================================
+
+# Anchos barra/espacio de cada símbolo (valor = posición); 103-105 inicio A/B/C, 106 fin
+_PATRONES = (
+    '212222 222122 222221 121223 121322 131222 122213 122312 132212 221213 '
+    '221312 231212 112232 122132 122231 113222 123122 123221 223211 221132 '
+    '221231 213212 223112 312131 311222 321122 321221 312212 322112 322211 '
+    '212123 212321 232121 111323 131123 131321 112313 132113 132311 211313 '
+    '231113 231311 112133 112331 132131 113123 113321 133121 313121 211331 '
+    '231131 213113 213311 213131 311123 311321 331121 312113 312311 332111 '
+    '314111 221411 431111 111224 111422 121124 121421 141122 141221 112214 '
+    '112412 122114 122411 142112 142211 241211 221114 413111 241112 134111 '
+    '111242 121142 121241 114212 124112 124211 411212 421112 421211 212141 '
+    '214121 412121 111143 111341 131141 114113 114311 411113 411311 113141 '
+    '114131 311141 411131 211412 211214 211232 2331112'
+).split()
+
+_INICIO_B, _INICIO_C, _FIN = 104, 105, 106
+
+
+def codigo128(texto):
+    """
+    Anchos (en módulos) de barras y espacios alternados, empezando por una
+    barra. No incluye las zonas de silencio: el diseño deja margen a los lados.
+    """
+    if texto.isdigit() and len(texto) % 2 == 0:
+        valores = [_INICIO_C] + [int(texto[i:i + 2]) for i in range(0, len(texto), 2)]
+    else:
+        if any(not 32 <= ord(caracter) < 127 for caracter in texto):
+            raise ValueError("Code 128 B solo admite ASCII imprimible.")
+        valores = [_INICIO_B] + [ord(caracter) - 32 for caracter in texto]
+    control = (valores[0] + sum(posicion * valor for posicion, valor in enumerate(valores[1:], 1))) % 103
+    valores += [control, _FIN]
+    return [int(ancho) for valor in valores for ancho in _PATRONES[valor]]
+
+
+# ======================================================================
+# LIENZO Y DOCUMENTO
+# ======================================================================
+
+MM = 72 / 25.4
+
+
+def _texto_pdf(texto):
+    codificado = str(texto).encode('cp1252', errors='replace')
+    return codificado.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+class Lienzo:
+    """Acumula los operadores de una página."""
+
+    def __init__(self, ancho, alto):
+        self.ancho = ancho
+        self.alto = alto
+        self._ops = []
+
+    def texto(self, x, y, texto, tamano=9, negrita=False):
+        fuente = b'/F2' if negrita else b'/F1'
+        self._ops.append(b'BT %s %.2f Tf %.2f %.2f Td (%s) Tj ET' % (fuente, tamano, x, y, _texto_pdf(texto)))
+
+    def parrafo(self, x, y, texto, ancho, tamano=9, interlineado=1.25, max_lineas=None):
+        """Texto partido en líneas (ancho aproximado de Helvetica); devuelve la y siguiente."""
+        caracteres = max(int(ancho / (tamano * 0.5)), 10)
+        lineas = textwrap.wrap(str(texto), caracteres) or ['']
+        if max_lineas is not None and len(lineas) > max_lineas:
+            lineas = lineas[:max_lineas]
+            lineas[-1] = lineas[-1][:max(caracteres - 3, 0)] + '...'
+        for linea in lineas:
+            self.texto(x, y, linea, tamano)
+            y -= tamano * interlineado
+        return y
+
+    def linea(self, x1, y1, x2, y2, grosor=0.5):
+        self._ops.append(b'%.2f w %.2f %.2f m %.2f %.2f l S' % (grosor, x1, y1, x2, y2))
+
+    def rectangulo(self, x, y, ancho, alto):
+        self._ops.append(b'%.3f %.3f %.3f %.3f re' % (x, y, ancho, alto))
+
+    def codigo_barras(self, x, y, texto, alto, modulo=0.8):
+        """Code 128 con la esquina inferior izquierda de la primera barra en (x, y); devuelve el ancho."""
+        posicion = x
+        for indice, ancho in enumerate(codigo128(texto)):
+            if indice % 2 == 0:
+                self.rectangulo(posicion, y, ancho * modulo, alto)
+            posicion += ancho * modulo
+        self._ops.append(b'f')
+        return posicion - x
+
+    def contenido(self):
+        return b'\n'.join(self._ops)
+
+
+def documento(paginas):
+    """PDF con una página por (ancho, alto, contenido)."""
+    objetos = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # Pages: se completa al final
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+    ]
+    hojas = []
+    for ancho, alto, contenido in paginas:
+        objetos.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(contenido), contenido))
+        objetos.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+            % (ancho, alto, len(objetos))
+        )
+        hojas.append(len(objetos))
+    objetos[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % numero for numero in hojas), len(hojas)
+    )
+
+    salida = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    posiciones = []
+    for numero, objeto in enumerate(objetos, 1):
+        posiciones.append(len(salida))
+        salida += b'%d 0 obj\n%s\nendobj\n' % (numero, objeto)
+    inicio_xref = len(salida)
+    salida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+    salida += b''.join(b'%010d 00000 n \n' % posicion for posicion in posiciones)
+    salida += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objetos) + 1, inicio_xref)
+    return bytes(salida)
+
+
+# ======================================================================
+# DISEÑOS
+# ======================================================================
+
+# (ancho, alto) en puntos
+TAMANIOS = {
+    'comprobante': (148 * MM, 210 * MM),  # A5
+    'etiqueta': (62 * MM, 29 * MM),       # rollo de etiquetas de 62 mm
+}
+
+
+def _comprobante(datos):
+    ancho, alto = TAMANIOS['comprobante']
+    lienzo = Lienzo(ancho, alto)
+    margen = 12 * MM
+    util = ancho - 2 * margen
+    y = alto - margen - 12
+
+    lienzo.texto(margen, y, datos['taller'], 14, negrita=True)
+    lienzo.texto(ancho - margen - 110, y, f"OS N° {datos['numero']}", 14, negrita=True)
+    y -= 16
+    lienzo.texto(margen, y, "Comprobante de ingreso de equipo", 9)
+    lienzo.texto(ancho - margen - 110, y, f"Ingreso: {datos['fecha_ingreso']}", 9)
+    y -= 10
+    lienzo.linea(margen, y, ancho - margen, y)
+
+    secciones = [
+        ("Cliente", [
+            f"{datos['cliente']}  (DNI/CUIT {datos['clave']})",
+            f"Tel.: {datos['telefono'] or '-'}   Email: {datos['email'] or '-'}",
+        ]),
+        ("Equipo", [
+            f"{datos['tipo']} {datos['marca']} {datos['modelo']}".strip() or '-',
+            f"Serie / IMEI: {datos['serie_imei']}",
+            f"Garantía hasta: {datos['vence_garantia'] or 'sin datos de compra'}",
+        ]),
+    ]
+    for titulo, lineas in secciones:
+        y -= 18
+        lienzo.texto(margen, y, titulo, 10, negrita=True)
+        for linea in lineas:
+            y -= 12
+            lienzo.texto(margen, y, linea, 9)
+
+    for titulo, campo in (
+        ("Falla reportada", 'falla_reportada'),
+        ("Accesorios", 'accesorios'),
+        ("Estado general", 'estado_general'),
+    ):
+        y -= 18
+        lienzo.texto(margen, y, titulo, 10, negrita=True)
+        y = lienzo.parrafo(margen, y - 12, datos[campo] or '-', util, 9, max_lineas=6) + 9
+
+    # Código de barras del número de orden, centrado al pie
+    barras_alto = 14 * MM
+    y_barras = margen + 24
+    ancho_barras = sum(codigo128(datos['numero'])) * 1.0
+    lienzo.codigo_barras((ancho - ancho_barras) / 2, y_barras, datos['numero'], barras_alto, modulo=1.0)
+    lienzo.texto(ancho / 2 - 12, y_barras - 11, datos['numero'], 9)
+    lienzo.parrafo(
+        margen, margen, "Presente este comprobante para retirar el equipo.", util, 7
+    )
+    return lienzo
+
+
+def _etiqueta(datos):
+    ancho, alto = TAMANIOS['etiqueta']
+    lienzo = Lienzo(ancho, alto)
+    margen = 2 * MM
+    lienzo.texto(margen, alto - margen - 9, f"OS {datos['numero']}", 10, negrita=True)
+    lienzo.texto(margen + 62, alto - margen - 9, datos['fecha_ingreso'], 7)
+    lienzo.texto(margen, alto - margen - 18, datos['cliente'][:34], 7)
+    lienzo.texto(margen, alto - margen - 26, f"{datos['marca']} {datos['modelo']}".strip()[:34], 7)
+    # Centrado, con 10 módulos de silencio a cada lado
+    modulos = sum(codigo128(datos['numero']))
+    modulo = min(1.2, (ancho - 2 * margen) / (modulos + 20))
+    lienzo.codigo_barras((ancho - modulos * modulo) / 2, margen, datos['numero'], alto - 2 * margen - 30, modulo=modulo)
+    return lienzo
+
+
+DISENIOS = {
+    'comprobante': _comprobante,
+    'etiqueta': _etiqueta,
+}
+
+
+def componer(tipo, datos):
+    """Contenido (stream) de la página `tipo` para `datos`; corre en el pool de procesos."""
+    return DISENIOS[tipo](datos).contenido()
+
+
+def componer_lote(tipo, lote):
+    """componer() para varias órdenes en un solo viaje al proceso: [(clave, datos)] -> [(clave, contenido)]."""
+    return [(clave, componer(tipo, datos)) for clave, datos in lote]
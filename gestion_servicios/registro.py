@@ -0,0 +1,90 @@
+# gestion_servicios/registro.py
+
+"""
+Piezas de logging de la app, referenciadas desde settings.LOGGING.
+
+- ManejadorCola: QueueHandler cuyo QueueListener escribe en un hilo aparte.
+  El request solo encola el registro (microsegundos), sin armar el mensaje
+  ni el traceback, y nunca se bloquea esperando al pipe de stdout/stderr.
+  Si la cola se llena, descarta el registro en lugar de frenar al worker.
+- FiltroMuestreo: deja pasar solo una fracción de los mensajes DEBUG/INFO
+  de un logger; WARNING o superior pasan siempre.
+
+Loggers de la app:
+    gestion_servicios.ingreso     recepción de equipos (ReparacionCreateView)
+    gestion_servicios.catalogos   altas de tipo/marca/modelo/técnico
+"""
+
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+
+class ManejadorCola(QueueHandler):
+    """
+    Encola los registros y los escribe desde un hilo de fondo.
+
+    destino: 'stderr' | 'stdout' | ruta de archivo.
+    capacidad: tamaño máximo de la cola (los excedentes se descartan y se cuentan).
+    """
+
+    def __init__(self, destino='stderr', capacidad=10000):
+        super().__init__(queue.Queue(capacidad))
+        if destino == 'stderr':
+            self.destino = logging.StreamHandler(sys.stderr)
+        elif destino == 'stdout':
+            self.destino = logging.StreamHandler(sys.stdout)
+        else:
+            self.destino = logging.FileHandler(destino, encoding='utf-8')
+        self.descartados = 0
+        self._listener = None
+        self._iniciar()
+        atexit.register(self.close)
+        # Si el servidor hace fork después de configurar el logging (p. ej.
+        # gunicorn --preload), el hilo no sobrevive: se reinicia en el hijo.
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._iniciar)
+
+    def _iniciar(self):
+        self._listener = QueueListener(self.queue, self.destino, respect_handler_level=True)
+        self._listener.start()
+
+    def setFormatter(self, fmt):
+        # El formato se aplica en el hilo de fondo, no en el del request
+        self.destino.setFormatter(fmt)
+
+    def prepare(self, record):
+        # QueueHandler.prepare() arma msg % args y el traceback para poder
+        # enviar el registro a otro proceso; esta cola es del mismo proceso,
+        # así que el registro viaja tal cual y se formatea en el hilo de fondo.
+        # Por eso los args deben ser valores, no objetos que consulten la base.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            self.destino.close()
+        super().close()
+
+
+class FiltroMuestreo(logging.Filter):
+    """Deja pasar una fracción `tasa` (0..1) de los registros por debajo de `nivel`."""
+
+    def __init__(self, tasa=1.0, nivel='WARNING'):
+        super().__init__()
+        self.tasa = float(tasa)
+        self.nivel = logging.getLevelName(nivel) if isinstance(nivel, str) else nivel
+
+    def filter(self, record):
+        return record.levelno >= self.nivel or random.random() < self.tasa
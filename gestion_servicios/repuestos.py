@@ -0,0 +1,158 @@
+# gestion_servicios/repuestos.py
+
+"""
+Consumo de repuestos desde el taller.
+
+consumir_repuestos() descuenta stock y registra las líneas de la orden
+(DetalleRepuestoReparacion) en una sola transacción, con varias líneas por
+llamada. El descuento es un UPDATE condicional:
+
+    UPDATE repuesto SET stock_actual = stock_actual - n
+    WHERE id = ? AND stock_actual >= n
+
+así que la verificación y la resta ocurren en la base, en una sola sentencia:
+no hay lectura previa que otro técnico pueda invalidar (sin "lost updates")
+y el stock nunca queda negativo. Si alguna línea no alcanza, se revierte el
+pedido completo y se informa qué faltó. Ambas funciones actualizan el total
+desnormalizado de la orden (totales.py) en la misma transacción.
+"""
+
+from collections import OrderedDict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DetalleRepuestoReparacion, Repuesto
+from . import totales
+
+
+class StockInsuficiente(Exception):
+    """
+    Alguna línea pedía más de lo disponible. `faltantes` es un dict
+    repuesto_id -> (cantidad pedida, stock disponible al momento de fallar).
+    """
+
+    def __init__(self, faltantes):
+        self.faltantes = faltantes
+        detalle = ', '.join(
+            f"#{pk}: pedido {pedido}, disponible {disponible}"
+            for pk, (pedido, disponible) in faltantes.items()
+        )
+        super().__init__(f"Stock insuficiente ({detalle}).")
+
+
+def _agrupar(lineas):
+    """
+    Acepta pares (repuesto_id, cantidad) y suma los repetidos. Devuelve un
+    OrderedDict ordenado por id: todas las transacciones toman los repuestos
+    en el mismo orden, lo que evita interbloqueos en motores con bloqueo por fila.
+    """
+    cantidades = {}
+    for repuesto_id, cantidad in lineas:
+        cantidad = int(cantidad)
+        if cantidad <= 0:
+            raise ValueError("La cantidad de cada línea debe ser mayor que cero.")
+        cantidades[int(repuesto_id)] = cantidades.get(int(repuesto_id), 0) + cantidad
+    return OrderedDict(sorted(cantidades.items()))
+
+
+@transaction.atomic
+def consumir_repuestos(reparacion, lineas):
+    """
+    Descuenta del stock y agrega a la orden cada (repuesto_id, cantidad) de
+    `lineas`. Si el repuesto ya estaba en la orden se suma a su línea (que
+    conserva el precio con el que se cargó). Todo o nada: lanza
+    StockInsuficiente sin modificar nada si alguna línea no alcanza.
+
+    Devuelve {repuesto_id: DetalleRepuestoReparacion} con las líneas actualizadas.
+    """
+    pedidos = _agrupar(lineas)
+    if not pedidos:
+        return {}
+
+    # 1) Descuento condicional, una sentencia por repuesto
+    faltantes = {}
+    for repuesto_id, cantidad in pedidos.items():
+        descontados = Repuesto.objects.filter(pk=repuesto_id, stock_actual__gte=cantidad).update(
+            stock_actual=F('stock_actual') - cantidad, updated_at=timezone.now()
+        )
+        if not descontados:
+            faltantes[repuesto_id] = cantidad
+    if faltantes:
+        disponibles = dict(
+            Repuesto.objects.filter(pk__in=faltantes).values_list('pk', 'stock_actual')
+        )
+        # Los ids inexistentes se informan con disponible = 0
+        raise StockInsuficiente({
+            pk: (pedido, disponibles.get(pk, 0)) for pk, pedido in faltantes.items()
+        })
+
+    # 2) Líneas de la orden: primero se suma a las existentes...
+    nuevas = []
+    for repuesto_id, cantidad in pedidos.items():
+        sumadas = DetalleRepuestoReparacion.objects.filter(
+            reparacion=reparacion, repuesto_id=repuesto_id
+        ).update(cantidad=F('cantidad') + cantidad)
+        if not sumadas:
+            nuevas.append(repuesto_id)
+
+    # ...y las que faltan se crean con el precio de venta actual
+    creadas = set()
+    if nuevas:
+        precios = dict(Repuesto.objects.filter(pk__in=nuevas).values_list('pk', 'precio_venta'))
+        for repuesto_id in nuevas:
+            try:
+                with transaction.atomic():
+                    DetalleRepuestoReparacion.objects.create(
+                        reparacion=reparacion, repuesto_id=repuesto_id,
+                        cantidad=pedidos[repuesto_id], precio_unitario=precios[repuesto_id],
+                    )
+            except IntegrityError:
+                # Otro técnico creó la misma línea entre el UPDATE y el INSERT
+                DetalleRepuestoReparacion.objects.filter(
+                    reparacion=reparacion, repuesto_id=repuesto_id
+                ).update(cantidad=F('cantidad') + pedidos[repuesto_id])
+            else:
+                creadas.add(repuesto_id)
+
+    detalles = {
+        detalle.repuesto_id: detalle
+        for detalle in DetalleRepuestoReparacion.objects.filter(reparacion=reparacion, repuesto_id__in=pedidos)
+    }
+    # 3) Total de la orden: las líneas creadas ya sumaron por su post_save;
+    # las que se escribieron con update() no emiten señales
+    totales.sumar({reparacion.pk: sum(
+        totales.importe(cantidad, detalles[repuesto_id].precio_unitario)
+        for repuesto_id, cantidad in pedidos.items() if repuesto_id not in creadas
+    )})
+    return detalles
+
+
+@transaction.atomic
+def devolver_repuestos(reparacion, lineas):
+    """
+    Operación inversa: quita `cantidad` de la línea de la orden (borrándola
+    si llega a cero) y la reintegra al stock. Lanza ValueError sin modificar
+    nada si alguna línea de la orden tiene menos de lo que se quiere devolver.
+    """
+    pedidos = _agrupar(lineas)
+    for repuesto_id, cantidad in pedidos.items():
+        restadas = DetalleRepuestoReparacion.objects.filter(
+            reparacion=reparacion, repuesto_id=repuesto_id, cantidad__gte=cantidad
+        ).update(cantidad=F('cantidad') - cantidad)
+        if not restadas:
+            raise ValueError(f"La orden no tiene {cantidad} unidades del repuesto #{repuesto_id}.")
+        Repuesto.objects.filter(pk=repuesto_id).update(
+            stock_actual=F('stock_actual') + cantidad, updated_at=timezone.now()
+        )
+    precios = dict(
+        DetalleRepuestoReparacion.objects.filter(reparacion=reparacion, repuesto_id__in=pedidos)
+        .values_list('repuesto_id', 'precio_unitario')
+    )
+    totales.sumar({reparacion.pk: -sum(
+        totales.importe(cantidad, precios[repuesto_id]) for repuesto_id, cantidad in pedidos.items()
+    )})
+    DetalleRepuestoReparacion.objects.filter(
+        reparacion=reparacion, repuesto_id__in=pedidos, cantidad=0
+    ).delete()
@@ -0,0 +1,256 @@
+# gestion_servicios/signals.py
+
+"""
+Receptores de señales de la app. Se conectan en GestionServiciosConfig.ready().
+"""
+
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_migrate, post_save, post_delete, pre_delete, pre_migrate, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Cliente, DetalleRepuestoReparacion, Equipo, Reparacion, TipoEquipo, Marca, Modelo, Tecnico
+from . import autocompletado
+from . import avisos
+from . import busqueda
+from . import catalogos
+from . import clientes
+from . import contadores
+from . import historial
+from . import sqlite
+from . import tablero
+from . import totales
+from . import transiciones
+from . import validadores
+
+
+# ----------------------------------------------------------------------
+# Ajustes de cada conexión nueva a SQLite (WAL, busy_timeout, etc.)
+# ----------------------------------------------------------------------
+
+@receiver(connection_created)
+def configurar_conexion(sender, connection, **kwargs):
+    sqlite.aplicar_pragmas(connection)
+
+
+# ----------------------------------------------------------------------
+# Índice FTS5: SQLite recrea la tabla en cada ALTER y los triggers que
+# cruzan reparación/equipo lo impedirían; se quitan durante la migración
+# ----------------------------------------------------------------------
+
+@receiver(pre_migrate)
+def quitar_triggers_busqueda(sender, using, **kwargs):
+    if sender.name == 'gestion_servicios':
+        busqueda.quitar_triggers(connections[using])
+
+
+@receiver(post_migrate)
+def restaurar_indice_busqueda(sender, using, **kwargs):
+    if sender.name != 'gestion_servicios':
+        return
+    conexion = connections[using]
+    aplicadas = MigrationRecorder(conexion).applied_migrations()
+    if ('gestion_servicios', '0007_busqueda_fts') in aplicadas:
+        busqueda.asegurar_indice(conexion)
+
+
+# ----------------------------------------------------------------------
+# Invalidación del índice de autocompletado y del resolutor de catálogos
+# ----------------------------------------------------------------------
+
+@receiver(post_save, sender=TipoEquipo)
+@receiver(post_save, sender=Marca)
+@receiver(post_save, sender=Modelo)
+@receiver(post_save, sender=Tecnico)
+@receiver(post_delete, sender=TipoEquipo)
+@receiver(post_delete, sender=Marca)
+@receiver(post_delete, sender=Modelo)
+@receiver(post_delete, sender=Tecnico)
+def invalidar_indice_catalogo(sender, **kwargs):
+    # Se invalida al confirmar la transacción para no reconstruir el índice
+    # con filas que todavía podrían revertirse.
+    transaction.on_commit(autocompletado.INDICES_POR_MODELO[sender].invalidar)
+    transaction.on_commit(catalogos.RESOLUTORES_POR_MODELO[sender].invalidar)
+
+
+# ----------------------------------------------------------------------
+# Invalidación de la caché de búsqueda de clientes por clave
+# ----------------------------------------------------------------------
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+def invalidar_cache_cliente(sender, instance, **kwargs):
+    # La clave actual (un alta invalida el "no existe" cacheado) y la que
+    # tenía al leerse, por si se editó
+    claves = (instance.clave, getattr(instance, '_clave_normalizada_db', None))
+    transaction.on_commit(lambda: clientes.POR_CLAVE.invalidar(*claves))
+
+
+# ----------------------------------------------------------------------
+# Contadores de cambios por tabla (ETag de listados y búsquedas)
+# ----------------------------------------------------------------------
+
+@receiver([post_save, post_delete], sender=Reparacion)
+@receiver([post_save, post_delete], sender=Cliente)
+@receiver([post_save, post_delete], sender=Equipo)
+@receiver([post_save, post_delete], sender=TipoEquipo)
+@receiver([post_save, post_delete], sender=Marca)
+@receiver([post_save, post_delete], sender=Modelo)
+@receiver([post_save, post_delete], sender=Tecnico)
+def contar_cambio(sender, **kwargs):
+    # En la misma transacción que la escritura: el ETag cambia justo al confirmar
+    validadores.registrar_cambio(sender)
+
+
+# ----------------------------------------------------------------------
+# Totales desnormalizados de la orden (ver totales.py)
+# ----------------------------------------------------------------------
+
+@receiver(post_save, sender=DetalleRepuestoReparacion)
+def sumar_detalle_al_total(sender, instance, created, **kwargs):
+    deltas = {instance.reparacion_id: totales.importe(instance.cantidad, instance.precio_unitario)}
+    anterior = None if created else getattr(instance, '_importe_db', None)
+    if anterior is not None and None not in anterior:
+        reparacion_id, cantidad, precio = anterior
+        deltas[reparacion_id] = deltas.get(reparacion_id, 0) - totales.importe(cantidad, precio)
+    elif not created:
+        # Instancia sin estado leído (p. ej. armada a mano con pk): no se
+        # conoce el importe previo, se recalcula la orden entera
+        totales.recalcular([instance.reparacion_id])
+        deltas = {}
+    totales.sumar(deltas)
+    instance._importe_db = (instance.reparacion_id, instance.cantidad, instance.precio_unitario)
+
+
+@receiver(post_delete, sender=DetalleRepuestoReparacion)
+def restar_detalle_del_total(sender, instance, **kwargs):
+    leido = getattr(instance, '_importe_db', None)
+    if leido is None or None in leido:
+        leido = (instance.reparacion_id, instance.cantidad, instance.precio_unitario)
+    reparacion_id, cantidad, precio = leido
+    totales.sumar({reparacion_id: -totales.importe(cantidad, precio)})
+
+
+# ----------------------------------------------------------------------
+# Contadores por estado y técnico (badges del listado, ver contadores.py)
+# ----------------------------------------------------------------------
+
+def _clave_contador_en_base(instance):
+    """
+    Clave (estado, técnico) con la que la orden está guardada; None si no
+    existe. Se lee de la base (y se bloquea la fila dentro de una
+    transacción) porque la instancia puede estar desactualizada.
+    """
+    filas = Reparacion.objects.filter(pk=instance.pk)
+    if transaction.get_connection().in_atomic_block:
+        filas = filas.select_for_update()
+    en_base = filas.values_list('estado', 'tecnico_asignado_id').first()
+    return contadores.clave(*en_base) if en_base else None
+
+
+@receiver(pre_save, sender=Reparacion)
+def recordar_clave_contador(sender, instance, **kwargs):
+    instance._clave_contador_previa = None if instance._state.adding else _clave_contador_en_base(instance)
+
+
+@receiver(post_save, sender=Reparacion)
+def mover_contador_estado(sender, instance, update_fields=None, **kwargs):
+    previa = getattr(instance, '_clave_contador_previa', None)
+    estado, tecnico_id = instance.estado, instance.tecnico_asignado_id
+    if update_fields is not None and previa is not None:
+        # Lo que no se escribió sigue como estaba en la base
+        estado = estado if 'estado' in update_fields else previa[0]
+        if 'tecnico_asignado' not in update_fields and 'tecnico_asignado_id' not in update_fields:
+            tecnico_id = previa[1]
+    contadores.mover(previa, contadores.clave(estado, tecnico_id))
+    if previa is None or previa[0] != estado:
+        # Mismo aviso que envía transiciones.aplicar() para los cambios en lote (anterior None = alta)
+        anterior = previa[0] if previa is not None else None
+        transiciones.estado_cambiado.send(sender=Reparacion, cambios=[(instance.pk, anterior, estado)], usuario=None)
+
+
+@receiver(pre_delete, sender=Reparacion)
+def descontar_contador_estado(sender, instance, **kwargs):
+    # pre_delete corre dentro de la transacción del borrado, con la fila todavía presente
+    contadores.mover(_clave_contador_en_base(instance), None)
+
+
+@receiver(pre_delete, sender=Tecnico)
+def liberar_ordenes_tecnico(sender, instance, **kwargs):
+    # on_delete=SET_NULL desasigna las órdenes con un UPDATE sin señales de
+    # Reparacion: contadores, updated_at (ETag, fragmentos, analítica) y
+    # tablero se ajustan a mano, en la misma transacción del borrado
+    ordenes = Reparacion.objects.filter(tecnico_asignado=instance)
+    pks = list(ordenes.values_list('pk', flat=True))
+    contadores.quitar_tecnico(instance.pk)
+    if pks:
+        ordenes.update(updated_at=timezone.now())
+        validadores.registrar_cambio(Reparacion)
+        tablero.avisar([(pk, 'cambio') for pk in pks])
+
+
+# ----------------------------------------------------------------------
+# Historial de estados (ver historial.py)
+# ----------------------------------------------------------------------
+
+@receiver(transiciones.estado_cambiado)
+def registrar_historial_estado(sender, cambios, usuario=None, **kwargs):
+    historial.registrar(cambios, usuario)
+
+
+# ----------------------------------------------------------------------
+# Avisos por correo al cliente (bandeja de salida, ver avisos.py)
+# ----------------------------------------------------------------------
+
+@receiver(transiciones.estado_cambiado)
+def encolar_aviso_terminada(sender, cambios, **kwargs):
+    # Solo cambios de estado: un alta ya TERMINADA (p. ej. carga de historial) no avisa
+    terminadas = [pk for pk, anterior, nuevo in cambios if nuevo == 'TERMINADA' and anterior not in (None, 'TERMINADA')]
+    if terminadas:
+        avisos.encolar('TERMINADA', terminadas)
+
+
+# ----------------------------------------------------------------------
+# Tablero en vivo (ver tablero.py); sin tableros conectados no hace nada
+# ----------------------------------------------------------------------
+
+@receiver(transiciones.estado_cambiado)
+def avisar_tablero_estado(sender, cambios, **kwargs):
+    # Altas y cambios de estado, de save() o de los lotes
+    tablero.avisar([(pk, tablero.motivo(anterior, nuevo)) for pk, anterior, nuevo in cambios])
+
+
+@receiver(post_save, sender=Reparacion)
+def avisar_tablero_cambio(sender, instance, created, **kwargs):
+    # Técnico, textos, etc.; si además cambió el estado, gana ese motivo
+    if not created:
+        tablero.avisar([(instance.pk, 'cambio')])
+
+
+@receiver(post_delete, sender=Reparacion)
+def avisar_tablero_baja(sender, instance, **kwargs):
+    tablero.avisar([(instance.pk, 'baja')])
+
+
+@receiver([post_save, post_delete], sender=DetalleRepuestoReparacion)
+def avisar_tablero_total(sender, instance, **kwargs):
+    # El total de la orden lo movió totales.sumar(), que no emite post_save
+    tablero.avisar([(instance.reparacion_id, 'cambio')])
+
+
+# ----------------------------------------------------------------------
+# Vencimiento de garantía de los equipos al cambiar el plazo de un catálogo
+# ----------------------------------------------------------------------
+
+@receiver(post_save, sender=TipoEquipo)
+@receiver(post_save, sender=Marca)
+def recalcular_garantia_catalogo(sender, instance, created, **kwargs):
+    if created or instance.meses_garantia == getattr(instance, '_meses_garantia_db', instance.meses_garantia):
+        return
+    campo = 'tipo' if sender is TipoEquipo else 'marca'
+    if Equipo.objects.filter(**{campo: instance}).recalcular_vencimientos():
+        # bulk_update no emite señales
+        validadores.registrar_cambio(Equipo)
+    instance._meses_garantia_db = instance.meses_garantia
@@ -0,0 +1,37 @@
+# gestion_servicios/sqlite.py
+
+"""
+Ajustes de conexión para SQLite en producción.
+
+Cada conexión nueva recibe los PRAGMAs de settings.SQLITE_PRAGMAS (modo WAL,
+busy_timeout, synchronous, mmap_size, cache_size). Se invoca desde la señal
+connection_created (ver signals.py).
+"""
+
+import re
+
+from django.conf import settings
+
+# Solo se aceptan estos PRAGMAs, y valores enteros o identificadores simples,
+# porque PRAGMA no admite parámetros enlazados.
+PRAGMAS_PERMITIDOS = {'journal_mode', 'busy_timeout', 'synchronous', 'mmap_size', 'cache_size',
+                      'temp_store', 'foreign_keys', 'wal_autocheckpoint'}
+_VALOR_VALIDO = re.compile(r'^(-?\d+|[A-Za-z_]+)$')
+
+
+def aplicar_pragmas(connection):
+    """Ejecuta los PRAGMAs configurados sobre una conexión SQLite recién creada."""
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+
+    with connection.cursor() as cursor:
+        for nombre, valor in pragmas.items():
+            if nombre not in PRAGMAS_PERMITIDOS:
+                raise ValueError(f"PRAGMA no permitido en SQLITE_PRAGMAS: {nombre!r}")
+            if not _VALOR_VALIDO.match(str(valor)):
+                raise ValueError(f"Valor inválido para PRAGMA {nombre}: {valor!r}")
+            cursor.execute(f"PRAGMA {nombre} = {valor}")
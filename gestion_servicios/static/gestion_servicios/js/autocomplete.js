@@ -29,12 +29,14 @@ if (claveInput) {
         const clave = claveInput.value.trim();
 
         if (clave.length > 0) {
-            // URL de la API. Usamos 'servicios/' porque es el namespace de la app
-            const apiUrl = `/servicios/api/buscar_cliente/?clave=${clave}`; 
+            // Búsqueda combinada de la recepción (api_buscar_ingreso), solo la parte del cliente.
+            // Usamos 'servicios/' porque es el namespace de la app
+            const apiUrl = `/servicios/api/buscar-ingreso/?${new URLSearchParams({clave: clave})}`;
             
             fetch(apiUrl)
                 .then(response => response.json())
-                .then(data => {
+                .then(respuesta => {
+                    const data = respuesta.cliente;
                     if (data.existe) {
                         // Cliente encontrado: autocompletar y deshabilitar edición
                         alert(`Cliente ${data.nombre} encontrado. Autocompletando datos.`);
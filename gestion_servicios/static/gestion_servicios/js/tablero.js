@@ -0,0 +1,148 @@
+// gestion_servicios/static/gestion_servicios/js/tablero.js
+
+// Tablero en vivo del listado: en lugar de recargar la página, recibe por
+// Server-Sent Events solo las filas que cambiaron (ver tablero.py).
+// Eventos: 'fila' (alta o cambio: se reemplaza la fila por pk), 'quitar'
+// (la orden pasó a otra pestaña o se borró) y 'recargar'.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const tablero = document.getElementById('tablero-vivo');
+    if (!tablero || !window.EventSource) {
+        return;
+    }
+    const pestania = tablero.dataset.pestania;
+    const paginaCompleta = tablero.dataset.completo === '1';
+
+    function url(plantilla, pk) {
+        // Las URLs vienen con pk=0: /servicios/0/modificar/
+        return plantilla.replace('/0/', '/' + pk + '/');
+    }
+
+    function celda(fila, texto) {
+        const td = document.createElement('td');
+        td.textContent = texto;
+        fila.appendChild(td);
+        return td;
+    }
+
+    function enlace(td, href, texto, clases, nuevaPestania) {
+        const a = document.createElement('a');
+        a.href = href;
+        a.className = clases;
+        a.textContent = texto;
+        if (nuevaPestania) {
+            a.target = '_blank';
+        }
+        td.appendChild(a);
+    }
+
+    // Misma estructura que las filas de lista_servicios.html
+    function armarFila(datos) {
+        const tr = document.createElement('tr');
+        tr.dataset.pk = datos.pk;
+        tr.dataset.ingreso = datos.fecha_ingreso;
+        const terminada = datos.estado === 'TERMINADA' || datos.estado === 'NO_REPARABLE';
+
+        if (pestania === 'TERMINADAS') {
+            const td = document.createElement('td');
+            const casilla = document.createElement('input');
+            casilla.type = 'checkbox';
+            casilla.className = 'form-check-input';
+            casilla.name = 'ordenes';
+            casilla.value = datos.pk;
+            casilla.setAttribute('form', 'form-entrega-masiva');
+            casilla.setAttribute('aria-label', 'Seleccionar OS #' + datos.pk);
+            td.appendChild(casilla);
+            tr.appendChild(td);
+        }
+        celda(tr, datos.pk);
+        celda(tr, datos.cliente + ' (' + datos.clave + ')');
+        celda(tr, datos.equipo + ' / IMEI: ' + datos.serie_imei);
+        celda(tr, datos.fecha_ingreso.slice(0, 10));
+        celda(tr, datos.tecnico || '-');
+        const estado = document.createElement('span');
+        estado.className = 'badge bg-secondary';
+        estado.textContent = datos.estado_display;
+        celda(tr, '').appendChild(estado);
+        celda(tr, '$ ' + Number(datos.total).toFixed(2)).className = 'text-end';
+
+        const acciones = celda(tr, '');
+        enlace(acciones, url(tablero.dataset.urlModificar, datos.pk), 'Modificar', 'btn btn-sm btn-info me-2');
+        enlace(acciones, url(tablero.dataset.urlImprimir, datos.pk), 'Comprobante', 'btn btn-sm btn-outline-dark me-2', true);
+        if (terminada) {
+            const form = document.createElement('form');
+            form.method = 'post';
+            form.action = url(tablero.dataset.urlCerrar, datos.pk);
+            form.style.display = 'inline';
+            const csrf = document.createElement('input');
+            csrf.type = 'hidden';
+            csrf.name = 'csrfmiddlewaretoken';
+            csrf.value = tablero.dataset.csrf;
+            const boton = document.createElement('button');
+            boton.type = 'submit';
+            boton.className = 'btn btn-sm btn-success';
+            boton.textContent = 'Entregar';
+            boton.addEventListener('click', function(e) {
+                if (!confirm('¿Confirma la entrega y cierre de la OS #' + datos.pk + '?')) {
+                    e.preventDefault();
+                }
+            });
+            form.append(csrf, boton);
+            acciones.appendChild(form);
+        }
+        return tr;
+    }
+
+    function filaExistente(pk) {
+        return document.querySelector('#filas-servicios tr[data-pk="' + pk + '"]');
+    }
+
+    function ubicar(cuerpo, tr) {
+        // Orden del listado: fecha de ingreso descendente
+        const ingreso = Date.parse(tr.dataset.ingreso);
+        for (const otra of cuerpo.rows) {
+            if (Date.parse(otra.dataset.ingreso) < ingreso) {
+                cuerpo.insertBefore(tr, otra);
+                return;
+            }
+        }
+        // Más vieja que todas las visibles: solo si no hay página siguiente
+        if (paginaCompleta) {
+            cuerpo.appendChild(tr);
+        }
+    }
+
+    const fuente = new EventSource(tablero.dataset.novedades);
+
+    fuente.addEventListener('fila', function(e) {
+        const datos = JSON.parse(e.data);
+        const cuerpo = document.getElementById('filas-servicios');
+        if (!cuerpo) {
+            // El listado estaba vacío y no hay tabla donde agregar
+            fuente.close();
+            location.reload();
+            return;
+        }
+        const nueva = armarFila(datos.fila);
+        nueva.classList.add('table-warning');
+        setTimeout(function() { nueva.classList.remove('table-warning'); }, 3000);
+        const actual = filaExistente(datos.pk);
+        if (actual) {
+            actual.replaceWith(nueva);
+        } else {
+            ubicar(cuerpo, nueva);
+        }
+    });
+
+    fuente.addEventListener('quitar', function(e) {
+        const actual = filaExistente(JSON.parse(e.data).pk);
+        if (actual) {
+            actual.remove();
+        }
+    });
+
+    fuente.addEventListener('recargar', function() {
+        fuente.close();
+        location.reload();
+    });
+});
@@ -0,0 +1,258 @@
+# gestion_servicios/tablero.py
+
+"""
+Tablero del taller en vivo: novedades de las órdenes por Server-Sent Events.
+
+Las pantallas del taller dejan abierto el listado. En lugar de recargarlo
+entero, abren un EventSource (vistas_async.tablero_novedades, solo bajo ASGI
+con ASGI_VISTAS_ASYNC)
+y reciben únicamente las filas que cambiaron: altas, cambios de estado,
+entregas y otros cambios visibles (técnico, total), más las bajas.
+
+Cómo llegan las novedades:
+
+- Las señales (signals.py) llaman a avisar() con (pk, motivo). Ahí salen
+  save(), transiciones.aplicar(), el ingreso por lote (vía
+  transiciones.estado_cambiado) y los repuestos que mueven el total. Se
+  anotan al confirmar la transacción; si no hay tableros conectados, no se
+  hace nada.
+- NOVEDADES junta los pks marcados. El primer tablero que se despierta lee
+  esas filas con una sola consulta y deja los eventos en un buffer circular
+  numerado, del que leen todos los tableros conectados. La consulta es una
+  por tanda de cambios, no una por tablero.
+
+Cursor: cada fila viaja con el `id` de SSE (updated_at, pk), con el mismo
+formato que el cursor de paginacion.py. Al reconectarse, el navegador lo
+manda en Last-Event-ID y el tablero se pone al día desde la base con las
+filas de updated_at posterior. El listado también lo pasa en ?cursor= al
+abrir la conexión. Se repasa MARGEN hacia atrás, así no se saltean las
+escrituras que se confirmaron tarde. Una fila repetida no molesta: en el
+navegador se reemplaza la fila por pk. Las bajas no dejan rastro en la base,
+así que solo llegan en vivo.
+
+El canal vive en memoria del proceso. Con varios procesos ASGI, cada uno ve
+solo sus propias escrituras en vivo. Las del resto, y las de WSGI o de los
+comandos, aparecen al reconectarse.
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+from datetime import timedelta
+from functools import partial
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from . import contadores
+from .models import Reparacion
+from .paginacion import codificar_cursor
+
+MARGEN = timedelta(seconds=30)
+CAPACIDAD = 2000
+MAXIMO_PONERSE_AL_DIA = 500
+LATIDO = 15  # segundos sin novedades antes de mandar un comentario (mantiene viva la conexión)
+
+# Si una orden cambia varias veces antes de leerse, queda el motivo más importante
+PRIORIDAD = {'cambio': 0, 'estado': 1, 'entrega': 2, 'alta': 3, 'baja': 4}
+
+
+def motivo(anterior, nuevo):
+    """Motivo de una transición de transiciones.estado_cambiado (anterior None = alta)."""
+    if anterior is None:
+        return 'alta'
+    return 'entrega' if nuevo == 'ENTREGADA' else 'estado'
+
+
+def datos_fila(reparacion):
+    """Fila del listado en JSON (requiere Reparacion.objects.para_listado())."""
+    return {
+        'pk': reparacion.pk,
+        'cliente': reparacion.cliente.nombre,
+        'clave': reparacion.cliente.clave,
+        'equipo': str(reparacion.equipo.modelo) if reparacion.equipo.modelo else '',
+        'serie_imei': reparacion.equipo.serie_imei,
+        'fecha_ingreso': reparacion.fecha_ingreso.isoformat(),
+        'tecnico': reparacion.tecnico_asignado.nombre if reparacion.tecnico_asignado else '',
+        'estado': reparacion.estado,
+        'estado_display': reparacion.get_estado_display(),
+        'total': reparacion.total,
+        'pestania': contadores.pestania(reparacion.estado),
+        'updated_at': reparacion.updated_at.isoformat(),
+    }
+
+
+def _evento_fila(reparacion, motivo_fila):
+    return {
+        'tipo': 'fila',
+        'motivo': motivo_fila,
+        'cursor': (reparacion.updated_at, reparacion.pk),
+        'fila': datos_fila(reparacion),
+    }
+
+
+# ======================================================================
+# CANAL DE NOVEDADES
+# ======================================================================
+
+class CanalNovedades:
+    """
+    Une los avisos de las escrituras (cualquier hilo) con los tableros
+    conectados (corrutinas en el event loop).
+    """
+
+    def __init__(self, capacidad=CAPACIDAD):
+        self._lock = threading.Lock()
+        self._pendientes = {}                   # pk -> motivo, sin leer todavía
+        self._eventos = deque(maxlen=capacidad)  # (secuencia, evento)
+        self._secuencia = 0
+        self._suscriptores = set()              # (loop, asyncio.Event)
+        self._leyendo = None                    # asyncio.Lock, se crea en el loop
+
+    @property
+    def activo(self):
+        return bool(self._suscriptores)
+
+    def marcar(self, cambios):
+        """[(pk, motivo)] ya confirmados; despierta a los tableros. Se llama desde cualquier hilo."""
+        with self._lock:
+            if not self._suscriptores:
+                return
+            for pk, motivo_nuevo in cambios:
+                previo = self._pendientes.get(pk)
+                if previo is None or PRIORIDAD[motivo_nuevo] > PRIORIDAD[previo]:
+                    self._pendientes[pk] = motivo_nuevo
+            suscriptores = list(self._suscriptores)
+        for loop, despertar in suscriptores:
+            try:
+                loop.call_soon_threadsafe(despertar.set)
+            except RuntimeError:
+                # Loop ya cerrado: la suscripción se descarta al terminar su generador
+                pass
+
+    async def _leer_pendientes(self):
+        """Convierte los pks marcados en eventos del buffer (una consulta por tanda)."""
+        if self._leyendo is None:
+            self._leyendo = asyncio.Lock()
+        async with self._leyendo:
+            with self._lock:
+                pendientes, self._pendientes = self._pendientes, {}
+            if not pendientes:
+                return
+            try:
+                filas = {
+                    rep.pk: rep
+                    async for rep in Reparacion.objects.para_listado().filter(pk__in=list(pendientes))
+                }
+            except BaseException:
+                with self._lock:
+                    for pk, motivo_pk in pendientes.items():
+                        self._pendientes.setdefault(pk, motivo_pk)
+                raise
+            eventos = [
+                _evento_fila(filas[pk], motivo_pk) if pk in filas else {'tipo': 'baja', 'pk': pk}
+                for pk, motivo_pk in pendientes.items()
+            ]
+            with self._lock:
+                for evento in eventos:
+                    self._secuencia += 1
+                    self._eventos.append((self._secuencia, evento))
+
+    def _posteriores(self, vista):
+        """(eventos con secuencia > vista, última secuencia); None si el buffer ya los descartó."""
+        with self._lock:
+            if self._eventos and self._eventos[0][0] > vista + 1:
+                return None, self._secuencia
+            return [evento for secuencia, evento in self._eventos if secuencia > vista], self._secuencia
+
+    async def escuchar(self, desde=None):
+        """
+        Generador async de tandas de eventos para un tablero. Con `desde`
+        ((updated_at, pk)), la primera tanda es la puesta al día desde la
+        base. Cada LATIDO segundos sin novedades entrega una tanda vacía. Una
+        tanda [{'tipo': 'recargar'}] indica que el tablero se atrasó más de lo
+        que guarda el buffer y debe pedir el listado de nuevo.
+        """
+        despertar = asyncio.Event()
+        suscriptor = (asyncio.get_running_loop(), despertar)
+        with self._lock:
+            self._suscriptores.add(suscriptor)
+            vista = self._secuencia
+        try:
+            # Suscripto antes de consultar: lo que se confirme durante la
+            # puesta al día llega después, en vivo (a lo sumo repetido)
+            if desde is not None:
+                yield await ponerse_al_dia(desde)
+            while True:
+                try:
+                    await asyncio.wait_for(despertar.wait(), LATIDO)
+                except TimeoutError:
+                    yield []
+                    continue
+                despertar.clear()
+                await self._leer_pendientes()
+                eventos, vista = self._posteriores(vista)
+                if eventos is None:
+                    yield [{'tipo': 'recargar'}]
+                elif eventos:
+                    yield eventos
+        finally:
+            with self._lock:
+                self._suscriptores.discard(suscriptor)
+
+
+NOVEDADES = CanalNovedades()
+
+
+def avisar(cambios):
+    """
+    Anota [(pk, motivo)] para los tableros al confirmar la transacción en
+    curso. Motivos: 'alta', 'estado', 'entrega', 'cambio', 'baja'.
+    """
+    if NOVEDADES.activo:
+        transaction.on_commit(partial(NOVEDADES.marcar, list(cambios)))
+
+
+# ======================================================================
+# PUESTA AL DÍA Y FORMATO SSE
+# ======================================================================
+
+async def ponerse_al_dia(desde):
+    """Eventos de las órdenes con updated_at posterior a `desde` - MARGEN, en ese orden."""
+    fecha, _ = desde
+    filas = [
+        rep async for rep in Reparacion.objects.para_listado()
+        .filter(updated_at__gte=fecha - MARGEN)
+        .order_by('updated_at', 'pk')[:MAXIMO_PONERSE_AL_DIA + 1]
+    ]
+    if len(filas) > MAXIMO_PONERSE_AL_DIA:
+        return [{'tipo': 'recargar'}]
+    return [
+        _evento_fila(rep, 'alta' if rep.fecha_ingreso > fecha else 'entrega' if rep.estado == 'ENTREGADA' else 'cambio')
+        for rep in filas
+    ]
+
+
+def sse(eventos, pestania=None, ultimo=None):
+    """
+    Texto SSE de una tanda y el cursor más alto enviado hasta ahora. Con
+    `pestania`, las filas que pertenecen a otra pestaña viajan como 'quitar'.
+    """
+    partes = []
+    for evento in eventos:
+        tipo = evento['tipo']
+        if tipo == 'fila':
+            ultimo = max(ultimo, evento['cursor']) if ultimo else evento['cursor']
+            partes.append(f'id: {codificar_cursor(*ultimo)}\n')
+            fila = evento['fila']
+            if pestania is not None and fila['pestania'] != pestania:
+                tipo, datos = 'quitar', {'pk': fila['pk']}
+            else:
+                datos = {'pk': fila['pk'], 'motivo': evento['motivo'], 'fila': fila}
+        elif tipo == 'baja':
+            tipo, datos = 'quitar', {'pk': evento['pk']}
+        else:
+            datos = {}
+        partes.append(f'event: {tipo}\ndata: {json.dumps(datos, cls=DjangoJSONEncoder)}\n\n')
+    return ''.join(partes), ultimo
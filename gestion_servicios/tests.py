@@ -1,3 +1,1072 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+import numpy as np
+
+from . import (
+    analitica, autocompletado, avisos, busqueda, catalogos, clientes, contadores, historial, impresion, repuestos,
+    tablero, transiciones, validadores,
+)
+from .garantia import meses_garantia, sumar_meses, vencimiento
+from .ingreso_lote import ingresar_lote
+from .forms import ModeloForm, TecnicoForm
+from .models import (
+    AvisoCliente, Cliente, DetalleRepuestoReparacion, Equipo, Marca, MarcaProceso, Modelo, Reparacion, Repuesto, Tecnico,
+    TipoEquipo, TransicionEstado,
+)
+from .paginacion import codificar_cursor, decodificar_cursor, paginar_por_cursor
+from .registro import ManejadorCola
+
+
+def crear_orden(numero, **campos):
+    cliente = Cliente.objects.create(clave=f'C{numero}', nombre=f'CLIENTE {numero}')
+    equipo = Equipo.objects.create(serie_imei=f'S{numero}')
+    return Reparacion.objects.create(cliente=cliente, equipo=equipo, falla_reportada='No enciende', **campos)
+
+
+# ======================================================================
+# PAGINACIÓN POR CURSOR
+# ======================================================================
+
+class PaginacionTests(TestCase):
+
+    def test_cursor_ida_y_vuelta(self):
+        fecha = timezone.now()
+        self.assertEqual(decodificar_cursor(codificar_cursor(fecha, 42)), (fecha, 42))
+
+    def test_recorre_todas_las_paginas_con_fechas_repetidas(self):
+        ordenes = [crear_orden(i) for i in range(7)]
+        Reparacion.objects.update(fecha_ingreso=timezone.now())
+
+        vistos, cursor = [], None
+        while True:
+            pagina = paginar_por_cursor(Reparacion.objects.all(), cursor, 3)
+            vistos += [rep.pk for rep in pagina]
+            cursor = pagina.siguiente_cursor
+            if cursor is None:
+                break
+        # Empate en fecha_ingreso: desempata el pk, sin repetir ni saltear filas
+        self.assertEqual(vistos, sorted((rep.pk for rep in ordenes), reverse=True))
+
+    def test_cursor_invalido(self):
+        self.assertEqual(self.client.get(reverse('lista_servicios'), {'cursor': 'zz!'}).status_code, 404)
+
+
+# ======================================================================
+# LISTADO SIN N+1
+# ======================================================================
+
+class ListadoConsultasTests(TestCase):
+
+    def _agregar_ordenes(self, cantidad, desde):
+        tecnico = Tecnico.objects.create(nombre=f'TECNICO {desde}')
+        marca = Marca.objects.create(nombre=f'MARCA {desde}')
+        modelo = Modelo.objects.create(modelo=f'MODELO {desde}', marca=marca)
+        for i in range(desde, desde + cantidad):
+            orden = crear_orden(i, tecnico_asignado=tecnico)
+            Equipo.objects.filter(pk=orden.equipo_id).update(marca=marca, modelo=modelo)
+
+    def test_consultas_fijas_sin_importar_las_filas(self):
+        # Versiones del ETag, la página (con JOIN) y los contadores de las pestañas
+        for cantidad, desde in ((2, 0), (20, 100)):
+            self._agregar_ordenes(cantidad, desde)
+            caches['fragmentos'].clear()
+            with self.assertNumQueries(3):
+                respuesta = self.client.get(reverse('lista_servicios'))
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertContains(respuesta, f'MODELO {desde}')
+
+    def test_listado_json(self):
+        self._agregar_ordenes(5, 0)
+        with self.assertNumQueries(3):
+            datos = self.client.get(reverse('api_lista_servicios')).json()
+        self.assertEqual(len(datos['resultados']), 5)
+
+
+# ======================================================================
+# VALIDACIÓN CONDICIONAL (ETAG)
+# ======================================================================
+
+class CondicionalTests(TestCase):
+
+    def setUp(self):
+        self.orden = crear_orden(1)
+        self.url = reverse('lista_servicios')
+        self.etag = self.client.get(self.url)['ETag']
+
+    def _pedir(self):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=self.etag)
+
+    def test_304_sin_cambios(self):
+        self.assertEqual(self._pedir().status_code, 304)
+        self.assertEqual(self.client.get(self.url, {'estado': 'ENTREGADAS'}, HTTP_IF_NONE_MATCH=self.etag).status_code, 200)
+
+    def test_save_invalida(self):
+        self.orden.cliente.nombre = 'OTRO'
+        self.orden.cliente.save()
+        self.assertEqual(self._pedir().status_code, 200)
+
+    def test_escritura_masiva_invalida(self):
+        transiciones.aplicar([self.orden.pk], 'PRESUPUESTADO')
+        self.assertEqual(self._pedir().status_code, 200)
+
+
+# ======================================================================
+# AUTOCOMPLETADO
+# ======================================================================
+
+class AutocompletadoTests(TestCase):
+
+    def test_ve_cambios_de_otro_proceso(self):
+        Marca.objects.create(nombre='SAMSUNG')
+        self.assertEqual([texto for _, texto in autocompletado.MARCAS.buscar('sam')], ['SAMSUNG'])
+
+        # Otro worker: escribe y sube el contador, pero no invalida este índice
+        Marca.objects.bulk_create([Marca(nombre='SAMSUNG MOBILE')])
+        validadores.registrar_cambio(Marca)
+
+        self.assertEqual(
+            [texto for _, texto in autocompletado.MARCAS.buscar('sam')],
+            ['SAMSUNG', 'SAMSUNG MOBILE'],
+        )
+
+    def test_una_lectura_de_version_por_pulsacion(self):
+        Marca.objects.create(nombre='SAMSUNG')
+        url = reverse('buscar_marca')
+        self.client.get(url, {'term': 'sa'})
+
+        # huella() del ETag y buscar() comparten la instantánea comprobada
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(url, {'term': 'sam'})
+        self.assertEqual([fila['text'] for fila in respuesta.json()], ['SAMSUNG'])
+
+    def test_buscar_tecnico_solo_get(self):
+        url = reverse('buscar_tecnico')
+        self.assertEqual(self.client.get(url, {'term': 'ju'}).status_code, 200)
+        self.assertEqual(self.client.post(url, {'term': 'ju'}).status_code, 405)
+
+
+# ======================================================================
+# NRO. DE SERIE / IMEI POR SUFIJO
+# ======================================================================
+
+class SerieImeiTests(TestCase):
+
+    def setUp(self):
+        for serie in ('35-209900-176148-1', '352099 001761481', 'AB1481', '990001481X'):
+            Equipo.objects.create(serie_imei=serie)
+
+    def test_columnas_derivadas(self):
+        equipo = Equipo.objects.get(serie_imei='35-209900-176148-1')
+        self.assertEqual(equipo.serie_normalizada, '352099001761481')
+        self.assertEqual(equipo.serie_invertida, '184167100990253')
+
+        equipo.serie_imei = 'zx-9'
+        equipo.save(update_fields=['serie_imei'])
+        equipo.refresh_from_db()
+        self.assertEqual((equipo.serie_normalizada, equipo.serie_invertida), ('ZX9', '9XZ'))
+
+    def test_busca_por_los_ultimos_digitos(self):
+        series = list(Equipo.objects.con_serie_que_termina('-1481').values_list('serie_imei', flat=True))
+        self.assertEqual(sorted(series), ['35-209900-176148-1', '352099 001761481', 'AB1481'])
+        self.assertFalse(Equipo.objects.con_serie_que_termina(' - ').exists())
+        # Recorrido de rango sobre el índice, no LIKE '%...%' sobre la tabla
+        self.assertIn('USING INDEX', Equipo.objects.con_serie_que_termina('1481').explain().upper())
+
+    def test_vista_prefijos_primero_y_sin_repetir(self):
+        Equipo.objects.create(serie_imei='1481-0000')
+        datos = self.client.get(reverse('buscar_equipo_existente'), {'term': '1481'}).json()
+        series = [fila['value'] for fila in datos]
+        self.assertEqual(series[0], '1481-0000')
+        self.assertEqual(len(series), len(set(series)))
+        self.assertEqual(len(series), 4)
+
+
+# ======================================================================
+# EXPORTACIÓN CSV / JSONL
+# ======================================================================
+
+class ExportacionTests(TestCase):
+
+    def setUp(self):
+        samsung = Marca.objects.create(nombre='SAMSUNG')
+        self.ordenes = [crear_orden(i, mano_de_obra=Decimal('1500')) for i in range(5)]
+        Equipo.objects.filter(pk=self.ordenes[0].equipo_id).update(marca=samsung)
+        Reparacion.objects.filter(pk=self.ordenes[4].pk).update(estado='ENTREGADA')
+
+    def _exportar(self, **parametros):
+        respuesta = self.client.get(reverse('exportar_reparaciones'), parametros)
+        self.assertTrue(respuesta.streaming)
+        return respuesta, b''.join(respuesta.streaming_content).decode('utf-8')
+
+    def test_csv_en_streaming(self):
+        respuesta, contenido = self._exportar()
+
+        self.assertEqual(respuesta['Content-Type'], 'text/csv; charset=utf-8')
+        filas = list(csv.DictReader(StringIO(contenido)))
+        self.assertEqual(len(filas), 5)
+        self.assertEqual([int(fila['orden']) for fila in filas], [orden.pk for orden in self.ordenes])
+        self.assertEqual((filas[0]['cliente_clave'], filas[0]['marca'], filas[0]['tecnico']), ('C0', 'SAMSUNG', ''))
+        self.assertEqual((filas[0]['mano_de_obra'], filas[0]['total']), ('1500.00', '1500.00'))
+
+    def test_jsonl_filtrado_por_estado(self):
+        _, contenido = self._exportar(formato='jsonl', estado='ENTREGADA')
+
+        registros = [json.loads(linea) for linea in contenido.splitlines()]
+        self.assertEqual([registro['orden'] for registro in registros], [self.ordenes[4].pk])
+
+    def test_filtro_invalido(self):
+        self.assertEqual(self.client.get(reverse('exportar_reparaciones'), {'estado': 'PERDIDA'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('exportar_reparaciones'), {'desde': '01/02/2025'}).status_code, 400)
+
+    def test_comando_por_lotes(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        salida = os.path.join(directorio, 'reparaciones.csv')
+        call_command('exportar_reparaciones', '--lote', '2', '--salida', salida)
+        with open(salida, encoding='utf-8', newline='') as f:
+            self.assertEqual(len(list(csv.reader(f))), 6)
+
+
+# ======================================================================
+# CATÁLOGOS
+# ======================================================================
+
+class CatalogosTests(TestCase):
+
+    def test_modelo_repetido_por_marca(self):
+        samsung = Marca.objects.create(nombre='SAMSUNG')
+        apple = Marca.objects.create(nombre='APPLE')
+        Modelo.objects.create(modelo='GALAXY S21', marca=samsung)
+
+        self.assertFalse(ModeloForm({'modelo': ' galaxy  s21 '}, marca=samsung).is_valid())
+        form = ModeloForm({'modelo': 'Galaxy S21'}, marca=apple)
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.save().marca, apple)
+
+    def test_tecnicos_homonimos(self):
+        primero = Tecnico.objects.create(nombre='JUAN PEREZ')
+        Tecnico.objects.create(nombre='Juan Perez')
+        catalogos.TECNICOS.invalidar()
+
+        self.assertEqual(catalogos.TECNICOS.por_nombre('juan perez'), primero)
+        self.assertEqual(catalogos.TECNICOS.resolver_muchos(['Juan  Perez'])[(None, 'juan perez')], primero)
+
+    def test_formulario_acepta_tecnico_homonimo(self):
+        Tecnico.objects.create(nombre='JUAN PEREZ')
+        self.assertTrue(TecnicoForm(data={'nombre': 'Juan Perez'}).is_valid())
+
+
+class AltaTecnicoConcurrenteTests(TransactionTestCase):
+    """Sin índice único, dos mostradores que tipean el mismo técnico crean uno solo."""
+
+    MOSTRADORES = 6
+
+    def test_crea_un_solo_tecnico(self):
+        largada = threading.Barrier(self.MOSTRADORES)
+        obtenidos, errores = [], []
+
+        def resolver():
+            try:
+                largada.wait()
+                obtenidos.append(catalogos.TECNICOS.por_nombre('Ana Gomez').pk)
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        catalogos.TECNICOS.invalidar()
+        hilos = [threading.Thread(target=resolver) for _ in range(self.MOSTRADORES)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        self.assertEqual(Tecnico.objects.filter(nombre_normalizado='ana gomez').count(), 1)
+        self.assertEqual(len(set(obtenidos)), 1)
+
+
+# ======================================================================
+# INGRESO POR LOTE
+# ======================================================================
+
+class IngresoLoteTests(TestCase):
+
+    def test_valida_campos_por_fila(self):
+        valido = {'cliente': {'clave': '20-1', 'nombre': 'ACME'}, 'equipo': {'serie_imei': 'S1'}, 'falla': 'No enciende'}
+        invalido = {
+            'cliente': {'clave': '20-2', 'nombre': 'ACME', 'email': 'sin-arroba'},
+            'equipo': {'serie_imei': 'S' * 101, 'marca': 'M' * 51},
+            'falla': 'No enciende',
+        }
+        resultados = ingresar_lote([valido, invalido])
+
+        self.assertTrue(resultados[0]['ok'])
+        self.assertFalse(resultados[1]['ok'])
+        self.assertEqual(set(resultados[1]['errores']), {'email', 'serie_imei', 'marca'})
+        self.assertEqual(Reparacion.objects.count(), 1)
+
+
+# ======================================================================
+# BÚSQUEDA COMBINADA DE LA RECEPCIÓN
+# ======================================================================
+
+class DatosIngresoTests(TestCase):
+
+    def setUp(self):
+        clientes.POR_CLAVE.vaciar_local()
+        self.url = reverse('api_buscar_ingreso')
+
+    def test_cliente_por_clave(self):
+        Cliente.objects.create(clave='AB-1', nombre='ACME', telefono=None)
+
+        datos = self.client.get(self.url, {'clave': ' ab-1 '}).json()
+
+        self.assertEqual(datos['cliente']['nombre'], 'ACME')
+        self.assertEqual(datos['cliente']['telefono'], '')
+        self.assertEqual(datos['equipo'], {'existe': False})
+        self.assertEqual(datos['historial'], [])
+
+    def test_equipo_con_historial(self):
+        samsung = Marca.objects.create(nombre='SAMSUNG')
+        ordenes = [crear_orden(i) for i in range(3)]
+        Equipo.objects.filter(pk=ordenes[0].equipo_id).update(marca=samsung)
+        Reparacion.objects.filter(pk__in=[orden.pk for orden in ordenes]).update(equipo=ordenes[0].equipo)
+
+        datos = self.client.get(self.url, {'imei': 'S0', 'historial': '2'}).json()
+
+        self.assertEqual(datos['cliente'], {'existe': False})
+        self.assertTrue(datos['equipo']['existe'])
+        self.assertEqual(datos['equipo']['marca'], 'SAMSUNG')
+        self.assertEqual([orden['pk'] for orden in datos['historial']], [ordenes[2].pk, ordenes[1].pk])
+
+    def test_parametros_invalidos(self):
+        crear_orden(1)
+
+        datos = self.client.get(self.url, {'clave': 'NO-EXISTE', 'imei': 'S1', 'historial': 'x'}).json()
+
+        self.assertEqual(datos['cliente'], {'existe': False})
+        self.assertEqual(len(datos['historial']), 1)
+        self.assertEqual(self.client.get(self.url).json()['historial'], [])
+
+
+# ======================================================================
+# REGISTRO EN SEGUNDO PLANO
+# ======================================================================
+
+class ManejadorColaTests(TestCase):
+
+    def test_formatea_en_el_hilo_de_fondo(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        archivo = os.path.join(directorio, 'gestion.log')
+        manejador = ManejadorCola(destino=archivo)
+        manejador.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        try:
+            raise ValueError('sin stock')
+        except ValueError:
+            registro = logging.LogRecord(
+                'gestion_servicios', logging.ERROR, __file__, 1, 'Orden %s: %s', (7, 'falla'), sys.exc_info()
+            )
+
+        # El request solo encola: ni msg % args ni el traceback se arman acá
+        preparado = manejador.prepare(registro)
+        self.assertEqual((preparado.msg, preparado.args), ('Orden %s: %s', (7, 'falla')))
+        self.assertIsNone(preparado.exc_text)
+
+        manejador.handle(registro)
+        manejador.close()
+        with open(archivo, encoding='utf-8') as f:
+            escrito = f.read()
+        self.assertTrue(escrito.startswith('ERROR Orden 7: falla'))
+        self.assertIn('ValueError: sin stock', escrito)
+
+
+# ======================================================================
+# CACHÉ DE CLIENTES POR CLAVE
+# ======================================================================
+
+class CacheClientesTests(TestCase):
+
+    def setUp(self):
+        clientes.POR_CLAVE.vaciar_local()
+        cache.clear()
+
+    def test_invalida_al_guardar(self):
+        cliente = Cliente.objects.create(clave='AB-123', nombre='ACME')
+        self.assertEqual(clientes.POR_CLAVE.buscar(' ab-123 ')['nombre'], 'ACME')
+
+        cliente.nombre = 'ACME SA'
+        with self.captureOnCommitCallbacks(execute=True):
+            cliente.save()
+
+        self.assertEqual(clientes.POR_CLAVE.buscar('AB-123')['nombre'], 'ACME SA')
+
+    def test_cachea_el_no_existe(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(clientes.POR_CLAVE.buscar('30-999'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(clientes.POR_CLAVE.buscar(' 30-999 '))
+
+        # El alta invalida el "no existe"
+        with self.captureOnCommitCallbacks(execute=True):
+            Cliente.objects.create(clave='30-999', nombre='NUEVO')
+        self.assertEqual(clientes.POR_CLAVE.buscar('30-999')['nombre'], 'NUEVO')
+
+    def test_locmem_no_es_nivel_compartido(self):
+        clientes.POR_CLAVE.buscar('40-1')
+        self.assertIsNone(cache.get(clientes.POR_CLAVE._clave_cache('40-1')))
+
+    def test_nivel_compartido(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        archivo = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directorio}}
+        with override_settings(CACHES=archivo):
+            Cliente.objects.create(clave='50-1', nombre='ACME')
+            clientes.POR_CLAVE.buscar('50-1')
+            clientes.POR_CLAVE.vaciar_local()
+            # Otro proceso: el LRU está vacío y lo resuelve la caché compartida
+            with self.assertNumQueries(0):
+                self.assertEqual(clientes.POR_CLAVE.buscar('50-1')['nombre'], 'ACME')
+
+    def test_registra_estadisticas(self):
+        clientes.POR_CLAVE.reiniciar_estadisticas()
+        with patch.object(clientes.POR_CLAVE, 'reporte', 2), self.assertLogs('gestion_servicios.clientes', 'INFO') as log:
+            clientes.POR_CLAVE.buscar('60-1')
+            clientes.POR_CLAVE.buscar('60-1')
+        self.assertIn('1 aciertos locales', log.output[0])
+        self.assertIn('1 fallos', log.output[0])
+
+
+# ======================================================================
+# CACHÉ DE FRAGMENTOS POR FILA
+# ======================================================================
+
+class FragmentosFilaTests(TestCase):
+
+    def setUp(self):
+        caches['fragmentos'].clear()
+        self.orden = crear_orden(1)
+        self.url = reverse('lista_servicios')
+
+    def test_reutiliza_la_fila_sin_cambios(self):
+        self.client.get(self.url)
+        # Sin tocar updated_at la clave no cambia: la fila sale de la caché
+        Cliente.objects.filter(pk=self.orden.cliente_id).update(nombre='OTRO NOMBRE')
+        self.assertNotContains(self.client.get(self.url), 'OTRO NOMBRE')
+
+    def test_edicion_de_la_orden_invalida_la_fila(self):
+        self.assertContains(self.client.get(self.url), '<td>-</td>', html=True)
+        tecnico = Tecnico.objects.create(nombre='ANA GOMEZ')
+
+        respuesta = self.client.post(reverse('modificar_servicio', args=[self.orden.pk]), {
+            'estado': 'EN_REPARACION', 'tecnico_asignado': str(tecnico.pk), 'informe_tecnico': '',
+            'mano_de_obra': '0', 'saldo_final': '0',
+        })
+
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertContains(self.client.get(self.url), 'ANA GOMEZ')
+
+    def test_edicion_del_cliente_invalida_la_fila(self):
+        self.client.get(self.url)
+        cliente = Cliente.objects.get(pk=self.orden.cliente_id)
+        cliente.nombre = 'ACME SA'
+        cliente.save()
+        self.assertContains(self.client.get(self.url), 'ACME SA (C1)')
+
+
+# ======================================================================
+# BÚSQUEDA DE TEXTO COMPLETO
+# ======================================================================
+
+class BusquedaTextoTests(TestCase):
+
+    def _encontradas(self, texto):
+        return {rep.pk for rep, _ in busqueda.buscar_reparaciones(texto).resultados}
+
+    def test_triggers_siguen_update_y_bulk_create(self):
+        orden = crear_orden(1)
+        Reparacion.objects.filter(pk=orden.pk).update(informe_tecnico='Cambio de pin de carga')
+        equipo = Equipo.objects.create(serie_imei='S2')
+        nueva, = Reparacion.objects.bulk_create([
+            Reparacion(cliente=orden.cliente, equipo=equipo, falla_reportada='Pantalla rota')
+        ])
+        Equipo.objects.filter(pk=orden.equipo_id).update(accesorios='Cargador original')
+
+        self.assertEqual(self._encontradas('pin carga'), {orden.pk})
+        self.assertEqual(self._encontradas('pantalla'), {nueva.pk})
+        self.assertEqual(self._encontradas('cargador'), {orden.pk})
+        # Prefijo en la última palabra, mientras se escribe
+        self.assertEqual(self._encontradas('pant'), {nueva.pk})
+
+        Reparacion.objects.filter(pk=nueva.pk).delete()
+        self.assertEqual(self._encontradas('pantalla'), set())
+
+    def test_fragmento_resaltado_y_escapado(self):
+        orden = crear_orden(1)
+        Reparacion.objects.filter(pk=orden.pk).update(falla_reportada='<b>No enciende</b> tras mojarse')
+
+        (_, fragmento), = busqueda.buscar_reparaciones('mojarse').resultados
+
+        self.assertIn('<mark>mojarse</mark>', fragmento)
+        self.assertIn('&lt;b&gt;', fragmento)
+
+    def test_sin_fts_usa_icontains(self):
+        orden = crear_orden(1)
+        Reparacion.objects.filter(pk=orden.pk).update(informe_tecnico='Cambio de pin de carga')
+        crear_orden(2)
+
+        with patch.object(busqueda, 'disponible', return_value=False):
+            self.assertEqual(self._encontradas('PIN carga'), {orden.pk})
+            self.assertEqual(self._encontradas('enciende pin'), {orden.pk})
+            with self.assertRaises(busqueda.BusquedaInvalida):
+                busqueda.buscar_reparaciones('¿?')
+
+
+# ======================================================================
+# ANALÍTICA DE DEMORAS
+# ======================================================================
+
+class AnaliticaTests(TestCase):
+
+    HORAS = [(1, 3), (1, 5), (1, 8), (1, 30), (1, 47), (2, 2), (2, 100), (2, 12)]
+
+    def setUp(self):
+        self.tecnicos = {n: Tecnico.objects.create(nombre=f'TECNICO {n}') for n in (1, 2)}
+        self.ingreso = timezone.make_aware(datetime(2025, 3, 10, 12))
+        self.ordenes = []
+        for i, (tecnico, horas) in enumerate(self.HORAS):
+            orden = crear_orden(i, tecnico_asignado=self.tecnicos[tecnico])
+            Reparacion.objects.filter(pk=orden.pk).update(
+                fecha_ingreso=self.ingreso, fecha_entrega=self.ingreso + timedelta(hours=horas)
+            )
+            self.ordenes.append(orden)
+
+    def _por_tecnico(self):
+        return {fila['valor']: fila for fila in analitica.percentiles('tecnico')}
+
+    def test_percentiles_iguales_a_numpy(self):
+        analitica.actualizar(reconstruir=True)
+
+        for n, tecnico in self.tecnicos.items():
+            fila = self._por_tecnico()[tecnico.pk]
+            horas = [h for t, h in self.HORAS if t == n]
+            self.assertEqual(fila['mes'], '2025-03')
+            self.assertEqual(fila['cantidad'], len(horas))
+            for p in analitica.PERCENTILES:
+                self.assertAlmostEqual(fila[f'p{p}'], round(float(np.percentile(horas, p)), 2), places=2)
+        total, = analitica.percentiles('total')
+        self.assertAlmostEqual(total['p50'], float(np.percentile([h for _, h in self.HORAS], 50)), places=2)
+
+    def test_reasignacion_incremental(self):
+        analitica.actualizar(reconstruir=True)
+        # Marca de agua en el pasado y una reasignación confirmada dentro de la ventana
+        ahora = timezone.now()
+        MarcaProceso.objects.filter(nombre=analitica.PROCESO).update(hasta=ahora - timedelta(hours=1))
+        Reparacion.objects.filter(pk=self.ordenes[4].pk).update(
+            tecnico_asignado=self.tecnicos[2], updated_at=ahora - timedelta(minutes=30)
+        )
+
+        resultado = analitica.actualizar()
+
+        self.assertEqual(resultado.dias, 1)
+        por_tecnico = self._por_tecnico()
+        self.assertEqual(por_tecnico[self.tecnicos[1].pk]['cantidad'], 4)
+        self.assertEqual(por_tecnico[self.tecnicos[2].pk]['cantidad'], 4)
+        self.assertAlmostEqual(por_tecnico[self.tecnicos[2].pk]['p50'], float(np.percentile([2, 100, 12, 47], 50)))
+        # Sin cambios nuevos no recalcula nada
+        self.assertEqual(analitica.actualizar().dias, 0)
+
+
+# ======================================================================
+# CONTADORES POR ESTADO
+# ======================================================================
+
+class ContadoresTests(TestCase):
+
+    def test_save_y_delete(self):
+        tecnico = Tecnico.objects.create(nombre='JUAN')
+        orden = crear_orden(1)
+        otra = crear_orden(2, estado='TERMINADA')
+        self.assertEqual(contadores.por_pestania(), {'TALLER': 1, 'TERMINADAS': 1, 'ENTREGADAS': 0})
+
+        orden.estado = 'EN_REPARACION'
+        orden.tecnico_asignado = tecnico
+        orden.save()
+        otra.estado = 'ENTREGADA'
+        otra.save()
+        self.assertEqual(contadores.por_pestania(), {'TALLER': 1, 'TERMINADAS': 0, 'ENTREGADAS': 1})
+        self.assertEqual(contadores.diferencias(), {})
+
+        orden.delete()
+        self.assertEqual(contadores.por_pestania(), {'TALLER': 0, 'TERMINADAS': 0, 'ENTREGADAS': 1})
+        self.assertEqual(contadores.diferencias(), {})
+
+    def test_baja_de_tecnico(self):
+        tecnico = Tecnico.objects.create(nombre='JUAN')
+        orden = crear_orden(1, estado='EN_REPARACION', tecnico_asignado=tecnico)
+        crear_orden(2, estado='TERMINADA', tecnico_asignado=tecnico)
+        antes = orden.updated_at
+        version = validadores.versiones(Reparacion)[validadores._tabla(Reparacion)][0]
+
+        tecnico.delete()
+
+        self.assertEqual(contadores.diferencias(), {})
+        self.assertEqual(contadores.por_pestania(), {'TALLER': 1, 'TERMINADAS': 1, 'ENTREGADAS': 0})
+        orden.refresh_from_db()
+        self.assertIsNone(orden.tecnico_asignado)
+        self.assertGreater(orden.updated_at, antes)
+        self.assertGreater(validadores.versiones(Reparacion)[validadores._tabla(Reparacion)][0], version)
+
+
+# ======================================================================
+# GARANTÍA
+# ======================================================================
+
+class GarantiaTests(TestCase):
+
+    def test_sumar_meses(self):
+        self.assertEqual(sumar_meses(date(2025, 1, 31), 1), date(2025, 2, 28))
+        self.assertEqual(sumar_meses(date(2024, 1, 31), 1), date(2024, 2, 29))
+        self.assertEqual(sumar_meses(date(2024, 2, 29), 12), date(2025, 2, 28))
+        self.assertEqual(sumar_meses(date(2024, 2, 29), 48), date(2028, 2, 29))
+        self.assertEqual(sumar_meses(date(2025, 11, 30), 3), date(2026, 2, 28))
+
+    @override_settings(GARANTIA_MESES_POR_DEFECTO=12)
+    def test_precedencia_marca_tipo_defecto(self):
+        tipo = TipoEquipo.objects.create(nombre='CELULAR', meses_garantia=6)
+        marca = Marca.objects.create(nombre='SAMSUNG', meses_garantia=3)
+        sin_plazo = Marca.objects.create(nombre='GENERICA')
+
+        self.assertEqual(meses_garantia(tipo, marca), 3)
+        self.assertEqual(meses_garantia(tipo, sin_plazo), 6)
+        self.assertEqual(meses_garantia(None, sin_plazo), 12)
+        self.assertIsNone(vencimiento(None, tipo, marca))
+
+    def test_vencimiento_guardado_sigue_al_catalogo(self):
+        tipo = TipoEquipo.objects.create(nombre='CELULAR', meses_garantia=6)
+        marca = Marca.objects.create(nombre='SAMSUNG')
+        equipo = Equipo.objects.create(serie_imei='S1', tipo=tipo, marca=marca, fecha_compra=date(2025, 1, 31))
+        otro = Equipo.objects.create(serie_imei='S2', marca=marca)
+        self.assertEqual(equipo.vence_garantia, date(2025, 7, 31))
+        self.assertIsNone(otro.vence_garantia)
+
+        marca = Marca.objects.get(pk=marca.pk)
+        marca.meses_garantia = 1
+        marca.save()
+
+        equipo.refresh_from_db()
+        self.assertEqual(equipo.vence_garantia, date(2025, 2, 28))
+        self.assertTrue(Equipo.objects.en_garantia(date(2025, 2, 28)).filter(pk=equipo.pk).exists())
+        self.assertFalse(Equipo.objects.en_garantia(date(2025, 3, 1)).exists())
+
+
+# ======================================================================
+# TRANSICIONES DE ESTADO
+# ======================================================================
+
+class TransicionesTests(TestCase):
+
+    def _modificar(self, orden, estado):
+        return self.client.post(reverse('modificar_servicio', args=[orden.pk]), {
+            'estado': estado, 'tecnico_asignado': '', 'informe_tecnico': 'Cambio de pin de carga',
+            'mano_de_obra': '0', 'saldo_final': '0',
+        })
+
+    def test_formulario_no_aplica_la_tabla(self):
+        # La tabla es para los cambios en lote; la edición de una orden es libre
+        ingresada = crear_orden(1)
+        entregada = crear_orden(2, estado='ENTREGADA')
+
+        self.assertEqual(self._modificar(ingresada, 'TERMINADA').status_code, 302)
+        self.assertEqual(self._modificar(entregada, 'INGRESADO').status_code, 302)
+        self.assertEqual(
+            list(Reparacion.objects.order_by('pk').values_list('estado', flat=True)), ['TERMINADA', 'INGRESADO']
+        )
+        self.assertEqual(contadores.diferencias(), {})
+
+    def test_transicion_masiva_mueve_contadores(self):
+        ordenes = [crear_orden(i) for i in range(3)]
+
+        resultados = transiciones.aplicar([orden.pk for orden in ordenes[:2]], 'NO_REPARABLE')
+
+        self.assertTrue(all(resultado['ok'] for resultado in resultados))
+        self.assertEqual(contadores.por_pestania(), {'TALLER': 1, 'TERMINADAS': 2, 'ENTREGADAS': 0})
+        self.assertEqual(contadores.diferencias(), {})
+
+
+# ======================================================================
+# HISTORIAL DE ESTADOS
+# ======================================================================
+
+class HistorialTests(TestCase):
+
+    def test_transicion_masiva_en_una_tanda(self):
+        usuario = get_user_model().objects.create_user('mostrador')
+        ordenes = [crear_orden(i) for i in range(3)]
+        Reparacion.objects.filter(pk=ordenes[2].pk).update(estado='ENTREGADA')
+        TransicionEstado.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as consultas, historial.registrando(usuario):
+            transiciones.aplicar([orden.pk for orden in ordenes], 'NO_REPARABLE')
+            self.assertFalse(TransicionEstado.objects.exists())
+
+        # Las dos órdenes válidas se escriben juntas al cerrar el bloque
+        inserciones = [c for c in consultas if c['sql'].startswith(f'INSERT INTO "{TransicionEstado._meta.db_table}"')]
+        self.assertEqual(len(inserciones), 1)
+
+        filas = list(TransicionEstado.objects.order_by('reparacion_id').values_list(
+            'reparacion_id', 'estado_anterior', 'estado_nuevo', 'usuario_id'
+        ))
+        self.assertEqual(filas, [
+            (ordenes[0].pk, 'INGRESADO', 'NO_REPARABLE', usuario.pk),
+            (ordenes[1].pk, 'INGRESADO', 'NO_REPARABLE', usuario.pk),
+        ])
+
+    def test_bloque_fallido_no_escribe(self):
+        orden = crear_orden(1)
+        TransicionEstado.objects.all().delete()
+
+        with self.assertRaises(RuntimeError), historial.registrando():
+            transiciones.aplicar([orden.pk], 'EN_REPARACION')
+            raise RuntimeError
+
+        self.assertFalse(TransicionEstado.objects.exists())
+        self.assertEqual(Reparacion.objects.get(pk=orden.pk).estado, 'INGRESADO')
+
+    def test_permanencia_por_estado(self):
+        a, b = crear_orden(1), crear_orden(2)
+        TransicionEstado.objects.all().delete()
+        inicio = timezone.now() - timedelta(hours=10)
+        tramos = [
+            (a, '', 'INGRESADO', 0), (a, 'INGRESADO', 'EN_REPARACION', 2),
+            (a, 'EN_REPARACION', 'TERMINADA', 5), (a, 'TERMINADA', 'ENTREGADA', 6),
+            (b, '', 'INGRESADO', 0), (b, 'INGRESADO', 'EN_REPARACION', 4),
+        ]
+        TransicionEstado.objects.bulk_create([
+            TransicionEstado(reparacion=orden, estado_anterior=anterior, estado_nuevo=nuevo,
+                             created_at=inicio + timedelta(hours=horas))
+            for orden, anterior, nuevo, horas in tramos
+        ])
+
+        resultado = historial.permanencia()
+
+        self.assertEqual(resultado['INGRESADO'], {
+            'cantidad': 2, 'promedio_horas': 3.0, 'mediana_horas': 3.0, 'maximo_horas': 4.0,
+        })
+        self.assertEqual(resultado['EN_REPARACION']['cantidad'], 1)
+        self.assertEqual(resultado['TERMINADA']['maximo_horas'], 1.0)
+        self.assertNotIn('ENTREGADA', resultado)
+        # El estado actual de b cuenta hasta ahora; ENTREGADA es final
+        actual = historial.permanencia(incluir_actual=True)
+        self.assertEqual(actual['EN_REPARACION']['cantidad'], 2)
+        self.assertAlmostEqual(actual['EN_REPARACION']['maximo_horas'], 6.0, places=1)
+        self.assertNotIn('ENTREGADA', actual)
+
+
+# ======================================================================
+# TOTALES
+# ======================================================================
+
+class TotalesTests(TestCase):
+
+    def setUp(self):
+        self.orden = crear_orden(1, mano_de_obra=Decimal('100'))
+        self.repuesto = Repuesto.objects.create(
+            descripcion='MODULO', stock_actual=10, precio_compra=Decimal('5'), precio_venta=Decimal('10')
+        )
+
+    def _totales(self):
+        return tuple(Reparacion.objects.values_list('total_repuestos', 'total').get(pk=self.orden.pk))
+
+    def test_deltas_de_lineas(self):
+        linea = DetalleRepuestoReparacion.objects.create(
+            reparacion=self.orden, repuesto=self.repuesto, cantidad=2, precio_unitario=Decimal('10')
+        )
+        self.assertEqual(self._totales(), (Decimal('20'), Decimal('120')))
+
+        linea.cantidad = 3
+        linea.save()
+        self.assertEqual(self._totales(), (Decimal('30'), Decimal('130')))
+
+        linea.delete()
+        self.assertEqual(self._totales(), (Decimal('0'), Decimal('100')))
+
+    def test_mano_de_obra_no_pisa_repuestos(self):
+        vieja = Reparacion.objects.get(pk=self.orden.pk)
+        repuestos.consumir_repuestos(self.orden, [(self.repuesto.pk, 3)])
+
+        vistos = []
+
+        def receptor(sender, instance, **kwargs):
+            vistos.append((instance.total_repuestos, instance.total))
+
+        post_save.connect(receptor, sender=Reparacion)
+        try:
+            vieja.mano_de_obra = Decimal('50')
+            vieja.save()
+        finally:
+            post_save.disconnect(receptor, sender=Reparacion)
+
+        self.assertEqual(self._totales(), (Decimal('30'), Decimal('80')))
+        # post_save recibe valores, no la expresión del UPDATE
+        self.assertEqual(vistos, [(Decimal('30'), Decimal('80'))])
+
+
+# ======================================================================
+# REPUESTOS
+# ======================================================================
+
+class ConsumoConcurrenteTests(TransactionTestCase):
+    """Varios técnicos consumen el mismo repuesto a la vez, cada uno en su conexión."""
+
+    TECNICOS = 8
+    STOCK = 5
+
+    def test_stock_nunca_negativo(self):
+        repuesto = Repuesto.objects.create(
+            descripcion='PIN DE CARGA', stock_actual=self.STOCK, precio_compra=Decimal('1'), precio_venta=Decimal('2')
+        )
+        ordenes = [crear_orden(i) for i in range(self.TECNICOS)]
+        largada = threading.Barrier(self.TECNICOS)
+        exitos, errores = [], []
+
+        def consumir(orden):
+            try:
+                largada.wait()
+                repuestos.consumir_repuestos(orden, [(repuesto.pk, 1)])
+                exitos.append(orden.pk)
+            except repuestos.StockInsuficiente:
+                pass
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=consumir, args=(orden,)) for orden in ordenes]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        repuesto.refresh_from_db()
+        self.assertGreaterEqual(repuesto.stock_actual, 0)
+        self.assertEqual(len(exitos) + repuesto.stock_actual, self.STOCK)
+        self.assertEqual(len(exitos), self.STOCK)
+        self.assertEqual(
+            sorted(DetalleRepuestoReparacion.objects.values_list('reparacion_id', flat=True)), sorted(exitos)
+        )
+
+
+# ======================================================================
+# IMPRESIÓN
+# ======================================================================
+
+@override_settings(IMPRESION_PROCESOS=1, IMPRESION_MAX_PENDIENTES=1)
+class ImpresionTests(TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        ajustes = override_settings(IMPRESION_CACHE_DIR=self.directorio)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        # Los cupos se crean una vez por proceso: con los ajustes de esta clase
+        impresion._cupos = None
+        self.addCleanup(setattr, impresion, '_cupos', None)
+        self.addCleanup(impresion.cerrar_pool)
+        self.ordenes = list(impresion.ordenes_para_imprimir().filter(
+            pk__in=[crear_orden(i).pk for i in range(2 * impresion.ORDENES_POR_TAREA + 1)]
+        ))
+
+    def _cupos_libres(self):
+        libres = 0
+        while impresion._cupos.acquire(blocking=False):
+            libres += 1
+        for _ in range(libres):
+            impresion._cupos.release()
+        return libres
+
+    def test_lote_mayor_que_los_cupos(self):
+        # Tres tareas con un solo cupo: se componen de a una
+        contenido = impresion.pdf_ordenes(self.ordenes, 'etiqueta')
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        self.assertEqual(self._cupos_libres(), 1)
+
+    @override_settings(IMPRESION_PROCESOS=2, IMPRESION_MAX_PENDIENTES=2)
+    def test_falla_cancela_y_devuelve_los_cupos(self):
+        tareas = impresion._tareas_faltantes({rep.pk: impresion.datos_orden(rep) for rep in self.ordenes}, {})
+
+        def anotar(resultado):
+            raise OSError("disco lleno")
+
+        with self.assertRaises(OSError):
+            impresion._componer('etiqueta', tareas, anotar)
+        # La tarea que seguía corriendo devuelve su cupo al terminar
+        impresion.cerrar_pool()
+        self.assertEqual(self._cupos_libres(), 2)
+
+    def test_ocupada_en_el_comando(self):
+        impresion._obtener_pool()
+        impresion._cupos.acquire()
+        self.addCleanup(impresion._cupos.release)
+        with self.assertRaises(impresion.ImpresionOcupada):
+            impresion.pdf_ordenes(self.ordenes[:1], 'etiqueta')
+        with self.assertRaises(CommandError):
+            call_command('imprimir_ingresos', salida=f'{self.directorio}/ingresos.pdf')
+
+
+# ======================================================================
+# TABLERO EN VIVO
+# ======================================================================
+
+class TableroTests(TestCase):
+
+    async def test_marcar_conserva_el_motivo_mas_importante(self):
+        canal = tablero.CanalNovedades()
+        canal.marcar([(1, 'alta')])
+        self.assertEqual(canal._pendientes, {})  # sin tableros no se anota nada
+
+        despertar = asyncio.Event()
+        canal._suscriptores.add((asyncio.get_running_loop(), despertar))
+        canal.marcar([(1, 'cambio'), (1, 'entrega'), (2, 'alta')])
+        canal.marcar([(1, 'estado'), (2, 'cambio'), (3, 'baja')])
+
+        self.assertEqual(canal._pendientes, {1: 'entrega', 2: 'alta', 3: 'baja'})
+        await asyncio.sleep(0)
+        self.assertTrue(despertar.is_set())
+
+    async def test_lectura_de_pendientes(self):
+        orden = await sync_to_async(crear_orden)(1)
+        canal = tablero.CanalNovedades()
+        canal._suscriptores.add((asyncio.get_running_loop(), asyncio.Event()))
+        canal.marcar([(orden.pk, 'estado'), (orden.pk + 1000, 'baja')])
+
+        await canal._leer_pendientes()
+
+        eventos, _ = canal._posteriores(0)
+        self.assertEqual([evento['tipo'] for evento in eventos], ['fila', 'baja'])
+        self.assertEqual(eventos[0]['fila']['cliente'], 'CLIENTE 1')
+
+    def _ordenes_para_ponerse_al_dia(self):
+        ahora = timezone.now()
+        vieja, editada, nueva = crear_orden(1), crear_orden(2), crear_orden(3)
+        Reparacion.objects.filter(pk__in=[vieja.pk, editada.pk]).update(
+            fecha_ingreso=ahora - timedelta(days=2), updated_at=ahora - timedelta(hours=1)
+        )
+        Reparacion.objects.filter(pk=editada.pk).update(updated_at=ahora - timedelta(seconds=5))
+        return (ahora - timedelta(minutes=10), 0), editada, nueva
+
+    def test_ponerse_al_dia(self):
+        desde, editada, nueva = self._ordenes_para_ponerse_al_dia()
+
+        eventos = async_to_sync(tablero.ponerse_al_dia)(desde)
+
+        self.assertEqual(
+            [(evento['fila']['pk'], evento['motivo']) for evento in eventos],
+            [(editada.pk, 'cambio'), (nueva.pk, 'alta')],
+        )
+
+    @override_settings(ROOT_URLCONF='servicio_tecnico.urls_asgi')
+    def test_reconexion_con_last_event_id(self):
+        desde, editada, nueva = self._ordenes_para_ponerse_al_dia()
+
+        async def primeras_partes():
+            respuesta = await AsyncClient().get(
+                reverse('tablero_novedades'), headers={'Last-Event-ID': codificar_cursor(*desde)}
+            )
+            flujo = respuesta.streaming_content
+            try:
+                return respuesta, [await anext(flujo), await anext(flujo)]
+            finally:
+                await flujo.aclose()
+
+        respuesta, (reintento, puesta_al_dia) = async_to_sync(primeras_partes)()
+
+        self.assertEqual(respuesta['Content-Type'], 'text/event-stream')
+        self.assertEqual(reintento, b'retry: 3000\n\n')
+        texto = puesta_al_dia.decode()
+        self.assertEqual(texto.count('event: fila'), 2)
+        self.assertLess(texto.index(f'"pk": {editada.pk}'), texto.index(f'"pk": {nueva.pk}'))
+        self.assertFalse(tablero.NOVEDADES.activo)
+
+
+# ======================================================================
+# AVISOS A CLIENTES
+# ======================================================================
+
+class AvisosTests(TestCase):
+
+    def setUp(self):
+        self.orden = crear_orden(1, estado='EN_REPARACION', informe_tecnico='Cambio de batería')
+        Cliente.objects.filter(pk=self.orden.cliente_id).update(email='cliente@example.com')
+
+    def _pasar_a(self, *estados):
+        for estado in estados:
+            self.orden.estado = estado
+            self.orden.save()
+
+    def test_un_solo_aviso_sin_enviar_por_orden(self):
+        self._pasar_a('TERMINADA', 'EN_REPARACION', 'TERMINADA')
+        avisos.encolar('TERMINADA', [self.orden.pk])
+        self.assertEqual(AvisoCliente.objects.count(), 1)
+
+        resultado = avisos.despachar()
+        self.assertEqual(resultado.enviados, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(avisos.pendientes(), 0)
+
+        # Enviado el anterior, una nueva terminación vuelve a avisar
+        self._pasar_a('EN_REPARACION', 'TERMINADA')
+        self.assertEqual(avisos.pendientes(), 1)
+        self.assertEqual(AvisoCliente.objects.count(), 2)
+
+
+# ======================================================================
+# PILA ASGI
+# ======================================================================
+
+class AsgiTests(TestCase):
+
+    def _urlconf(self):
+        from servicio_tecnico.asgi import ASGIHandlerServicio
+
+        alcance = {'type': 'http', 'method': 'GET', 'path': '/servicios/', 'query_string': b'', 'headers': []}
+        request, _ = ASGIHandlerServicio().create_request(alcance, BytesIO())
+        return getattr(request, 'urlconf', None)
+
+    def test_vistas_async_solo_con_el_ajuste(self):
+        with override_settings(ASGI_VISTAS_ASYNC=False):
+            self.assertIsNone(self._urlconf())
+        with override_settings(ASGI_VISTAS_ASYNC=True):
+            self.assertEqual(self._urlconf(), 'servicio_tecnico.urls_asgi')
+
+    @override_settings(ROOT_URLCONF='servicio_tecnico.urls_asgi')
+    async def test_busquedas_async_solo_get(self):
+        cliente = AsyncClient()
+        self.assertEqual((await cliente.get(reverse('buscar_tecnico'), {'term': 'ju'})).status_code, 200)
+        self.assertEqual((await cliente.post(reverse('buscar_tecnico'), {'term': 'ju'})).status_code, 405)
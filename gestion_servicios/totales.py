@@ -0,0 +1,109 @@
+# gestion_servicios/totales.py
+
+"""
+Totales desnormalizados de las órdenes de servicio.
+
+Reparacion.total_repuestos (suma de cantidad * precio_unitario de sus líneas)
+y Reparacion.total (mano_de_obra + total_repuestos) se guardan en la fila,
+así que listados y exportaciones los leen sin agregar DetalleRepuestoReparacion.
+
+Se mantienen por diferencias: cada cambio de una línea suma a su orden el
+importe nuevo menos el anterior con un UPDATE ... SET total = total + delta
+(F()), atómico en la base, sin leer-modificar-escribir. De dónde salen los
+deltas:
+
+- save() / delete() de una línea: señales en signals.py.
+- repuestos.py (que escribe las líneas con update()): llama a sumar() a mano.
+- mano_de_obra: Reparacion.save() recalcula total en la misma sentencia.
+
+Las escrituras que no pasan por ninguno de esos caminos (SQL directo,
+update() sobre las líneas fuera de repuestos.py) deben terminar con
+recalcular(); `manage.py recalcular_totales --verificar` detecta desfasajes.
+"""
+
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Abs, Coalesce
+from django.utils import timezone
+
+from .models import DetalleRepuestoReparacion, Reparacion
+from . import validadores
+
+CERO = Decimal('0.00')
+# SQLite guarda los decimales como REAL: diferencias menores son redondeo
+TOLERANCIA = Decimal('0.005')
+_DECIMAL = DecimalField(max_digits=12, decimal_places=2)
+
+
+def importe(cantidad, precio_unitario):
+    return Decimal(cantidad or 0) * Decimal(str(precio_unitario or 0))
+
+
+def sumar(deltas):
+    """
+    Aplica {reparacion_id: delta} a total_repuestos y total (dentro de la
+    transacción en curso). Toca updated_at para que la caché de fragmentos
+    del listado no muestre el total viejo.
+    """
+    ahora = timezone.now()
+    cambiadas = False
+    for reparacion_id, delta in deltas.items():
+        if not delta:
+            continue
+        Reparacion.objects.filter(pk=reparacion_id).update(
+            total_repuestos=F('total_repuestos') + delta, total=F('total') + delta, updated_at=ahora,
+        )
+        cambiadas = True
+    if cambiadas:
+        validadores.registrar_cambio(Reparacion)
+
+
+# ======================================================================
+# RECÁLCULO COMPLETO (comando recalcular_totales)
+# ======================================================================
+
+def _suma_lineas():
+    return Coalesce(
+        Subquery(
+            DetalleRepuestoReparacion.objects
+            .filter(reparacion=OuterRef('pk'))
+            .order_by()
+            .values('reparacion')
+            .annotate(suma=Sum(F('cantidad') * F('precio_unitario'), output_field=_DECIMAL))
+            .values('suma')
+        ),
+        Value(CERO),
+        output_field=_DECIMAL,
+    )
+
+
+def con_totales_calculados(queryset=None):
+    """Anota total_repuestos_real / total_real agregando las líneas."""
+    queryset = Reparacion.objects.all() if queryset is None else queryset
+    return queryset.annotate(
+        total_repuestos_real=_suma_lineas(),
+    ).annotate(
+        total_real=F('mano_de_obra') + F('total_repuestos_real'),
+    )
+
+
+def desfasadas(queryset=None):
+    """Órdenes cuyos totales guardados no coinciden con sus líneas."""
+    return con_totales_calculados(queryset).annotate(
+        diferencia_repuestos=Abs(F('total_repuestos') - F('total_repuestos_real')),
+        diferencia_total=Abs(F('total') - F('total_real')),
+    ).filter(Q(diferencia_repuestos__gte=TOLERANCIA) | Q(diferencia_total__gte=TOLERANCIA))
+
+
+def recalcular(ids):
+    """Recalcula desde las líneas los totales de las órdenes `ids`. Devuelve cuántas tocó."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    queryset = Reparacion.objects.filter(pk__in=ids)
+    # SQLite evalúa todo el SET con los valores previos de la fila: dos sentencias
+    queryset.update(total_repuestos=_suma_lineas(), updated_at=timezone.now())
+    actualizadas = queryset.update(total=F('mano_de_obra') + F('total_repuestos'))
+    validadores.registrar_cambio(Reparacion)
+    return actualizadas
@@ -0,0 +1,129 @@
+# gestion_servicios/transiciones.py
+
+"""
+Cambios de estado de varias órdenes a la vez (p. ej. las entregas del cierre
+del día).
+
+aplicar(ordenes, estado) valida todas las transiciones con una consulta y las
+aplica con un único UPDATE (con fecha_entrega al pasar a ENTREGADA), dentro
+de una transacción. Las órdenes que no pueden pasar al estado pedido no
+abortan el lote: se informan en el resultado de cada una.
+
+Como update() no emite post_save, los efectos que normalmente disparan las
+señales se aplican en tanda: contadores por estado, contador de cambios del
+ETag y la señal `estado_cambiado`, que también se envía al guardar una orden
+sola con save() (ver signals.py) y alimenta el historial (historial.py).
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from . import contadores
+from . import validadores
+from .models import Reparacion
+
+MAXIMO_ORDENES = 500
+
+# Estado actual -> estados a los que puede pasar
+TRANSICIONES = {
+    'INGRESADO': {'PRESUPUESTADO', 'EN_ESPERA_REP', 'EN_REPARACION', 'NO_REPARABLE'},
+    'PRESUPUESTADO': {'EN_ESPERA_REP', 'EN_REPARACION', 'NO_REPARABLE'},
+    'EN_ESPERA_REP': {'EN_REPARACION', 'NO_REPARABLE'},
+    'EN_REPARACION': {'EN_ESPERA_REP', 'TERMINADA', 'NO_REPARABLE'},
+    'TERMINADA': {'EN_REPARACION', 'ENTREGADA'},
+    'NO_REPARABLE': {'ENTREGADA'},
+    'ENTREGADA': set(),
+}
+
+# Se envía una vez por lote (o por save() individual) con
+# cambios=[(pk, estado_anterior, estado_nuevo), ...] y usuario (o None);
+# estado_anterior es None en el alta de la orden
+estado_cambiado = Signal()
+
+
+class TransicionInvalida(ValueError):
+    """El pedido completo no se puede procesar (estado destino o tamaño)."""
+
+
+class TransicionConcurrente(Exception):
+    """Otra transacción cambió alguna orden entre la validación y el UPDATE."""
+
+
+def _origenes(destino):
+    return [origen for origen, destinos in TRANSICIONES.items() if destino in destinos]
+
+
+@transaction.atomic
+def aplicar(ordenes, estado, usuario=None):
+    """
+    Pasa las órdenes `ordenes` (pks) al `estado` indicado. Devuelve el
+    resultado de cada una, en el orden recibido:
+    {'orden': pk, 'ok': True, 'estado_anterior': ...} o {'orden': pk, 'ok': False, 'error': '...'}.
+    """
+    if estado not in TRANSICIONES:
+        raise TransicionInvalida(f"Estado desconocido '{estado}'.")
+    if not isinstance(ordenes, (list, tuple)):
+        raise TransicionInvalida("Se esperaba una lista de órdenes.")
+    if len(ordenes) > MAXIMO_ORDENES:
+        raise TransicionInvalida(f"El pedido supera el máximo de {MAXIMO_ORDENES} órdenes.")
+    try:
+        pks = list(dict.fromkeys(int(pk) for pk in ordenes))
+    except (TypeError, ValueError):
+        raise TransicionInvalida("Los números de orden deben ser enteros.")
+
+    # 1) Validación: una consulta, con las filas bloqueadas hasta el UPDATE
+    actuales = {
+        pk: (estado_actual, tecnico_id, sin_informe)
+        for pk, estado_actual, tecnico_id, sin_informe in Reparacion.objects.filter(pk__in=pks)
+        .select_for_update()
+        .annotate(sin_informe=ExpressionWrapper(Q(informe_tecnico=''), output_field=BooleanField()))
+        .values_list('pk', 'estado', 'tecnico_asignado_id', 'sin_informe')
+    }
+
+    resultados = {}
+    aceptadas = []
+    for pk in pks:
+        if pk not in actuales:
+            resultados[pk] = {'orden': pk, 'ok': False, 'error': "La orden no existe."}
+            continue
+        anterior, _, sin_informe = actuales[pk]
+        if estado not in TRANSICIONES[anterior]:
+            resultados[pk] = {'orden': pk, 'ok': False, 'error': f"No puede pasar de {anterior} a {estado}."}
+        elif estado == 'TERMINADA' and sin_informe:
+            resultados[pk] = {
+                'orden': pk, 'ok': False, 'error': "Debe completar el informe para terminar la reparación.",
+            }
+        else:
+            resultados[pk] = {'orden': pk, 'ok': True, 'estado_anterior': anterior}
+            aceptadas.append(pk)
+
+    # 2) Un solo UPDATE; el filtro por estado de origen es la segunda barrera
+    if aceptadas:
+        ahora = timezone.now()
+        cambios = {'estado': estado, 'updated_at': ahora}
+        if estado == 'ENTREGADA':
+            cambios['fecha_entrega'] = ahora
+        actualizadas = Reparacion.objects.filter(pk__in=aceptadas, estado__in=_origenes(estado)).update(**cambios)
+        if actualizadas != len(aceptadas):
+            # Se revierte todo el lote: no se informa un resultado que no se aplicó
+            raise TransicionConcurrente("Las órdenes cambiaron durante la transición; reintente la operación.")
+
+        # 3) Efectos de las señales, en tanda
+        deltas = Counter()
+        for pk in aceptadas:
+            anterior, tecnico_id, _ = actuales[pk]
+            deltas[contadores.clave(anterior, tecnico_id)] -= 1
+            deltas[contadores.clave(estado, tecnico_id)] += 1
+        contadores.sumar(deltas)
+        validadores.registrar_cambio(Reparacion)
+        estado_cambiado.send(
+            sender=Reparacion,
+            cambios=[(pk, actuales[pk][0], estado) for pk in aceptadas],
+            usuario=usuario,
+        )
+
+    return [resultados[pk] for pk in pks]
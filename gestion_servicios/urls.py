@@ -2,10 +2,15 @@
 # gestion_servicios/urls.py
 from django.urls import path
 from . import views 
+from . import vistas_async
 
 urlpatterns = [
     # Listado Principal (URL: /servicios/)
     path('', views.ReparacionListView.as_view(), name='lista_servicios'),
+    # Variante JSON del listado (mismos parámetros: ?estado=...&cursor=...)
+    path('api/reparaciones/', views.ReparacionListJsonView.as_view(), name='api_lista_servicios'),
+    # Novedades del listado en vivo (SSE); solo bajo ASGI con ASGI_VISTAS_ASYNC, ver urls_async.py
+    path('api/tablero/', views.tablero_novedades, name='tablero_novedades'),
     
     # Creación (URL: /servicios/crear/)
     path('crear/', views.ReparacionCreateView.as_view(), name='crear_servicio'),
@@ -17,8 +22,23 @@ urlpatterns = [
     # DESPUÉS: Usamos la función que definimos y decoramos con @require_POST.
     
     path('<int:pk>/cerrar/', views.cerrar_servicio_view, name='cerrar_servicio'),
+    # Entrega de varias órdenes marcadas en la pestaña Terminadas
+    path('entregar/', views.entregar_seleccionadas_view, name='entregar_seleccionadas'),
+
+    # Cambio de estado masivo (JSON {"ordenes": [...], "estado": "..."})
+    path('api/transiciones/', views.transicionar_lote_view, name='transicionar_lote'),
+
+    # Ingreso masivo de equipos (JSON {"registros": [...]})
+    path('api/ingreso-lote/', views.ingresar_lote_view, name='ingresar_lote'),
+
+    # Exportación contable en streaming (?formato=csv|jsonl&desde=&hasta=&estado=)
+    path('exportar/', views.exportar_reparaciones, name='exportar_reparaciones'),
     
-    # (Opcional) path('<int:pk>/imprimir/', views.ReparacionImprimirPDFView.as_view(), name='imprimir_servicio'),
+    # Comprobante de ingreso o etiqueta en PDF (?tipo=comprobante|etiqueta)
+    path('<int:pk>/imprimir/', vistas_async.imprimir_servicio, name='imprimir_servicio'),
+    # Todos los ingresos del día en un PDF (?tipo=&fecha=AAAA-MM-DD)
+    path('imprimir/ingresos/', vistas_async.imprimir_ingresos_dia, name='imprimir_ingresos_dia'),
+
     # URL para la API de búsqueda AJAX/JSON (Nueva línea)
     path('api/buscar_cliente/', views.buscar_cliente_por_clave, name='api_buscar_cliente'),
     
@@ -40,6 +60,18 @@ urlpatterns = [
     path('equipo/buscar-serie/', views.buscar_equipo_existente, name='buscar_equipo_existente'),
 
     path('equipo/buscar/', views.buscar_equipo_por_imei, name='buscar_equipo'),
+
+    # Búsqueda combinada de recepción: cliente + equipo + historial (?clave=&imei=&historial=)
+    path('api/buscar-ingreso/', views.buscar_datos_ingreso, name='api_buscar_ingreso'),
+
+    # Búsqueda de texto completo en fallas e informes (?q=&pagina=)
+    path('api/buscar-reparaciones/', views.buscar_reparaciones, name='api_buscar_reparaciones'),
+
+    # Percentiles de demora por mes (?dimension=&desde=AAAA-MM&hasta=AAAA-MM)
+    path('api/demoras/', views.percentiles_demora, name='api_percentiles_demora'),
+
+    # Horas en cada estado según el historial (?desde=AAAA-MM&hasta=AAAA-MM&actual=1)
+    path('api/permanencia/', views.permanencia_estados, name='api_permanencia_estados'),
     
     path('tecnico/guardar/', views.guardar_tecnico, name='guardar_tecnico'),
     path('tecnico/buscar/', views.buscar_tecnico, name='buscar_tecnico'),
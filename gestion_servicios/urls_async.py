@@ -0,0 +1,20 @@
+# gestion_servicios/urls_async.py
+# Rutas de la app bajo ASGI con ASGI_VISTAS_ASYNC (ver servicio_tecnico/asgi.py): las búsquedas
+# JSON van a sus versiones async y el resto es igual a urls.py.
+from django.urls import path
+from . import urls
+from . import vistas_async
+
+urlpatterns = [
+    # Mismas rutas y nombres que en urls.py; al estar primero, ganan la resolución
+    path('api/buscar_cliente/', vistas_async.buscar_cliente_por_clave, name='api_buscar_cliente'),
+    path('equipo/buscar-tipo/', vistas_async.buscar_tipo_equipo, name='buscar_tipo_equipo'),
+    path('equipo/buscar-marca/', vistas_async.buscar_marca, name='buscar_marca'),
+    path('equipo/buscar-modelo/', vistas_async.buscar_modelo, name='buscar_modelo'),
+    path('equipo/buscar-serie/', vistas_async.buscar_equipo_existente, name='buscar_equipo_existente'),
+    path('equipo/buscar/', vistas_async.buscar_equipo_por_imei, name='buscar_equipo'),
+    path('api/buscar-ingreso/', vistas_async.buscar_datos_ingreso, name='api_buscar_ingreso'),
+    path('tecnico/buscar/', vistas_async.buscar_tecnico, name='buscar_tecnico'),
+    # Tablero en vivo por Server-Sent Events (bajo WSGI, urls.py responde 204)
+    path('api/tablero/', vistas_async.tablero_novedades, name='tablero_novedades'),
+] + urls.urlpatterns
@@ -0,0 +1,166 @@
+# gestion_servicios/validadores.py
+
+"""
+GET condicional (ETag / Last-Modified) para el listado y las búsquedas JSON.
+
+Las pantallas del mostrador recargan el listado y el autocompletado todo el
+tiempo aunque nada haya cambiado. Cada vista decorada con @condicional arma
+un ETag barato y, si coincide con el If-None-Match del navegador, responde
+304 sin consultar los datos ni renderizar.
+
+De dónde sale el ETag:
+
+- Tablas: un contador por tabla (ContadorCambios) que las señales incrementan
+  en la misma transacción que la escritura. Leer las versiones de varias
+  tablas es una sola consulta por clave primaria, en lugar de un
+  MAX(updated_at) por tabla. La fecha del último cambio es el Last-Modified.
+- Huella: una función opcional request -> str para datos que no viven en la
+  base (p. ej. el contenido del índice de autocompletado, sin consultas).
+
+Al ETag también entran la ruta, los parámetros GET y el usuario, así que cada
+filtro/cursor tiene su propio validador. Las escrituras que no pasan por
+save()/delete() (bulk_create, update) deben llamar a registrar_cambio().
+"""
+
+import hashlib
+from functools import wraps
+from inspect import isawaitable
+
+from asgiref.sync import iscoroutinefunction
+
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import ContadorCambios
+
+
+def _tabla(modelo):
+    return modelo._meta.label_lower
+
+
+def registrar_cambio(*modelos):
+    """Incrementa el contador de cada modelo (dentro de la transacción en curso)."""
+    ahora = timezone.now()
+    for modelo in modelos:
+        tabla = _tabla(modelo)
+        actualizados = ContadorCambios.objects.filter(tabla=tabla).update(
+            version=F('version') + 1, actualizado=ahora
+        )
+        if not actualizados:
+            try:
+                with transaction.atomic():
+                    ContadorCambios.objects.create(tabla=tabla, version=1, actualizado=ahora)
+            except IntegrityError:
+                # Otro proceso creó la fila primero
+                ContadorCambios.objects.filter(tabla=tabla).update(
+                    version=F('version') + 1, actualizado=ahora
+                )
+
+
+def versiones(*modelos):
+    """Devuelve {tabla: (version, actualizado)} con una sola consulta."""
+    tablas = [_tabla(modelo) for modelo in modelos]
+    encontradas = {
+        tabla: (version, actualizado)
+        for tabla, version, actualizado in ContadorCambios.objects.filter(tabla__in=tablas)
+        .values_list('tabla', 'version', 'actualizado')
+    }
+    return {tabla: encontradas.get(tabla, (0, None)) for tabla in tablas}
+
+
+async def aversiones(*modelos):
+    """versiones() para vistas async."""
+    tablas = [_tabla(modelo) for modelo in modelos]
+    encontradas = {
+        tabla: (version, actualizado)
+        async for tabla, version, actualizado in ContadorCambios.objects.filter(tabla__in=tablas)
+        .values_list('tabla', 'version', 'actualizado')
+    }
+    return {tabla: encontradas.get(tabla, (0, None)) for tabla in tablas}
+
+
+def _hay_mensajes_pendientes(request):
+    # len() carga los mensajes sin marcarlos como leídos
+    return hasattr(request, '_messages') and len(messages.get_messages(request)) > 0
+
+
+def _etag(request, estado, usuario_pk, valor_huella):
+    partes = [
+        request.path,
+        '&'.join(sorted(request.GET.urlencode().split('&'))),
+        str(usuario_pk),
+    ]
+    partes += [f'{tabla}={version}' for tabla, (version, _) in sorted(estado.items())]
+    if valor_huella is not None:
+        partes.append(valor_huella)
+    return hashlib.blake2b('|'.join(partes).encode(), digest_size=16).hexdigest()
+
+
+def _ultima_modificacion(estado, con_huella):
+    fechas = [actualizado for _, actualizado in estado.values() if actualizado]
+    return max(fechas) if fechas and len(fechas) == len(estado) and not con_huella else None
+
+
+def condicional(*modelos, huella=None):
+    """
+    Decorador de vistas GET: ETag a partir de las versiones de `modelos` y de
+    `huella(request)`, y Last-Modified a partir del último cambio de `modelos`.
+
+    Las respuestas con mensajes pendientes (messages framework) no se validan:
+    un 304 dejaría el mensaje sin mostrar.
+
+    Sobre una vista async la envoltura también es async: lee las versiones
+    con el ORM async, el usuario con request.auser() y `huella` puede
+    devolver un awaitable.
+    """
+    def decorador(vista):
+        if iscoroutinefunction(vista):
+            @wraps(vista)
+            async def envoltura_async(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await vista(request, *args, **kwargs)
+                # auser() deja la sesión cargada: los mensajes ya no la consultan
+                usuario = await request.auser() if hasattr(request, 'auser') else None
+                if _hay_mensajes_pendientes(request):
+                    return await vista(request, *args, **kwargs)
+
+                estado = await aversiones(*modelos) if modelos else {}
+                valor_huella = None
+                if huella is not None:
+                    valor_huella = huella(request)
+                    if isawaitable(valor_huella):
+                        valor_huella = await valor_huella
+                etag = _etag(request, estado, getattr(usuario, 'pk', None), valor_huella)
+                ultima = _ultima_modificacion(estado, huella is not None)
+
+                respuesta = await condition(
+                    etag_func=lambda *a, **k: etag,
+                    last_modified_func=lambda *a, **k: ultima,
+                )(vista)(request, *args, **kwargs)
+                patch_cache_control(respuesta, private=True, no_cache=True)
+                return respuesta
+            return envoltura_async
+
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _hay_mensajes_pendientes(request):
+                return vista(request, *args, **kwargs)
+
+            estado = versiones(*modelos) if modelos else {}
+            usuario_pk = getattr(request.user, 'pk', None) if hasattr(request, 'user') else None
+            etag = _etag(request, estado, usuario_pk, huella(request) if huella is not None else None)
+            ultima = _ultima_modificacion(estado, huella is not None)
+
+            respuesta = condition(
+                etag_func=lambda *a, **k: etag,
+                last_modified_func=lambda *a, **k: ultima,
+            )(vista)(request, *args, **kwargs)
+            # Sin esto el navegador podría reutilizar la copia sin preguntar
+            patch_cache_control(respuesta, private=True, no_cache=True)
+            return respuesta
+        return envoltura
+    return decorador
@@ -1,3 +1,7 @@
+import json
+import logging
+from datetime import timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, UpdateView
 from django.views import View
@@ -6,7 +10,8 @@ from django.db import transaction
 from django.contrib import messages
 from django.views.decorators.http import require_POST
 from django.utils import timezone
-from django.http import JsonResponse 
+from django.http import HttpResponse, JsonResponse, Http404, StreamingHttpResponse
+from django.utils.decorators import method_decorator
 
 
 # Importaciones específicas de la app
@@ -20,19 +25,54 @@ from .forms import MarcaForm
 from .models import Modelo
 from .forms import ModeloForm
 from .models import Tecnico
+from .models import ResumenDiarioDemora
 from .forms import TecnicoForm
-
-
+from .garantia import sumar_meses
+from .normalizacion import normalizar_clave
+from .paginacion import codificar_cursor, paginar_por_cursor, CursorInvalido
+from . import analitica
+from . import autocompletado
+from . import busqueda
+from . import clientes
+from . import contadores
+from . import exportacion
+from . import historial
+from . import ingreso_lote
+from . import tablero
+from . import transiciones
+from .validadores import condicional
+
+logger_ingreso = logging.getLogger('gestion_servicios.ingreso')
+logger_catalogos = logging.getLogger('gestion_servicios.catalogos')
+
+
+def _usuario(request):
+    return request.user if request.user.is_authenticated else None
+
+
+# 304 Not Modified si no cambió ninguna de las tablas que muestra el listado
+def _dia_del_filtro_garantia(request):
+    # "En garantía" depende de la fecha de hoy, no solo de las tablas
+    return str(timezone.localdate()) if request.GET.get('garantia') else ''
+
+
+@method_decorator(
+    condicional(Reparacion, Cliente, Equipo, Modelo, Marca, Tecnico, huella=_dia_del_filtro_garantia), name='get'
+)
 class ReparacionListView(ListView):
     model = Reparacion
     template_name = 'gestion_servicios/lista_servicios.html'
     context_object_name = 'reparaciones'
+    # Paginación por cursor (keyset) sobre (fecha_ingreso, pk): ver paginacion.py
+    paginate_by = 50
 
     def get_queryset(self):
+        # Antes de leer: lo que se confirme después llega al tablero en vivo
+        self._inicio = timezone.now()
         # 1. Obtener el filtro de la URL (ej: ?estado=TERMINADA)
         filtro_estado = self.request.GET.get('estado', 'TALLER') 
 
-        queryset = Reparacion.objects.all()
+        queryset = Reparacion.objects.para_listado()
 
         # 2. Aplicar el filtro según el parámetro
         if filtro_estado == 'TERMINADAS':
@@ -42,15 +82,61 @@ class ReparacionListView(ListView):
         else: # Por defecto: 'TALLER' (ingresado, presupuestado, en reparación)
             queryset = queryset.exclude(estado__in=['TERMINADA', 'NO_REPARABLE', 'ENTREGADA'])
 
-        return queryset.order_by('-fecha_ingreso')
+        # Filtro opcional por garantía (?garantia=si|no): rango sobre Equipo.vence_garantia
+        filtro_garantia = self.request.GET.get('garantia')
+        if filtro_garantia in ('si', 'no'):
+            queryset = queryset.con_garantia(vigente=filtro_garantia == 'si')
+
+        return queryset.order_by('-fecha_ingreso', '-pk')
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Reemplaza la paginación por OFFSET de ListView por una keyset:
+        la página se pide con ?cursor=<token> devuelto por la página anterior.
+        """
+        cursor = self.request.GET.get('cursor') or None
+        try:
+            pagina = paginar_por_cursor(queryset, cursor, page_size)
+        except CursorInvalido:
+            raise Http404("Cursor de paginación inválido.")
+        return (None, pagina, pagina.object_list, pagina.has_next() or pagina.has_previous())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # 3. Pasar el filtro actual al template para resaltar el botón correcto
         context['filtro_activo'] = self.request.GET.get('estado', 'TALLER')
+        garantia = self.request.GET.get('garantia')
+        context['filtro_garantia'] = garantia if garantia in ('si', 'no') else ''
+        # Badges de las pestañas: contadores mantenidos, sin COUNT(*)
+        context['conteos'] = contadores.por_pestania()
+        # Desde dónde pide novedades el tablero en vivo (ver tablero.py)
+        context['cursor_tablero'] = codificar_cursor(self._inicio, 0)
         return context
 
 
+class ReparacionListJsonView(ReparacionListView):
+    """Variante JSON del listado, con el mismo filtro y el mismo cursor."""
+
+    def render_to_response(self, context, **response_kwargs):
+        pagina = context['page_obj']
+        resultados = [tablero.datos_fila(rep) for rep in pagina.object_list]
+        return JsonResponse({
+            'estado': context['filtro_activo'],
+            'resultados': resultados,
+            'siguiente_cursor': pagina.siguiente_cursor,
+        })
+
+
+@require_GET
+def tablero_novedades(request):
+    """
+    El tablero en vivo solo existe bajo ASGI con ASGI_VISTAS_ASYNC
+    (vistas_async.tablero_novedades). Sin él, 204 le indica al EventSource
+    del listado que no reintente.
+    """
+    return HttpResponse(status=204)
+
+
 class ReparacionCreateView(View):
     template_name = 'gestion_servicios/crear_servicio.html'
 
@@ -66,19 +152,21 @@ class ReparacionCreateView(View):
 
     @transaction.atomic
     def post(self, request, *args, **kwargs):
-        # DEBUG POST
-        print("=" * 60)
-        print("📥 Datos POST recibidos:")
-        for k, v in request.POST.items():
-            if k != 'csrfmiddlewaretoken':
-                print(f"  {k}: {v}")
-        print("=" * 60)
+        # DEBUG POST (solo se arma el diccionario si el nivel DEBUG está activo)
+        if logger_ingreso.isEnabledFor(logging.DEBUG):
+            logger_ingreso.debug(
+                "Datos POST recibidos: %s",
+                {k: v for k, v in request.POST.items() if k != 'csrfmiddlewaretoken'},
+            )
 
         # 0) Detectar existencia previa para bindear formularios con instance
         clave_val = request.POST.get('clave', '').strip()
         serie_val = request.POST.get('serie_imei', '').strip()
 
-        cliente_exist = Cliente.objects.filter(clave=clave_val).first() if clave_val else None
+        cliente_exist = (
+            Cliente.objects.filter(clave_normalizada=normalizar_clave(clave_val)).order_by('pk').first()
+            if clave_val else None
+        )
         equipo_exist = Equipo.objects.filter(serie_imei=serie_val).first() if serie_val else None
 
         # 1) Instanciar formularios con instance si corresponde (evita errores de unique)
@@ -90,7 +178,7 @@ class ReparacionCreateView(View):
         if cliente_form.is_valid() and equipo_form.is_valid() and reparacion_form.is_valid():
             # 3) Guardar/actualizar cliente
             cliente = cliente_form.save()  # si había instance, actualiza; si no, crea
-            print(f"✅ Cliente {'actualizado' if cliente_exist else 'nuevo creado'}: {cliente.nombre}")
+            logger_ingreso.debug("Cliente %s: %s", 'actualizado' if cliente_exist else 'nuevo creado', cliente.pk)
 
             # 4) Guardar/recuperar equipo con get_or_create (por seguridad adicional)
             serie_imei = equipo_form.cleaned_data.get('serie_imei')
@@ -106,9 +194,9 @@ class ReparacionCreateView(View):
                 }
             )
             if equipo_created:
-                print(f"✅ Equipo nuevo creado: {equipo.serie_imei}")
+                logger_ingreso.debug("Equipo nuevo creado: %s", equipo.serie_imei)
             else:
-                print(f"✅ Equipo existente encontrado: {equipo.serie_imei}")
+                logger_ingreso.debug("Equipo existente encontrado: %s", equipo.serie_imei)
                 # Opcional: refrescar datos con lo ingresado
                 equipo.tipo = equipo_form.cleaned_data.get('tipo') or equipo.tipo
                 equipo.marca = equipo_form.cleaned_data.get('marca') or equipo.marca
@@ -122,20 +210,20 @@ class ReparacionCreateView(View):
             reparacion = reparacion_form.save(commit=False)
             reparacion.cliente = cliente
             reparacion.equipo = equipo
-            reparacion.save()
+            with historial.registrando(_usuario(request)):
+                reparacion.save()
 
+            logger_ingreso.info("Orden #%s generada (cliente %s, equipo %s)", reparacion.pk, cliente.pk, equipo.pk)
             messages.success(request, f"✅ Orden de Servicio #{reparacion.pk} generada con éxito.")
             return redirect('lista_servicios')
 
-        # 6) Si hay errores, mostrarlos
-        print("❌ ERRORES DE VALIDACIÓN:")
-        if not cliente_form.is_valid():
-            print("  Cliente Form Errors:", cliente_form.errors)
-        if not equipo_form.is_valid():
-            print("  Equipo Form Errors:", equipo_form.errors)
-        if not reparacion_form.is_valid():
-            print("  Reparación Form Errors:", reparacion_form.errors)
-        print("=" * 60)
+        # 6) Si hay errores, registrarlos y mostrarlos
+        logger_ingreso.warning(
+            "Errores de validación en la recepción: cliente=%s equipo=%s reparacion=%s",
+            cliente_form.errors.get_json_data(),
+            equipo_form.errors.get_json_data(),
+            reparacion_form.errors.get_json_data(),
+        )
 
         context = self.get_context_data(cliente_form, equipo_form, reparacion_form)
         messages.error(request, "❌ Error de validación: Por favor, revise los campos marcados en rojo.")
@@ -173,8 +261,9 @@ class ReparacionUpdateView(UpdateView):
             form.add_error('informe_tecnico', 'Debe completar el informe para terminar la reparación.')
             return self.form_invalid(form)
 
-        # 3. Guardar los cambios
-        return super().form_valid(form)
+        # 3. Guardar los cambios (junto con los contadores por estado y el historial de las señales)
+        with historial.registrando(_usuario(self.request)):
+            return super().form_valid(form)
     
 
 def crear_servicio(request):
@@ -203,6 +292,7 @@ def crear_servicio(request):
     return render(request, 'gestion_servicios/crear_servicio.html', contexto_final)
 
 @require_POST
+@transaction.atomic
 def cerrar_servicio_view(request, pk):
     """Procesa el cierre (entrega) de la Orden de Servicio."""
     reparacion = get_object_or_404(Reparacion, pk=pk)
@@ -221,12 +311,121 @@ def cerrar_servicio_view(request, pk):
     # 2. Actualización Final de la Orden
     reparacion.estado = 'ENTREGADA'
     reparacion.fecha_entrega = timezone.now() # Registra la hora actual de entrega
-    reparacion.save()
+    with historial.registrando(_usuario(request)):
+        reparacion.save()
 
     messages.success(request, f"Orden #{pk} cerrada y entregada con éxito.")
     return redirect('lista_servicios') # Vuelve al listado principal
 
 
+@require_POST
+def entregar_seleccionadas_view(request):
+    """Entrega en una sola operación las órdenes marcadas en la pestaña Terminadas."""
+    ordenes = request.POST.getlist('ordenes')
+    if not ordenes:
+        messages.warning(request, "No seleccionó ninguna orden.")
+        return redirect(f"{reverse_lazy('lista_servicios')}?estado=TERMINADAS")
+    try:
+        resultados = transiciones.aplicar(ordenes, 'ENTREGADA', usuario=_usuario(request))
+    except (transiciones.TransicionInvalida, transiciones.TransicionConcurrente) as e:
+        messages.error(request, str(e))
+    else:
+        entregadas = [r['orden'] for r in resultados if r['ok']]
+        if entregadas:
+            messages.success(request, f"{len(entregadas)} orden(es) entregada(s): " + ", ".join(f"#{pk}" for pk in entregadas))
+        for r in resultados:
+            if not r['ok']:
+                messages.error(request, f"Orden #{r['orden']}: {r['error']}")
+    return redirect(f"{reverse_lazy('lista_servicios')}?estado=TERMINADAS")
+
+
+@require_POST
+def transicionar_lote_view(request):
+    """
+    Cambio de estado masivo. Recibe un JSON {"ordenes": [pk, ...], "estado": "ENTREGADA"}
+    y devuelve el resultado por orden (ver transiciones.py).
+    """
+    try:
+        cuerpo = json.loads(request.body or b'{}')
+        if not isinstance(cuerpo, dict):
+            raise transiciones.TransicionInvalida("Se esperaba un objeto JSON.")
+        resultados = transiciones.aplicar(cuerpo.get('ordenes'), cuerpo.get('estado'), usuario=_usuario(request))
+    except ValueError as e:
+        # json.JSONDecodeError y TransicionInvalida heredan de ValueError
+        return JsonResponse({'success': False, 'errors': {'__all__': [str(e)]}}, status=400)
+    except transiciones.TransicionConcurrente as e:
+        return JsonResponse({'success': False, 'errors': {'__all__': [str(e)]}}, status=409)
+
+    aplicadas = sum(1 for r in resultados if r['ok'])
+    return JsonResponse({
+        'success': aplicadas == len(resultados),
+        'aplicadas': aplicadas,
+        'rechazadas': len(resultados) - aplicadas,
+        'resultados': resultados,
+    })
+
+
+@require_POST
+def ingresar_lote_view(request):
+    """
+    Ingreso masivo (entregas corporativas). Recibe un JSON {"registros": [...]}
+    con el formato descrito en ingreso_lote.py y devuelve el resultado por fila.
+    """
+    try:
+        cuerpo = json.loads(request.body or b'{}')
+        registros = cuerpo.get('registros') if isinstance(cuerpo, dict) else None
+        with historial.registrando(_usuario(request)):
+            resultados = ingreso_lote.ingresar_lote(registros)
+    except ValueError as e:
+        # json.JSONDecodeError y LoteInvalido heredan de ValueError
+        return JsonResponse({'success': False, 'errors': {'__all__': [str(e)]}}, status=400)
+
+    creadas = sum(1 for r in resultados if r['ok'])
+    return JsonResponse({
+        'success': creadas == len(resultados),
+        'creadas': creadas,
+        'rechazadas': len(resultados) - creadas,
+        'resultados': resultados,
+    })
+
+
+@require_GET
+def exportar_reparaciones(request):
+    """
+    Exporta las órdenes de servicio en CSV o JSONL, en streaming.
+    Parámetros: ?formato=csv|jsonl&desde=AAAA-MM-DD&hasta=AAAA-MM-DD&estado=TERMINADA,ENTREGADA
+    """
+    formato = request.GET.get('formato', 'csv')
+    estados = [e for e in request.GET.get('estado', '').split(',') if e]
+
+    try:
+        queryset = exportacion.consulta_exportacion(
+            desde=request.GET.get('desde'),
+            hasta=request.GET.get('hasta'),
+            estados=estados,
+        )
+        lineas = exportacion.generar_lineas(formato, queryset)
+    except exportacion.FiltroInvalido as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    tipo_contenido = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    respuesta = StreamingHttpResponse(lineas, content_type=f'{tipo_contenido}; charset=utf-8')
+    respuesta['Content-Disposition'] = f'attachment; filename="reparaciones.{formato}"'
+    return respuesta
+
+
+def _datos_equipo(equipo):
+    """Datos del equipo con los nombres de catálogo (requiere select_related)."""
+    return {
+        'tipo': equipo.tipo.nombre if equipo.tipo else '',
+        'marca': equipo.marca.nombre if equipo.marca else '',
+        'modelo': equipo.modelo.modelo if equipo.modelo else '',
+        'accesorios': equipo.accesorios,
+        'estado_general': equipo.estado_general,
+        'fecha_compra': equipo.fecha_compra.strftime('%Y-%m-%d') if equipo.fecha_compra else '',
+    }
+
+
 @require_GET
 def buscar_cliente_por_clave(request):
     """
@@ -236,23 +435,9 @@ def buscar_cliente_por_clave(request):
     clave_buscada = request.GET.get('clave', None)
 
     if clave_buscada:
-        try:
-            # Intentamos encontrar el cliente
-            cliente = Cliente.objects.get(clave__iexact=clave_buscada)
-            
-            # Si el cliente existe, devolvemos sus datos en formato JSON
-            datos_cliente = {
-                'existe': True,
-                'nombre': cliente.nombre,
-                'direccion': cliente.direccion if cliente.direccion else '',
-                'telefono': cliente.telefono if cliente.telefono else '',
-                'celular': cliente.celular if cliente.celular else '',
-                'email': cliente.email if cliente.email else '',
-                'pk': cliente.pk # Retornamos la clave primaria por si la necesitas
-            }
-        except Cliente.DoesNotExist:
-            # Si el cliente NO existe
-            datos_cliente = {'existe': False}
+        # Caché de lectura: las búsquedas repetidas no llegan a la base
+        datos = clientes.POR_CLAVE.buscar(clave_buscada)
+        datos_cliente = {'existe': True, **datos} if datos else {'existe': False}
     else:
         # Si no se envió ninguna clave
         datos_cliente = {'existe': False}
@@ -297,13 +482,14 @@ def guardar_tipo_equipo(request):
 # ----------------------------------------------------------------------
 
 @require_GET
+@condicional(huella=lambda request: autocompletado.TIPOS.huella(request))
 def buscar_tipo_equipo(request):
     """Busca tipos de equipo que coincidan con la entrada del usuario."""
     term = request.GET.get('term', '')
     
     if term:
-        tipos = TipoEquipo.objects.filter(nombre__icontains=term).values('id', 'nombre')[:10]
-        resultados = [{'id': tipo['id'], 'text': tipo['nombre']} for tipo in tipos]
+        # Índice en memoria: sin consulta a la base (ver autocompletado.py)
+        resultados = [{'id': pk, 'text': nombre} for pk, nombre in autocompletado.TIPOS.buscar(term, request=request)]
         return JsonResponse(resultados, safe=False)
     
     return JsonResponse([], safe=False)
@@ -312,13 +498,13 @@ def buscar_tipo_equipo(request):
 # FUNCIÓN 5: BUSCAR MARCA (Autocompletado)
 # ----------------------------------------------------------------------
 @require_GET
+@condicional(huella=lambda request: autocompletado.MARCAS.huella(request))
 def buscar_marca(request):
     """Busca marcas que coincidan con la entrada del usuario."""
     term = request.GET.get('term', '')
     
     if term:
-        marcas = Marca.objects.filter(nombre__icontains=term).values('id', 'nombre')[:10]
-        resultados = [{'id': marca['id'], 'text': marca['nombre']} for marca in marcas]
+        resultados = [{'id': pk, 'text': nombre} for pk, nombre in autocompletado.MARCAS.buscar(term, request=request)]
         return JsonResponse(resultados, safe=False)
     
     return JsonResponse([], safe=False)
@@ -371,11 +557,8 @@ def guardar_modelo(request):
     """
     
     # 🔍 DEBUG: Ver todos los datos POST recibidos
-    print("=" * 60)
-    print("📥 Datos POST recibidos en guardar_modelo:")
-    for key, value in request.POST.items():
-        print(f"  {key}: {value}")
-    print("=" * 60)
+    if logger_catalogos.isEnabledFor(logging.DEBUG):
+        logger_catalogos.debug("Datos POST recibidos en guardar_modelo: %s", dict(request.POST.items()))
     
     # 🌟 PASO 1: Obtener el ID de la Marca
     marca_id = request.POST.get('marca')
@@ -391,7 +574,7 @@ def guardar_modelo(request):
     # 🌟 PASO 2: Verificar que la Marca existe
     try:
         marca_objeto = Marca.objects.get(pk=marca_id)
-        print(f"✅ Marca encontrada: {marca_objeto.nombre} (ID: {marca_id})")
+        logger_catalogos.debug("Marca encontrada: %s (ID: %s)", marca_objeto.nombre, marca_id)
     except Marca.DoesNotExist:
         return JsonResponse({
             'success': False,
@@ -408,7 +591,7 @@ def guardar_modelo(request):
         }, status=400)
     
     # 🌟 PASO 3: Validar el formulario del Modelo
-    form = ModeloForm(request.POST)
+    form = ModeloForm(request.POST, marca=marca_objeto)
     
     if form.is_valid():
         try:
@@ -417,7 +600,7 @@ def guardar_modelo(request):
             modelo.marca = marca_objeto
             modelo.save()
             
-            print(f"✅ Modelo creado exitosamente: {modelo.modelo} (ID: {modelo.pk})")
+            logger_catalogos.info("Modelo creado: %s (ID: %s, marca %s)", modelo.modelo, modelo.pk, marca_objeto.pk)
             
             # 🌟 PASO 5: Devolver respuesta exitosa
             return JsonResponse({
@@ -429,7 +612,7 @@ def guardar_modelo(request):
             })
         
         except Exception as e:
-            print(f"❌ Error al guardar el modelo: {str(e)}")
+            logger_catalogos.exception("Error al guardar el modelo")
             return JsonResponse({
                 'success': False,
                 'errors': {
@@ -439,8 +622,7 @@ def guardar_modelo(request):
     
     else:
         # 🌟 PASO 6: Manejar errores de validación del formulario
-        print("❌ Errores de validación del formulario:")
-        print(form.errors)
+        logger_catalogos.warning("Errores de validación en guardar_modelo: %s", form.errors.get_json_data())
         
         cleaned_errors = {}
         for field, errors in form.errors.as_data().items():
@@ -456,6 +638,7 @@ def guardar_modelo(request):
 # FUNCIÓN 6: BUSCAR MODELO (Autocompletado)
 # ----------------------------------------------------------------------
 @require_GET
+@condicional(huella=lambda request: autocompletado.MODELOS.huella(request))
 def buscar_modelo(request):
     """Busca modelos por nombre para autocompletado."""
     term = request.GET.get('term', '')
@@ -466,8 +649,7 @@ def buscar_modelo(request):
         # if marca_id:
         #     modelos = Modelo.objects.filter(nombre__icontains=term, marca_id=marca_id)
         
-        modelos = Modelo.objects.filter(modelo__icontains=term).values('id', 'modelo')[:10]
-        resultados = [{'id': modelo['id'], 'text': modelo['modelo']} for modelo in modelos]
+        resultados = [{'id': pk, 'text': nombre} for pk, nombre in autocompletado.MODELOS.buscar(term, request=request)]
         return JsonResponse(resultados, safe=False)
 
     return JsonResponse([], safe=False)
@@ -478,13 +660,22 @@ def buscar_modelo(request):
 # FUNCIÓN 7: BUSCAR EQUIPO EXISTENTE (Autocompletado)
 # ----------------------------------------------------------------------
 @require_GET
+@condicional(Equipo)
 def buscar_equipo_existente(request):
-    """Busca equipos existentes por número de serie/IMEI."""
+    """
+    Busca equipos existentes por número de serie/IMEI.
+    Primero los que empiezan con el término y luego los que terminan con él
+    (en el mostrador se suelen tipear los últimos dígitos del IMEI).
+    """
     term = request.GET.get('term', '')
 
     if term:
-        equipos = Equipo.objects.filter(serie_imei__icontains=term).values('serie_imei')[:10]
-        resultados = [{'value': equipo['serie_imei']} for equipo in equipos]
+        series = list(Equipo.objects.con_serie_que_empieza(term).values_list('serie_imei', flat=True)[:10])
+        if len(series) < 10:
+            for serie in Equipo.objects.con_serie_que_termina(term).values_list('serie_imei', flat=True)[:10]:
+                if serie not in series:
+                    series.append(serie)
+        resultados = [{'value': serie} for serie in series[:10]]
         return JsonResponse(resultados, safe=False)
 
     return JsonResponse([], safe=False)
@@ -492,23 +683,154 @@ def buscar_equipo_existente(request):
 
 
 @require_GET
+@condicional(Equipo, TipoEquipo, Marca, Modelo)
 def buscar_equipo_por_imei(request):
     imei = request.GET.get('imei')
     try:
-        equipo = Equipo.objects.get(serie_imei=imei)
-        data = {
-            'tipo': equipo.tipo.nombre if equipo.tipo else '',
-            'marca': equipo.marca.nombre if equipo.marca else '',
-            'modelo': equipo.modelo.modelo if equipo.modelo else '',
-            'accesorios': equipo.accesorios,
-            'estado_general': equipo.estado_general,
-            'fecha_compra': equipo.fecha_compra.strftime('%Y-%m-%d') if equipo.fecha_compra else '',
-        }
-        return JsonResponse(data)
+        # select_related: tipo, marca y modelo en el mismo JOIN
+        equipo = Equipo.objects.select_related('tipo', 'marca', 'modelo').get(serie_imei=imei)
+        return JsonResponse(_datos_equipo(equipo))
     except Equipo.DoesNotExist:
         return JsonResponse({'error': 'No encontrado'}, status=404)
 
 
+def _datos_orden_historial(orden):
+    """Una orden del historial del equipo (requiere select_related('tecnico_asignado'))."""
+    return {
+        'pk': orden.pk,
+        'fecha_ingreso': orden.fecha_ingreso.strftime('%Y-%m-%d'),
+        'fecha_entrega': orden.fecha_entrega.strftime('%Y-%m-%d') if orden.fecha_entrega else '',
+        'estado': orden.estado,
+        'estado_display': orden.get_estado_display(),
+        'falla_reportada': orden.falla_reportada,
+        'tecnico': orden.tecnico_asignado.nombre if orden.tecnico_asignado else '',
+    }
+
+
+HISTORIAL_POR_DEFECTO = 5
+HISTORIAL_MAXIMO = 50
+
+
+@require_GET
+@condicional(Cliente, Equipo, Reparacion, TipoEquipo, Marca, Modelo, Tecnico)
+def buscar_datos_ingreso(request):
+    """
+    Búsqueda combinada para el formulario de recepción, en un solo viaje:
+    ?clave=<DNI>&imei=<serie>&historial=<N>
+
+    Devuelve el cliente, el equipo con sus nombres de catálogo y las últimas
+    N órdenes del equipo. Cada parte es una única consulta (con JOIN).
+    """
+    clave = request.GET.get('clave', '').strip()
+    imei = request.GET.get('imei', '').strip()
+    try:
+        limite = min(int(request.GET.get('historial', HISTORIAL_POR_DEFECTO)), HISTORIAL_MAXIMO)
+    except ValueError:
+        limite = HISTORIAL_POR_DEFECTO
+
+    respuesta = {'cliente': {'existe': False}, 'equipo': {'existe': False}, 'historial': []}
+
+    if clave:
+        datos = clientes.POR_CLAVE.buscar(clave)
+        if datos:
+            respuesta['cliente'] = {'existe': True, **datos}
+
+    if imei:
+        equipo = Equipo.objects.select_related('tipo', 'marca', 'modelo').filter(serie_imei=imei).first()
+        if equipo:
+            respuesta['equipo'] = {'existe': True, **_datos_equipo(equipo)}
+            ordenes = (
+                Reparacion.objects.filter(equipo=equipo)
+                .select_related('tecnico_asignado')
+                .only('id', 'fecha_ingreso', 'fecha_entrega', 'estado', 'falla_reportada',
+                      'tecnico_asignado__nombre')
+                .order_by('-fecha_ingreso', '-pk')[:max(limite, 0)]
+            )
+            respuesta['historial'] = [_datos_orden_historial(orden) for orden in ordenes]
+
+    return JsonResponse(respuesta)
+
+
+@require_GET
+@condicional(Reparacion, Cliente, Equipo, Modelo, Marca, Tecnico)
+def buscar_reparaciones(request):
+    """
+    Búsqueda de texto completo en el historial (ver busqueda.py):
+    ?q=<texto>&pagina=<N>
+
+    Busca en la falla reportada, el informe técnico, el estado general y los
+    accesorios. Los resultados vienen ordenados por relevancia; `fragmento`
+    es HTML con los términos encontrados entre <mark>.
+    """
+    try:
+        pagina = int(request.GET.get('pagina', 1))
+    except ValueError:
+        return JsonResponse({'error': "El parámetro 'pagina' debe ser un número."}, status=400)
+    try:
+        resultado = busqueda.buscar_reparaciones(request.GET.get('q', ''), pagina)
+    except busqueda.BusquedaInvalida as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'pagina': resultado.numero,
+        'hay_siguiente': resultado.hay_siguiente,
+        'resultados': [
+            {
+                'pk': rep.pk,
+                'cliente': rep.cliente.nombre,
+                'equipo': str(rep.equipo.modelo) if rep.equipo.modelo else '',
+                'serie_imei': rep.equipo.serie_imei,
+                'fecha_ingreso': rep.fecha_ingreso.isoformat(),
+                'estado': rep.estado,
+                'estado_display': rep.get_estado_display(),
+                'fragmento': fragmento,
+            }
+            for rep, fragmento in resultado.resultados
+        ],
+    })
+
+
+@require_GET
+@condicional(ResumenDiarioDemora, Tecnico, Marca, TipoEquipo)
+def percentiles_demora(request):
+    """
+    Percentiles de demora de entrega por mes (ver analitica.py):
+    ?dimension=<total|tecnico|marca|tipo>&desde=AAAA-MM&hasta=AAAA-MM
+
+    Lee el resumen diario, no el historial; se actualiza con
+    `manage.py actualizar_analitica`. Las demoras vienen en horas.
+    """
+    try:
+        filas = analitica.percentiles(
+            request.GET.get('dimension', 'total'),
+            desde=analitica.parsear_mes(request.GET.get('desde'), 'desde'),
+            hasta=analitica.parsear_mes(request.GET.get('hasta'), 'hasta'),
+        )
+    except analitica.ConsultaInvalida as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({'resultados': filas})
+
+
+@require_GET
+def permanencia_estados(request):
+    """
+    Horas que pasan las órdenes en cada estado (ver historial.py):
+    ?desde=AAAA-MM&hasta=AAAA-MM&actual=1
+
+    Cuenta los tramos que empezaron en esos meses; con actual=1 incluye el
+    tiempo que llevan las órdenes en su estado actual.
+    """
+    try:
+        desde = analitica.parsear_mes(request.GET.get('desde'), 'desde')
+        hasta = analitica.parsear_mes(request.GET.get('hasta'), 'hasta')
+    except analitica.ConsultaInvalida as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if hasta is not None:
+        hasta = sumar_meses(hasta, 1) - timedelta(days=1)
+    estados = historial.permanencia(desde, hasta, incluir_actual=request.GET.get('actual') == '1')
+    return JsonResponse({'estados': estados})
+
+
 # -------------------------------------------------
 # VISTAS AJAX PARA TÉCNICOS
 # -------------------------------------------------
@@ -529,14 +851,14 @@ def guardar_tecnico(request):
             cleaned_errors[field] = [str(e.message) for e in errors]
         return JsonResponse({'success': False, 'errors': cleaned_errors}, status=400)
 
+@require_GET
+@condicional(huella=lambda request: autocompletado.TECNICOS.huella(request))
 def buscar_tecnico(request):
     """Busca técnicos para el autocompletado."""
     term = request.GET.get('term', '').strip()
     
-    # Asumiendo que el modelo Tecnico tiene un campo 'nombre'
     if term:
-        tecnicos = Tecnico.objects.filter(nombre__icontains=term).values('id', 'nombre')[:10]
-        resultados = [{'id': tec.get('id'), 'text': tec.get('nombre')} for tec in tecnicos]
+        resultados = [{'id': pk, 'text': nombre} for pk, nombre in autocompletado.TECNICOS.buscar(term, request=request)]
         return JsonResponse(resultados, safe=False)
         
     return JsonResponse([], safe=False)
\ No newline at end of file
@@ -0,0 +1,243 @@
+# gestion_servicios/vistas_async.py
+
+"""
+Versiones async de las búsquedas JSON del formulario de recepción (las que
+se disparan en cada tecla o blur).
+
+Bajo ASGI una vista síncrona ocupa un hilo del pool por request; estas corren
+en el event loop. Los índices de autocompletado y el LRU de clientes
+responden sin salir del loop, y cuando hace falta la base usan el ORM async
+(aget, afirst, async for). Devuelven exactamente lo mismo que las de
+views.py, con el mismo ETag.
+
+Con ASGI_VISTAS_ASYNC, servicio_tecnico/asgi.py las enruta (urls_async.py)
+en lugar de las síncronas; sin ese ajuste, o bajo WSGI, se siguen usando las
+de views.py.
+
+Las de impresión solo existen en versión async, en urls.py: esperan al pool
+de procesos de impresion.py sin ocupar un hilo. El tablero en vivo (al
+final) mantiene abierta una conexión SSE por pantalla, que bajo WSGI
+ocuparía un hilo cada una; por eso solo está en urls_async.py.
+"""
+
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET
+
+from .models import Equipo, Reparacion, Cliente, TipoEquipo, Marca, Modelo, Tecnico
+from .views import HISTORIAL_MAXIMO, HISTORIAL_POR_DEFECTO, _datos_equipo, _datos_orden_historial
+from . import autocompletado
+from . import clientes
+from . import contadores
+from . import impresion
+from . import tablero
+from .paginacion import CursorInvalido, decodificar_cursor
+from .validadores import condicional
+
+
+@require_GET
+async def buscar_cliente_por_clave(request):
+    """Busca un cliente por su 'clave' (DNI/RUC) y devuelve los datos en JSON."""
+    clave_buscada = request.GET.get('clave', None)
+
+    datos = await clientes.POR_CLAVE.abuscar(clave_buscada) if clave_buscada else None
+    return JsonResponse({'existe': True, **datos} if datos else {'existe': False})
+
+
+# ----------------------------------------------------------------------
+# AUTOCOMPLETADO DE CATÁLOGOS (índice en memoria, ver autocompletado.py)
+# ----------------------------------------------------------------------
+
+async def _autocompletar(indice, request, strip=False):
+    term = request.GET.get('term', '')
+    if strip:
+        term = term.strip()
+    if not term:
+        return JsonResponse([], safe=False)
+    resultados = [{'id': pk, 'text': nombre} for pk, nombre in await indice.abuscar(term, request=request)]
+    return JsonResponse(resultados, safe=False)
+
+
+@require_GET
+@condicional(huella=lambda request: autocompletado.TIPOS.ahuella(request))
+async def buscar_tipo_equipo(request):
+    return await _autocompletar(autocompletado.TIPOS, request)
+
+
+@require_GET
+@condicional(huella=lambda request: autocompletado.MARCAS.ahuella(request))
+async def buscar_marca(request):
+    return await _autocompletar(autocompletado.MARCAS, request)
+
+
+@require_GET
+@condicional(huella=lambda request: autocompletado.MODELOS.ahuella(request))
+async def buscar_modelo(request):
+    return await _autocompletar(autocompletado.MODELOS, request)
+
+
+@require_GET
+@condicional(huella=lambda request: autocompletado.TECNICOS.ahuella(request))
+async def buscar_tecnico(request):
+    return await _autocompletar(autocompletado.TECNICOS, request, strip=True)
+
+
+# ----------------------------------------------------------------------
+# EQUIPOS
+# ----------------------------------------------------------------------
+
+@require_GET
+@condicional(Equipo)
+async def buscar_equipo_existente(request):
+    """Series que empiezan con el término y luego las que terminan con él."""
+    term = request.GET.get('term', '')
+
+    if term:
+        series = [
+            serie async for serie in
+            Equipo.objects.con_serie_que_empieza(term).values_list('serie_imei', flat=True)[:10]
+        ]
+        if len(series) < 10:
+            async for serie in Equipo.objects.con_serie_que_termina(term).values_list('serie_imei', flat=True)[:10]:
+                if serie not in series:
+                    series.append(serie)
+        return JsonResponse([{'value': serie} for serie in series[:10]], safe=False)
+
+    return JsonResponse([], safe=False)
+
+
+@require_GET
+@condicional(Equipo, TipoEquipo, Marca, Modelo)
+async def buscar_equipo_por_imei(request):
+    imei = request.GET.get('imei')
+    try:
+        equipo = await Equipo.objects.select_related('tipo', 'marca', 'modelo').aget(serie_imei=imei)
+        return JsonResponse(_datos_equipo(equipo))
+    except Equipo.DoesNotExist:
+        return JsonResponse({'error': 'No encontrado'}, status=404)
+
+
+@require_GET
+@condicional(Cliente, Equipo, Reparacion, TipoEquipo, Marca, Modelo, Tecnico)
+async def buscar_datos_ingreso(request):
+    """Búsqueda combinada de recepción: ?clave=<DNI>&imei=<serie>&historial=<N>"""
+    clave = request.GET.get('clave', '').strip()
+    imei = request.GET.get('imei', '').strip()
+    try:
+        limite = min(int(request.GET.get('historial', HISTORIAL_POR_DEFECTO)), HISTORIAL_MAXIMO)
+    except ValueError:
+        limite = HISTORIAL_POR_DEFECTO
+
+    respuesta = {'cliente': {'existe': False}, 'equipo': {'existe': False}, 'historial': []}
+
+    if clave:
+        datos = await clientes.POR_CLAVE.abuscar(clave)
+        if datos:
+            respuesta['cliente'] = {'existe': True, **datos}
+
+    if imei:
+        equipo = await Equipo.objects.select_related('tipo', 'marca', 'modelo').filter(serie_imei=imei).afirst()
+        if equipo:
+            respuesta['equipo'] = {'existe': True, **_datos_equipo(equipo)}
+            ordenes = (
+                Reparacion.objects.filter(equipo=equipo)
+                .select_related('tecnico_asignado')
+                .only('id', 'fecha_ingreso', 'fecha_entrega', 'estado', 'falla_reportada',
+                      'tecnico_asignado__nombre')
+                .order_by('-fecha_ingreso', '-pk')[:max(limite, 0)]
+            )
+            respuesta['historial'] = [_datos_orden_historial(orden) async for orden in ordenes]
+
+    return JsonResponse(respuesta)
+
+
+# ----------------------------------------------------------------------
+# IMPRESIÓN (comprobante de ingreso / etiqueta, ver impresion.py)
+# ----------------------------------------------------------------------
+
+def _respuesta_pdf(contenido, nombre):
+    respuesta = HttpResponse(contenido, content_type='application/pdf')
+    respuesta['Content-Disposition'] = f'inline; filename="{nombre}"'
+    return respuesta
+
+
+def _ocupado(error):
+    respuesta = JsonResponse({'error': str(error)}, status=503)
+    respuesta['Retry-After'] = '5'
+    return respuesta
+
+
+@require_GET
+async def imprimir_servicio(request, pk):
+    """PDF de la orden: ?tipo=comprobante|etiqueta"""
+    tipo = request.GET.get('tipo', 'comprobante')
+    try:
+        reparacion = await impresion.ordenes_para_imprimir().aget(pk=pk)
+    except Reparacion.DoesNotExist:
+        raise Http404("No existe la orden.")
+    try:
+        contenido = await impresion.apdf([reparacion], tipo)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except impresion.ImpresionOcupada as e:
+        return _ocupado(e)
+    return _respuesta_pdf(contenido, f'{tipo}-{pk}.pdf')
+
+
+@require_GET
+async def imprimir_ingresos_dia(request):
+    """Un PDF con todos los ingresos del día: ?tipo=comprobante|etiqueta&fecha=AAAA-MM-DD (hoy)"""
+    tipo = request.GET.get('tipo', 'etiqueta')
+    dia = None
+    if request.GET.get('fecha'):
+        dia = parse_date(request.GET['fecha'])
+        if dia is None:
+            return JsonResponse({'error': "'fecha' debe tener el formato AAAA-MM-DD."}, status=400)
+    reparaciones = [rep async for rep in impresion.ingresos_del_dia(dia)]
+    if not reparaciones:
+        return JsonResponse({'error': "No hay ingresos en la fecha indicada."}, status=404)
+    try:
+        contenido = await impresion.apdf(reparaciones, tipo)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except impresion.ImpresionOcupada as e:
+        return _ocupado(e)
+    return _respuesta_pdf(contenido, f'{tipo}s-{reparaciones[0].fecha_ingreso:%Y%m%d}.pdf')
+
+
+# ----------------------------------------------------------------------
+# TABLERO EN VIVO (Server-Sent Events, ver tablero.py)
+# ----------------------------------------------------------------------
+
+RECONEXION_MS = 3000
+
+
+@require_GET
+async def tablero_novedades(request):
+    """Filas del listado que cambian: ?estado=<pestaña>&cursor=<token> (o Last-Event-ID al reconectar)"""
+    pestania = request.GET.get('estado', 'TALLER')
+    if pestania not in contadores.PESTANIAS:
+        return JsonResponse({'error': f"Pestaña desconocida '{pestania}'."}, status=400)
+    token = request.headers.get('Last-Event-ID') or request.GET.get('cursor')
+    try:
+        desde = decodificar_cursor(token) if token else None
+    except CursorInvalido:
+        return JsonResponse({'error': "Cursor inválido."}, status=400)
+
+    async def flujo():
+        ultimo = desde
+        yield f'retry: {RECONEXION_MS}\n\n'
+        async for eventos in tablero.NOVEDADES.escuchar(desde):
+            if not eventos:
+                yield ': latido\n\n'
+                continue
+            texto, ultimo = tablero.sse(eventos, pestania, ultimo)
+            yield texto
+            if any(evento['tipo'] == 'recargar' for evento in eventos):
+                # El navegador recarga el listado y abre otra conexión
+                return
+
+    respuesta = StreamingHttpResponse(flujo(), content_type='text/event-stream')
+    respuesta['Cache-Control'] = 'no-cache'
+    respuesta['X-Accel-Buffering'] = 'no'  # nginx: no juntar los eventos en el buffer
+    return respuesta
@@ -9,8 +9,28 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'servicio_tecnico.settings')
 
-application = get_asgi_application()
+# URLconf de los requests que llegan por ASGI con ASGI_VISTAS_ASYNC: las
+# búsquedas JSON del mostrador y el tablero en vivo se resuelven con las
+# vistas async (gestion_servicios/vistas_async.py)
+URLCONF_ASGI = 'servicio_tecnico.urls_asgi'
+
+
+class ASGIHandlerServicio(ASGIHandler):
+    """ASGIHandler que, con ASGI_VISTAS_ASYNC, resuelve cada request con URLCONF_ASGI."""
+
+    def create_request(self, scope, body_file):
+        request, respuesta_error = super().create_request(scope, body_file)
+        if request is not None and getattr(settings, 'ASGI_VISTAS_ASYNC', False):
+            request.urlconf = URLCONF_ASGI
+        return request, respuesta_error
+
+
+# Igual que get_asgi_application(), con el handler propio
+django.setup(set_prefix=False)
+application = ASGIHandlerServicio()
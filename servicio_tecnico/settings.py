@@ -68,9 +68,33 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Espera (segundos) a que se libere el lock antes de fallar
+            'timeout': 20,
+            # BEGIN IMMEDIATE: las transacciones toman el lock de escritura al
+            # empezar, en lugar de fallar con "database is locked" al intentar
+            # pasar de lectura a escritura en medio de la transacción.
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # Base de tests en archivo, no en memoria: la base en memoria compartida
+        # entre hilos bloquea por tabla sin respetar 'timeout', y los tests de
+        # concurrencia (TransactionTestCase con hilos) necesitan WAL como en producción.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# PRAGMAs que se aplican a cada conexión SQLite nueva (gestion_servicios/sqlite.py).
+# Dejar el diccionario vacío para usar los valores por defecto de SQLite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',        # lectores y escritor no se bloquean entre sí
+    'busy_timeout': 20000,        # ms de espera ante un lock (igual que 'timeout')
+    'synchronous': 'NORMAL',      # seguro con WAL; evita un fsync por commit
+    'mmap_size': 268435456,       # 256 MB de lectura vía memoria mapeada
+    'cache_size': -65536,         # negativo = KiB -> 64 MB de caché de páginas
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -116,3 +140,107 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles' # Se usa un directorio diferente de 'static' para evitar problemas. 
 
+
+# Cachés. 'default' es la de siempre (memoria local por proceso); 'fragmentos'
+# guarda el HTML de cada fila de los listados ({% cache ... using="fragmentos" %}).
+# Con varios workers conviene apuntar ambas a Redis/Memcached para compartirlas.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragmentos': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragmentos',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+
+# Autocompletado de catálogos (gestion_servicios/autocompletado.py)
+# Los índices de todos los procesos se invalidan con los cambios de cualquiera.
+# Con False la versión se lee del contador de cambios de la tabla (una consulta
+# por clave primaria por búsqueda); con True, de CACHES['default'], que debe ser
+# compartida (Redis, Memcached) y además guarda los datos del índice.
+AUTOCOMPLETADO_USAR_CACHE = False
+
+# Bajo ASGI, usar las vistas async de las búsquedas y el tablero en vivo
+# (servicio_tecnico/urls_asgi.py). Apagado, ASGI atiende las mismas vistas
+# síncronas que WSGI.
+ASGI_VISTAS_ASYNC = False
+
+# Caché de búsqueda de clientes por clave (gestion_servicios/clientes.py), en segundos.
+# El nivel compartido usa CACHES['default'] y se saltea si es LocMemCache (no
+# compartida entre procesos); el local es un LRU por proceso.
+CLIENTES_CACHE_TTL = 300
+CLIENTES_CACHE_TTL_LOCAL = 5
+# Cada cuántas búsquedas se registran los aciertos/fallos del proceso (0 = nunca)
+CLIENTES_CACHE_REPORTE = 1000
+
+# Plazo de garantía cuando ni la marca ni el tipo de equipo definen uno (gestion_servicios/garantia.py)
+GARANTIA_MESES_POR_DEFECTO = 12
+
+# Impresión de comprobantes y etiquetas (gestion_servicios/impresion.py)
+IMPRESION_TALLER = 'ST Manager - Servicio Técnico'
+# Páginas ya compuestas, por orden; se puede borrar en cualquier momento
+IMPRESION_CACHE_DIR = BASE_DIR / 'cache_impresion'
+# Procesos del pool (None = hasta 4, según los núcleos) y cupos de todo el proceso: cada
+# tarea en el pool ocupa uno y un pedido toma hasta uno por proceso; sin cupos libres, 503
+IMPRESION_PROCESOS = None
+IMPRESION_MAX_PENDIENTES = 64
+
+# Avisos por correo a los clientes (gestion_servicios/avisos.py, manage.py despachar_avisos).
+# Por defecto apunta a un servidor SMTP local de prueba, que imprime los correos
+# (pip install aiosmtpd; el módulo smtpd ya no existe desde Python 3.12):
+#   python -m aiosmtpd -n -l localhost:1025
+# Sin servidor: EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# imprime los correos en la salida del despachador.
+EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_HOST = 'localhost'
+EMAIL_PORT = 1025
+EMAIL_TIMEOUT = 10  # segundos; sin esto un servidor colgado frena al despachador
+DEFAULT_FROM_EMAIL = 'ST Manager <taller@localhost>'
+AVISOS_TALLER = IMPRESION_TALLER
+AVISOS_LOTE = 50
+# Reintentos: 60 s, 2 min, 4 min... hasta 6 h entre intentos; FALLIDO al llegar al máximo
+AVISOS_MAX_INTENTOS = 8
+AVISOS_REINTENTO_BASE = 60
+AVISOS_REINTENTO_MAXIMO = 6 * 3600
+
+
+# Logging (gestion_servicios/registro.py)
+# GESTION_LOG_ASINCRONO = True escribe desde un hilo de fondo (QueueHandler/QueueListener),
+# así el request nunca espera al pipe de salida; False escribe directo a stderr.
+GESTION_LOG_ASINCRONO = True
+GESTION_LOG_NIVEL = 'INFO'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {
+            'format': '{asctime} {levelname} {name} [{process}] {message}',
+            'style': '{',
+        },
+    },
+    'filters': {
+        # Fracción de mensajes DEBUG/INFO que se registran por logger (WARNING+ siempre)
+        'muestreo_ingreso': {'()': 'gestion_servicios.registro.FiltroMuestreo', 'tasa': 1.0},
+        'muestreo_catalogos': {'()': 'gestion_servicios.registro.FiltroMuestreo', 'tasa': 1.0},
+    },
+    'handlers': {
+        'gestion': (
+            {'()': 'gestion_servicios.registro.ManejadorCola', 'destino': 'stderr', 'formatter': 'simple'}
+            if GESTION_LOG_ASINCRONO else
+            {'class': 'logging.StreamHandler', 'formatter': 'simple'}
+        ),
+    },
+    'loggers': {
+        'gestion_servicios': {
+            'handlers': ['gestion'],
+            'level': GESTION_LOG_NIVEL,
+            'propagate': False,
+        },
+        'gestion_servicios.ingreso': {'filters': ['muestreo_ingreso']},
+        'gestion_servicios.catalogos': {'filters': ['muestreo_catalogos']},
+    },
+}
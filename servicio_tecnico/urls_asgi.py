@@ -0,0 +1,9 @@
+# servicio_tecnico/urls_asgi.py
+# URLconf que usa asgi.py: igual a urls.py, con las búsquedas async de la app.
+from django.urls import path, include
+
+from . import urls
+
+urlpatterns = [
+    path('servicios/', include('gestion_servicios.urls_async')),
+] + urls.urlpatterns